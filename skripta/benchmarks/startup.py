@@ -0,0 +1,99 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from pathlib import Path
+
+# Absolute path to app root dir (the one containing 'src')
+ROOT_DIRECTORY = Path(__file__).resolve().parent.parent
+
+# Cases: (name, python arguments, modules that must stay unloaded, default budget in ms)
+CASES = [
+    ('worker --help', ['-X', 'importtime', 'src/Model/worker.py', '--help'],
+     ('speech_recognition', 'pandas', 'numpy', 'PyQt6'), 150),
+    ('gui modules', ['-X', 'importtime', '-c', 'import src.main, src.View.View, src.Model.Model, '
+                                               'src.Controller.Controller'],
+     ('speech_recognition', 'pandas', 'numpy'), 600),
+]
+
+
+def measure(arguments: list):
+    """
+    Runs a fresh interpreter with the given arguments and parses its -X importtime report.
+    :param arguments: Python command line arguments
+    :return: Tuple (wall_time_ms, import_time_ms, imported_module_names), or None if the process failed.
+    """
+
+    environment = dict(os.environ, PYTHONPATH=ROOT_DIRECTORY.__str__(), PYTHONDONTWRITEBYTECODE='')
+
+    startTime = time.perf_counter()
+    process = subprocess.run([sys.executable, *arguments], cwd=ROOT_DIRECTORY, env=environment,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wallTime = (time.perf_counter() - startTime) * 1000
+
+    if process.returncode != 0:
+        errors = [line for line in process.stderr.splitlines() if not line.startswith('import time:')]
+        print('\n'.join(errors), file=sys.stderr)
+        return None
+
+    importTime = 0
+    modules = set()
+
+    # lines look like "import time:  self [us] | cumulative | imported package"
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        selfTime, cumulative, module = line[len('import time:'):].split('|')
+        importTime += int(selfTime) / 1000
+        modules.add(module.strip().split('.')[0])
+
+    return (wallTime, importTime, modules)
+
+
+def setupParser():
+    """
+    Setups parser for command line arguments.
+    :return: Parser instance with defined arguments.
+    """
+
+    newParser = argparse.ArgumentParser(description='Cold start benchmark of the GUI and the worker.')
+
+    newParser.add_argument("-r", "--repeat", type=int, help="number of runs per case, the best one counts", default=5)
+    newParser.add_argument("-s", "--scale", type=float, help="multiplier of the default time budgets", default=1.0)
+
+    return newParser
+
+
+if __name__ == '__main__':
+    """
+    Measures the import time of each startup path and checks it against its budget.
+    Exits with status 1 if any budget is exceeded or a heavy dependency gets loaded on a path that does not need it.
+    """
+
+    args = setupParser().parse_args()
+
+    failed = False
+
+    for name, arguments, forbidden, budget in CASES:
+        runs = [measure(arguments) for _ in range(args.repeat)]
+
+        if None in runs:
+            print('{:<16} FAILED (process error)'.format(name))
+            failed = True
+            continue
+
+        wallTime, importTime, modules = min(runs, key=lambda run: run[1])
+        loaded = sorted(set(forbidden) & modules)
+        limit = budget * args.scale
+
+        ok = importTime <= limit and not loaded
+        failed = failed or not ok
+
+        print('{:<16} imports {:7.1f} ms (budget {:.0f} ms), wall {:7.1f} ms {}{}'.format(
+            name, importTime, limit, wallTime, 'OK' if ok else 'FAILED',
+            ', loaded: ' + ', '.join(loaded) if loaded else ''))
+
+    sys.exit(1 if failed else 0)
@@ -1,9 +1,10 @@
 import os, subprocess, platform
 import datetime
+import html
 import time
 from typing import Union
 
-from PyQt6.QtCore import QProcess, QCoreApplication, QEvent, Qt
+from PyQt6.QtCore import QProcess, QCoreApplication, QEvent, Qt, QTimer
 from PyQt6.QtGui import QKeyEvent
 
 from src.View.FileOptionsDialog.FileOptionsDialog import Ui_OptionsDialog as Ui_FileOptionsDialog
@@ -11,6 +12,12 @@ from src.View.MicOptionsDialog.MicOptionsDialog import Ui_OptionsDialog as Ui_Mi
 
 from src.Model.Enums.API import API
 from src.Model.Enums.EnergyThresholdOption import EnergyThresholdOption
+from src.Model.Enums.ErrorCode import ErrorCode
+from src.Model.Utils.Paths import ROOT_DIRECTORY, CACHE_DIRECTORY
+from src.Model.Enums.MessageType import MessageType
+from src.Model.Export.TranscriptWriter import JsonLinesWriter
+from src.Model.Export.Writers import getTextSegments, isTimedFormat
+from src.Model.Utils.MessageProtocol import MessageProtocol, MessageReader
 from src.View.Validators.DurationValidator import DurationValidator
 from src.View.View import View
 from src.Model.Model import Model
@@ -18,12 +25,33 @@ from src.Model.Model import Model
 
 OptionsDailogUI = Union[Ui_MicOptionsDialog, Ui_FileOptionsDialog]
 
+SPOOL_DIRECTORY = CACHE_DIRECTORY / 'spool'
+
 
 class Controller:
     """
     A class that handles the Model-View correspondence.
     """
 
+    # maximal number of transcript's characters shown in the result dialog
+    PREVIEW_LIMIT = 100000
+
+    # milliseconds a cancelled worker gets to report its partial result, before it is killed;
+    # the worker abandons its running requests, so it only needs to write the transcribed part
+    CANCEL_DEADLINE = 5000
+
+    # error dialog opened for each error code reported by the worker
+    ERROR_DIALOGS = {
+        ErrorCode.UNAUTHORISED: View.DialogType.UNAUTHORISED,
+        ErrorCode.MIC_NOT_FOUND: View.DialogType.MIC_NOT_FOUND,
+        ErrorCode.DAMAGED_FILE: View.DialogType.DAMAGED_FILE,
+        ErrorCode.INVALID_FORMAT: View.DialogType.INVALID_FORMAT,
+        ErrorCode.FAILED_REQUEST: View.DialogType.FAILED_REQUEST,
+        ErrorCode.LISTENING_TIMED_OUT: View.DialogType.LISTENING_TIMED_OUT,
+        ErrorCode.TIMED_OUT: View.DialogType.TIMED_OUT,
+        ErrorCode.FILE_NOT_FOUND: View.DialogType.FILE_NOT_FOUND,
+    }
+
     def __init__(self, model: Model, view: View):
         """
         Initializes the controller class with the given model and view instances.
@@ -36,7 +64,28 @@ class Controller:
 
         self.newFilePath = ""
 
+        # the worker streams the transcript to a spool file, only its preview is kept in the result dialog
+        self.spoolPath = None
+        self.previewTruncated = False
+
+        # worker's stderr carries only third party noise, so it is forwarded instead of being read
         self.workerProcess = QProcess()
+        self.workerProcess.setProcessChannelMode(QProcess.ProcessChannelMode.ForwardedErrorChannel)
+
+        # a cancelled worker abandons its current request and stops, or is killed after the deadline
+        self.cancelTimer = QTimer()
+        self.cancelTimer.setSingleShot(True)
+        self.cancelTimer.setInterval(self.CANCEL_DEADLINE)
+
+        self.messageReader = MessageReader()
+        self.workerResponded = False
+        self.messageHandlers = {
+            MessageType.RESULT: self.handleResult,
+            MessageType.PROGRESS: self.handleProgress,
+            MessageType.ERROR: self.handleFailure,
+            MessageType.LOG: self.handleLog,
+            MessageType.METRICS: self.handleMetrics,
+        }
 
         self.connectSignalsAndSlots()
 
@@ -54,15 +103,16 @@ class Controller:
         self.view.selectGrammarDialog.fileSelected.connect(self.updateGrammarText)
         
         # processing
-        self.view.processingDialogUI.StopButton.clicked.connect(self.workerProcess.kill)
+        self.view.processingDialogUI.StopButton.clicked.connect(self.cancelWorker)
         self.view.processingDialogUI.StopButton.clicked.connect(
             lambda: self.view.closeDialog(self.view.DialogType.PROCESSING))
-        self.view.processingDialog.rejected.connect(self.workerProcess.kill)
+        self.view.processingDialog.rejected.connect(self.cancelWorker)
         self.view.processingDialog.rejected.connect(lambda: self.view.closeDialog(self.view.DialogType.PROCESSING))
+        self.cancelTimer.timeout.connect(self.workerProcess.kill)
 
-        # handle result
-        self.workerProcess.readyReadStandardOutput.connect(self.handleResult)
-        self.workerProcess.readyReadStandardError.connect(self.handleFailure)
+        # handle worker messages
+        self.workerProcess.readyReadStandardOutput.connect(self.readWorkerMessages)
+        self.workerProcess.finished.connect(self.handleWorkerFinished)
 
         self.view.resultDialogUI.saveButton.clicked.connect(self.startFileSave)
         self.view.saveFileDialog.fileSelected.connect(self.writeToFile)
@@ -108,7 +158,7 @@ class Controller:
         # main menu
         self.view.menuWidgetUI.RecordButton.clicked.connect(
             lambda: self.view.openDialog(self.view.DialogType.MIC_OPTIONS))
-        self.view.menuWidgetUI.RecordButton.clicked.connect(self.updateMicOptions)
+        self.view.menuWidgetUI.RecordButton.clicked.connect(lambda: self.updateMicOptions())
 
         # options menu
         self.view.micOptionsDialogUI.resetButton.clicked.connect(self.resetMicOptions)
@@ -145,17 +195,23 @@ class Controller:
             dialogUi.browseGrammarButton.clicked.connect(
                 lambda dialog=dialogUi: self.view.openDialog(self.view.DialogType.GRAMMAR_OPEN))
 
-    def updateMicOptions(self):
+            # cached languages are available right away
+            self.updateLanguagesDropdown(dialogUi)
+
+    def updateMicOptions(self, refresh: bool = False):
         """
         Updates the mic options dropdown with available microphone inputs.
+        :param refresh: If True, the devices are scanned again instead of using the cached list
         :return:
         """
 
+        microphones = self.model.getMicrophones(refresh)
+
         self.view.micOptionsDialogUI.micComboBox.clear()
-        self.view.micOptionsDialogUI.micComboBox.addItems(self.model.getMicrophones())
+        self.view.micOptionsDialogUI.micComboBox.addItems(microphones)
 
         # set to default mic
-        for index, mic in enumerate(self.model.getMicrophones()):
+        for index, mic in enumerate(microphones):
             if 'default' in mic.lower():
                 self.view.micOptionsDialogUI.micComboBox.setCurrentIndex(index)
                 break
@@ -309,8 +365,7 @@ class Controller:
         args = self.getMicWorkerArguments()
         print(args)
 
-        from src.main import ROOT_DIRECTORY
-        self.workerProcess.start("python3", [ROOT_DIRECTORY.__str__() + "/src/Model/worker.py", *args])
+        self.startWorker(args)
 
         self.view.openDialog(self.view.DialogType.LISTENING)
 
@@ -325,11 +380,56 @@ class Controller:
         args = self.getFileWorkerArguments()
         print(args)
 
-        from src.main import ROOT_DIRECTORY
-        self.workerProcess.start("python3", [ROOT_DIRECTORY.__str__() + "/src/Model/worker.py", *args])
+        self.startWorker(args)
 
         self.view.openDialog(self.view.DialogType.PROCESSING)
 
+    def startWorker(self, args: list):
+        """
+        Starts the worker process with the given command line arguments.
+        :param args: Worker's command line arguments
+        :return:
+        """
+
+        self.messageReader.reset()
+        self.workerResponded = False
+
+        self.removeSpool()
+        os.makedirs(SPOOL_DIRECTORY, exist_ok=True)
+        self.spoolPath = (SPOOL_DIRECTORY / 'transcript-{}.jsonl'.format(os.getpid())).__str__()
+
+        args = [*args, '-pl', self.PREVIEW_LIMIT.__str__(), '-out', self.spoolPath, '-ci']
+
+        self.workerProcess.start("python3", [ROOT_DIRECTORY.__str__() + "/src/Model/worker.py", *args])
+
+    def cancelWorker(self):
+        """
+        Asks the running worker to stop. The worker abandons its current request, and reports the transcribed part.
+        If it does not exit before the deadline (i.e. it is still listening to the microphone), it is killed.
+        :return:
+        """
+
+        if self.workerProcess.state() == QProcess.ProcessState.NotRunning or self.cancelTimer.isActive():
+            return
+
+        self.workerProcess.write(MessageProtocol.encode(MessageType.CANCEL))
+        self.cancelTimer.start()
+
+    def removeSpool(self):
+        """
+        Removes the spool file of the previous transcription, including a partially written one.
+        :return:
+        """
+
+        if self.spoolPath is None:
+            return
+
+        for path in (self.spoolPath, self.spoolPath + '.part'):
+            if os.path.isfile(path):
+                os.remove(path)
+
+        self.spoolPath = None
+
     def getSeconds(self, input: str):
         """
         Helper method, retrieves the number of seconds from given text input.
@@ -507,83 +607,116 @@ class Controller:
 
         return True
 
-    def handleResult(self):
+    def readWorkerMessages(self):
         """
-        Handles the output of worker process.
-        If the output indicates that the listening process is over, the message in the processing dialog is updated appropriately.
-        If the output contains the resulting script, the textarea in the result dialog is filled with the parsed data
-        from the worker's standard output channel and the result dialog replaces the processing dialog.
+        Reads the available output of worker process and dispatches each complete message to its handler.
         :return:
         """
 
-        resultData = self.workerProcess.readAllStandardOutput()
-        resultText = bytes(resultData).decode("utf8")
+        data = bytes(self.workerProcess.readAllStandardOutput())
 
-        print('worker output:', resultText)
+        for messageType, payload in self.messageReader.feed(data):
+            self.messageHandlers[messageType](payload)
 
-        # handle end of listening
-        if resultText == "Done listening":
-            self.view.openDialog(self.view.DialogType.PROCESSING)
-            return
+    def handleWorkerFinished(self, exitCode: int, exitStatus: QProcess.ExitStatus):
+        """
+        Handles the end of worker process.
+        Dispatches any unterminated message left in the buffer. If the worker exited with an error
+        without reporting a result or an error, the generic error dialog is opened.
+        :param exitCode: Worker's exit code
+        :param exitStatus: Normal or crash exit (the latter also when killed)
+        :return:
+        """
 
-        # handle end of transcription
-        self.view.resultDialogUI.resultTextEdit.setPlainText(resultText)
+        self.cancelTimer.stop()
 
-        self.view.closeDialog(self.view.DialogType.PROCESSING)
-        self.view.openDialog(self.view.DialogType.RESULT)
+        for messageType, payload in self.messageReader.flush():
+            self.messageHandlers[messageType](payload)
+
+        if not self.workerResponded and exitStatus == QProcess.ExitStatus.NormalExit and exitCode != 0:
+            self.handleFailure({'code': ErrorCode.UNKNOWN, 'message': 'exit code ' + exitCode.__str__()})
 
-    def handleFailure(self):
+    def handleProgress(self, payload: dict):
         """
-        Handles the failed transcription.
-        Closes the processing dialog and opens an error dialog with an appropriate message.
+        Handles the progress message of worker process.
+        If the message indicates that the listening process is over, the message in the processing dialog is updated appropriately.
+        :param payload: Message content
         :return:
         """
 
-        errorData = self.workerProcess.readAllStandardError()
-        errorText = bytes(errorData).decode("utf8")
+        if payload.get('stage') == 'listened':
+            self.view.openDialog(self.view.DialogType.PROCESSING)
 
-        print('error:', errorText)
+    def handleResult(self, payload: dict):
+        """
+        Handles the result message of worker process.
+        The textarea in the result dialog is filled with the resulting script (or its preview, for long transcripts)
+        and the result dialog replaces the processing dialog. A cancelled job shows its transcribed part.
+        :param payload: Message content
+        :return:
+        """
 
-        # ignore debug.info outputs
-        if "INFO:" in errorText:
-            return
+        self.workerResponded = True
+
+        resultText = payload.get('text', '')
+        print('worker output:', resultText[:200])
 
-        # ignore alsa outputs
-        if "ALSA" in errorText:
+        # cancelled before anything was transcribed
+        if payload.get('cancelled') and not resultText:
             return
 
-        # closes processing dialog and kills the process
-        self.view.closeDialog(self.view.DialogType.PROCESSING)
+        # a truncated preview cannot be edited, the full transcript is saved from the spool file
+        self.previewTruncated = payload.get('truncated', False)
 
-        if "OSError" in errorText:
-            self.view.openDialog(self.view.DialogType.UNAUTHORISED)
+        self.view.resultDialogUI.resultTextEdit.setPlainText(resultText)
+        self.view.resultDialogUI.resultTextEdit.setReadOnly(self.previewTruncated)
 
-        elif "ValueError - Mic as Source: " in errorText:
-            self.view.openDialog(self.view.DialogType.MIC_NOT_FOUND)
+        self.view.closeDialog(self.view.DialogType.PROCESSING)
+        self.view.openDialog(self.view.DialogType.RESULT)
 
-        elif "UnknownValueError" in errorText:
-            self.view.openDialog(self.view.DialogType.DAMAGED_FILE)
+    def handleFailure(self, payload: dict):
+        """
+        Handles the failed transcription.
+        Closes the processing dialog and opens an error dialog matching the reported error code.
+        :param payload: Message content
+        :return:
+        """
 
-        elif "ValueError" in errorText:
-            self.view.openDialog(self.view.DialogType.INVALID_FORMAT)
+        self.workerResponded = True
 
-        elif "RequestError" in errorText:
-            self.view.openDialog(self.view.DialogType.FAILED_REQUEST)
+        print('error:', payload.get('message'))
 
-        elif "WaitTimeoutError - listen" in errorText:
-            self.view.openDialog(self.view.DialogType.LISTENING_TIMED_OUT)
+        # closes processing dialog
+        self.view.closeDialog(self.view.DialogType.PROCESSING)
 
-        elif "Timeout" in errorText:
-            self.view.openDialog(self.view.DialogType.TIMED_OUT)
+        dialogType = self.ERROR_DIALOGS.get(payload.get('code'))
 
-        elif "FileNotFoundError" in errorText:
-            self.view.openDialog(self.view.DialogType.FILE_NOT_FOUND)
+        if dialogType is not None:
+            self.view.openDialog(dialogType)
 
         else:
             print('Undefined error.')
             self.view.errorDialogUI.setText(self.view.DialogType.getMessageHTML('Greška!'))
             self.view.errorDialog.open()
 
+    def handleLog(self, payload: dict):
+        """
+        Handles the log message of worker process.
+        :param payload: Message content
+        :return:
+        """
+
+        print('worker log:', payload.get('message'))
+
+    def handleMetrics(self, payload: dict):
+        """
+        Handles the metrics message of worker process.
+        :param payload: Message content
+        :return:
+        """
+
+        print('worker metrics:', payload.get('metrics'))
+
     def startFileSave(self):
         """
         Creates the result directory if needed and opens the file save dialog.
@@ -595,8 +728,10 @@ class Controller:
 
     def writeToFile(self, filePath: str):
         """
-        If the given filePath is valid, the result text is written into it.
-        If successful, the success dialog is opened, and the result dialog closed.
+        If the given filePath is valid, the result text (or subtitles, for .srt and .vtt files) is written into it,
+        in the format chosen by the file's extension. The document is written on a separate thread.
+        Subtitles are written from the recognized segments with their timings, so edits of the text are not in them;
+        without the recognized segments, subtitles cannot be written.
         :param filePath: Path to a textual file.
         :return:
         """
@@ -605,14 +740,56 @@ class Controller:
             return
 
         self.newFilePath = filePath
+        spoolExists = self.spoolPath is not None and os.path.isfile(self.spoolPath)
+
+        if isTimedFormat(filePath) and not spoolExists:
+            self.view.errorDialogUI.setText(self.view.DialogType.getMessageHTML(
+                'Titlovi se spremaju iz prepoznatog teksta s vremenima, koji više nije dostupan. '
+                'Spremite tekst u drugom formatu.'))
+            self.view.errorDialog.open()
+            return
+
+        lines = self.view.resultDialogUI.resultTextEdit.toPlainText().splitlines()
+
+        # subtitles and long transcripts are streamed from the spool file, others written from the (edited) text
+        if spoolExists and (isTimedFormat(filePath) or self.previewTruncated):
+            segments = JsonLinesWriter.readSegments(self.spoolPath)
+        else:
+            segments = getTextSegments(lines)
+
+        # the index keeps the recognized segments' timings whenever they are available
+        indexSegments = JsonLinesWriter.readSegments(self.spoolPath) if spoolExists else getTextSegments(lines)
 
-        with open(filePath, 'w') as file:
-            file.write(self.view.resultDialogUI.resultTextEdit.toPlainText())
+        self.view.resultDialog.setEnabled(False)
 
+        export = self.model.exportTranscript(segments, filePath, indexSegments)
+        export.finished.connect(self.handleExportFinished)
+        export.failed.connect(self.handleExportFailed)
+
+    def handleExportFinished(self, filePath: str):
+        """
+        Opens the success dialog, and closes the result dialog.
+        :param filePath: Path to the written file
+        :return:
+        """
+
+        self.view.resultDialog.setEnabled(True)
         self.view.closeDialog(self.view.DialogType.RESULT)
         self.view.resultDialog.accept()
         self.view.openDialog(self.view.DialogType.SUCCESS)
 
+    def handleExportFailed(self, message: str):
+        """
+        Re-enables the result dialog and opens an error dialog.
+        :param message: Error description
+        :return:
+        """
+
+        self.view.resultDialog.setEnabled(True)
+        self.view.errorDialogUI.setText(self.view.DialogType.getMessageHTML('Greška pri spremanju datoteke!<br>' +
+                                                                             html.escape(message)))
+        self.view.errorDialog.open()
+
     def openNewFile(self):
         """
         Opens the latest transcript file using default application for its type.
@@ -650,7 +827,7 @@ class Controller:
 
         self.newFilePath = ""
 
-        self.updateMicOptions()
+        self.updateMicOptions(refresh=True)
         self.view.micOptionsDialogUI.durationLineEdit.setText('00:00:05')
         self.view.micOptionsDialogUI.hotwordsLineEdit.clear()
 
@@ -0,0 +1,62 @@
+from typing import Union
+
+import speech_recognition as sr
+
+from src.Model.Backends.RecognitionBackend import RecognitionBackend
+from src.Model.Backends.WebClients import HttpClient, GoogleWebClient
+from src.Model.Enums.API import API
+
+
+class GoogleBackend(RecognitionBackend):
+    """
+    Google Speech API v2 (the free web API).
+    Requests go through speech_recognition, or through the own HTTP client if "GOOGLE_ENDPOINT" is set in env.json
+    (i.e. to the local stand-in server).
+    """
+
+    API = API.GOOGLE
+    CREDENTIALS = ("GOOGLE_API_KEY",)
+
+    MAX_REQUEST_DURATION = 60  # longer audio is rejected or cut short
+    CONCURRENCY = 4
+
+    def open(self):
+        super().open()
+
+        self.client = None
+        endpoint = self.environment.get("GOOGLE_ENDPOINT")
+        if endpoint:
+            self.client = GoogleWebClient(self.API.__str__(), endpoint, self.TIMEOUT,
+                                          int(self.environment.get("REQUEST_RETRIES", HttpClient.DEFAULT_RETRIES)))
+
+    def request(self, recognizer: sr.Recognizer, audio: sr.AudioData):
+        apiKey = self.environment["GOOGLE_API_KEY"]
+
+        if self.client is not None:
+            response = self.client.recognize(audio, apiKey, self.options.language)
+        else:
+            response = recognizer.recognize_google(audio, apiKey, self.options.language, show_all=True)
+
+        return self.parseResult(response)
+
+    @staticmethod
+    def parseResult(response: Union[dict, list]):
+        """
+        :param response: Google Speech API's response (show_all=True)
+        :return: Tuple (text, confidence, words)
+        @:raises:
+            UnknownValueError: if there is no transcription in the response
+        """
+
+        if not isinstance(response, dict) or not response.get('alternative'):
+            raise sr.UnknownValueError()
+
+        alternatives = response['alternative']
+        best = next((alternative for alternative in alternatives if 'confidence' in alternative), alternatives[0])
+
+        return (best['transcript'], best.get('confidence'), [])
+
+    def close(self):
+        if getattr(self, 'client', None) is not None:
+            self.client.close()
+            self.client = None
@@ -0,0 +1,177 @@
+import socket
+import threading
+import time
+import uuid
+
+import speech_recognition as sr
+
+from concurrent.futures import Future
+
+from src.Model.Backends.GoogleCloudBackend import GoogleCloudBackend
+from src.Model.Backends.OperationPoller import POLLER
+from src.Model.Backends.WebClients import HttpClient, GoogleCloudClient
+from src.Model.Enums.API import API
+
+
+class GoogleCloudAsyncBackend(GoogleCloudBackend):
+    """
+    Google Cloud Speech API, long-running (asynchronous) recognition for long audio.
+    The audio is uploaded to the "GOOGLE_CLOUD_BUCKET" bucket, the operation is started, and its status is polled
+    by the process' shared poller, so a job keeps several operations in flight, and waiting does not hold a thread.
+    The uploaded audio is deleted when the operation finishes. An operation's deadline grows with its audio,
+    and the chunks are planned by the service's own limit, not by the default cap of the planner.
+
+    "GOOGLE_CLOUD_ENDPOINT" and "GOOGLE_STORAGE_ENDPOINT" in env.json override the Speech and Cloud Storage URLs,
+    i.e. "http://127.0.0.1:8010/v1" and "http://127.0.0.1:8010" for the local stand-in server.
+    """
+
+    API = API.GOOGLE_CLOUD_ASYNC
+    CREDENTIALS = ("GOOGLE_CLOUD_CREDS", "GOOGLE_CLOUD_BUCKET")
+
+    MAX_REQUEST_DURATION = 480 * 60  # limit of long-running recognition of audio in Cloud Storage
+    MAX_PAYLOAD = None
+    CONCURRENCY = 32  # operations in flight
+    PIPELINE_DEPTH = 8
+    # upload, start and polling take seconds (the first poll comes after 1 s, then every 1.5 times longer),
+    # so the chunks are planned longer than the synchronous limit from the first run on
+    LATENCY_MODEL = (5.0, 0.3)
+
+    # deadline of an operation, its processing time grows with the audio
+    OPERATION_TIMEOUT = 600  # secs, besides the audio
+    OPERATION_TIMEOUT_FACTOR = 2.0  # secs per sec of audio
+
+    OBJECT_PREFIX = 'skripta/'
+
+    def open(self):
+        super().open()
+
+        # uploaded audio not deleted yet, removed by close if its operation is still running
+        self.objects = set()
+        self.objectsLock = threading.Lock()
+
+        try:
+            self.client = GoogleCloudClient(self.API.__str__(), self.environment["GOOGLE_CLOUD_CREDS"],
+                                            self.environment["GOOGLE_CLOUD_BUCKET"],
+                                            self.environment.get("GOOGLE_CLOUD_ENDPOINT"),
+                                            self.environment.get("GOOGLE_STORAGE_ENDPOINT"), self.TIMEOUT,
+                                            int(self.environment.get("REQUEST_RETRIES", HttpClient.DEFAULT_RETRIES)))
+        except ValueError as e:
+            raise ValueError('Google Cloud: ' + e.__str__())
+
+    def getConfig(self, audio: sr.AudioData):
+        """
+        :param audio: Audio to recognize
+        :return: Recognition config of the request, as in the synchronous recognition.
+        """
+
+        config = {'encoding': 'FLAC', 'sampleRateHertz': audio.sample_rate, 'languageCode': self.options.language,
+                  'enableWordTimeOffsets': True}
+        if self.options.phrases is not None:
+            config['speechContexts'] = [{'phrases': list(self.options.phrases)}]
+
+        return config
+
+    def submit(self, recognizer: sr.Recognizer, audio: sr.AudioData):
+        """
+        Uploads the audio and starts the operation, waiting while the backend's concurrency limit is reached.
+        :param recognizer: A recognizer instance, not used
+        :param audio: Audio to recognize
+        :return: Future of the tuple (text, confidence, words), resolved by the poller.
+        @:raises:
+            RequestError, socket.timeout: if the audio cannot be uploaded or the operation started
+        """
+
+        semaphore = self.getSemaphore()
+        semaphore.acquire()
+
+        startTime = time.monotonic()
+        name = self.OBJECT_PREFIX + uuid.uuid4().hex + '.flac'
+        uri = None
+
+        try:
+            with self.objectsLock:
+                self.objects.add(name)
+
+            uri = self.client.upload(name, audio.get_flac_data(convert_width=2), 'audio/flac')
+            operation = self.client.startRecognition(self.getConfig(audio), uri)
+
+        except (sr.RequestError, socket.timeout) as e:
+            semaphore.release()
+            self.report(audio, startTime, e)
+            if uri is not None:
+                self.deleteObject(name)
+            else:
+                with self.objectsLock:
+                    self.objects.discard(name)
+            raise
+
+        def finish(done: Future):
+            semaphore.release()
+            if not done.cancelled():
+                self.report(audio, startTime, done.exception())
+
+        future = Future()
+        future.add_done_callback(finish)
+
+        POLLER.add(lambda: self.pollOperation(operation), future, self.getOperationTimeout(audio),
+                   lambda: self.deleteObject(name))
+
+        return future
+
+    def getOperationTimeout(self, audio: sr.AudioData):
+        """
+        :param audio: Recognized audio
+        :return: Time limit of the audio's operation in secs.
+        """
+
+        return self.OPERATION_TIMEOUT + self.OPERATION_TIMEOUT_FACTOR * self.getDuration(audio)
+
+    def deleteObject(self, name: str):
+        """
+        Deletes the uploaded audio, unless it is already deleted. A failure only leaves the object in the bucket.
+        :param name: Name of the object
+        :return:
+        """
+
+        with self.objectsLock:
+            if name not in self.objects:
+                return
+            self.objects.remove(name)
+
+        try:
+            self.client.delete(name)
+        except (sr.RequestError, socket.timeout):
+            pass
+
+    def pollOperation(self, name: str):
+        """
+        :param name: Name of the operation
+        :return: None while the operation runs, the tuple (text, confidence, words) when it is done.
+        @:raises:
+            RequestError: if the operation failed
+            UnknownValueError: if there is no transcription in the response
+        """
+
+        operation = self.client.getOperation(name)
+        if not operation.get('done'):
+            return None
+
+        if 'error' in operation:
+            raise sr.RequestError('recognition operation failed: ' + operation['error'].get('message', ''))
+
+        return self.parseResult(operation.get('response', {}))
+
+    def recognize(self, recognizer: sr.Recognizer, audio: sr.AudioData):
+        # the concurrency limit is held by submit, for the whole operation
+        return self.submit(recognizer, audio).result()
+
+    def close(self):
+        # running operations of a cancelled or failed job are abandoned; their audio is deleted now,
+        # the worker exits before the poller would get to it
+        with self.objectsLock:
+            names = list(self.objects)
+
+        for name in names:
+            self.deleteObject(name)
+
+        self.client.close()
@@ -0,0 +1,54 @@
+import json
+
+import speech_recognition as sr
+
+from src.Model.Backends.RecognitionBackend import RecognitionBackend
+from src.Model.Enums.API import API
+from src.Model.Pipeline.Transcript import Word
+
+
+class GoogleCloudBackend(RecognitionBackend):
+    """
+    Google Cloud Speech API, synchronous recognition.
+    """
+
+    API = API.GOOGLE_CLOUD
+    CREDENTIALS = ("GOOGLE_CLOUD_CREDS",)
+
+    SUPPORTS_PHRASES = True
+
+    MAX_REQUEST_DURATION = 60  # limits of synchronous recognition
+    MAX_PAYLOAD = 10 * 1024 * 1024
+    CONCURRENCY = 8
+
+    def request(self, recognizer: sr.Recognizer, audio: sr.AudioData):
+        creds = json.dumps(self.environment["GOOGLE_CLOUD_CREDS"])
+        response = recognizer.recognize_google_cloud(audio, creds, self.options.language, self.options.phrases,
+                                                     show_all=True)
+
+        return self.parseResult(response)
+
+    @staticmethod
+    def parseResult(response: dict):
+        """
+        :param response: Google Cloud Speech API's response (show_all=True)
+        :return: Tuple (text, confidence, words), confidence is the average of all results' confidences
+        @:raises:
+            UnknownValueError: if there is no transcription in the response
+        """
+
+        results = [result['alternatives'][0] for result in response.get('results', []) if result.get('alternatives')]
+        if not results:
+            raise sr.UnknownValueError()
+
+        text = ' '.join(alternative['transcript'].strip() for alternative in results)
+
+        confidences = [alternative['confidence'] for alternative in results if 'confidence' in alternative]
+        confidence = sum(confidences) / len(confidences) if confidences else None
+
+        # present only if word time offsets were requested
+        words = [Word(word['word'], float(word['startTime'].rstrip('s')), float(word['endTime'].rstrip('s')),
+                      word.get('confidence'))
+                 for alternative in results for word in alternative.get('words', [])]
+
+        return (text, confidence, words)
@@ -0,0 +1,60 @@
+import speech_recognition as sr
+
+from src.Model.Backends.RecognitionBackend import RecognitionBackend
+from src.Model.Backends.WebClients import HttpClient, HoundifyWebClient
+from src.Model.Enums.API import API
+
+
+class HoundifyBackend(RecognitionBackend):
+    """
+    Houndify speech API.
+    Requests go through speech_recognition, or through the own HTTP client if "HOUNDIFY_ENDPOINT" is set in env.json
+    (i.e. to the local stand-in server).
+    """
+
+    API = API.HOUNDIFY
+    CREDENTIALS = ("HOUNDIFY_CLIENT_ID", "HOUNDIFY_CLIENT_KEY")
+
+    MAX_REQUEST_DURATION = 30  # voice queries, long audio is cut short
+    CONCURRENCY = 2
+
+    def open(self):
+        super().open()
+
+        self.client = None
+        endpoint = self.environment.get("HOUNDIFY_ENDPOINT")
+        if endpoint:
+            self.client = HoundifyWebClient(self.API.__str__(), endpoint, self.TIMEOUT,
+                                            int(self.environment.get("REQUEST_RETRIES", HttpClient.DEFAULT_RETRIES)))
+
+    def request(self, recognizer: sr.Recognizer, audio: sr.AudioData):
+        clientID = self.environment["HOUNDIFY_CLIENT_ID"]
+        clientKey = self.environment["HOUNDIFY_CLIENT_KEY"]
+
+        if self.client is not None:
+            response = self.client.recognize(audio, clientID, clientKey)
+        else:
+            response = recognizer.recognize_houndify(audio, clientID, clientKey, show_all=True)
+
+        return self.parseResult(response)
+
+    @staticmethod
+    def parseResult(response: dict):
+        """
+        :param response: Houndify API's response (show_all=True)
+        :return: Tuple (text, confidence, words)
+        @:raises:
+            UnknownValueError: if there is no transcription in the response
+        """
+
+        choices = response.get('Disambiguation', {}).get('ChoiceData') or [{}]
+        text = choices[0].get('Transcription')
+        if not text:
+            raise sr.UnknownValueError()
+
+        return (text, choices[0].get('ConfidenceScore'), [])
+
+    def close(self):
+        if getattr(self, 'client', None) is not None:
+            self.client.close()
+            self.client = None
@@ -0,0 +1,193 @@
+import hashlib
+import random
+import socket
+import threading
+import time
+
+import speech_recognition as sr
+
+from src.Model.Backends.RecognitionBackend import RecognitionBackend
+from src.Model.Enums.API import API
+from src.Model.Pipeline.Transcript import Word
+
+
+class MockBackend(RecognitionBackend):
+    """
+    Offline stand-in for a recognition service, for load testing the pipeline (concurrency, backpressure, retries,
+    caching) without network access or a Sphinx install.
+    Transcripts are deterministic (derived from the audio's content), latencies and failures are random
+    but reproducible for a given seed and order of requests.
+
+    Configuration is the "MOCK" object in env.json, all keys are optional:
+    {
+        "latency": {"distribution": "lognormal", "median": 0.3, "sigma": 0.5},
+        "realTimeFactor": 0.05,        # latency added per second of audio
+        "errorRate": 0.0,              # share of requests failing with RequestError
+        "timeoutRate": 0.0,            # share of requests failing with socket.timeout (after the latency)
+        "unintelligibleRate": 0.0,     # share of requests with no transcript
+        "seed": 0
+    }
+    Latency distributions: constant (value), uniform (low, high), normal (mean, sigma),
+    lognormal (median, sigma), exponential (mean). Sampled latencies are never negative.
+    """
+
+    API = API.MOCK
+    LOCAL = True
+    CONCURRENCY = 64
+
+    DEFAULTS = {
+        'latency': {'distribution': 'lognormal', 'median': 0.3, 'sigma': 0.5},
+        'realTimeFactor': 0.05,
+        'errorRate': 0.0,
+        'timeoutRate': 0.0,
+        'unintelligibleRate': 0.0,
+        'seed': 0,
+    }
+
+    DISTRIBUTIONS = ('constant', 'uniform', 'normal', 'lognormal', 'exponential')
+    RATES = ('errorRate', 'timeoutRate', 'unintelligibleRate')
+
+    WORDS_PER_SECOND = 2.5
+
+    VOCABULARY = (
+        'dobar', 'dan', 'danas', 'govorimo', 'o', 'tome', 'kako', 'je', 'i', 'u', 'na', 'za', 'da', 'se', 'to',
+        'ovo', 'vrlo', 'važno', 'pitanje', 'odgovor', 'primjer', 'sastanak', 'projekt', 'rezultat', 'vrijeme',
+        'test', 'sustav', 'zvuk', 'govor', 'tekst', 'hvala', 'molim', 'dalje', 'sada', 'zatim', 'ukratko',
+    )
+
+    def __init__(self, options=None, environment: dict = None):
+        """
+        Constructor method.
+        :param options: Recognizer.CommonOptions of the transcription, not used
+        :param environment: Environmental variables, the "MOCK" object configures the backend
+        @:raises:
+            ValueError: if the configuration is invalid
+        """
+
+        super().__init__(options, environment or {})
+
+        self.config = dict(self.DEFAULTS, **(self.environment.get("MOCK") or {}))
+        self.checkConfig(self.config)
+
+        self.random = random.Random(self.config['seed'])
+        self.lock = threading.Lock()
+
+    @classmethod
+    def checkConfig(cls, config: dict):
+        """
+        Checks the configuration, so an invalid one fails when the backend is created, not on the first request.
+        :param config: Configuration merged with the defaults
+        :return:
+        @:raises:
+            ValueError: if the configuration is invalid
+        """
+
+        latency = config['latency']
+        if not isinstance(latency, dict):
+            raise ValueError('MOCK.latency must be an object')
+
+        distribution = latency.get('distribution', 'constant')
+        if distribution not in cls.DISTRIBUTIONS:
+            raise ValueError('unknown MOCK latency distribution: ' + str(distribution) +
+                             ', expected one of: ' + ', '.join(cls.DISTRIBUTIONS))
+
+        for name, value in latency.items():
+            if name != 'distribution' and (not isinstance(value, (int, float)) or value < 0):
+                raise ValueError('MOCK.latency.' + name + ' must be a non-negative number')
+
+        if distribution == 'exponential' and latency.get('mean', 0.3) <= 0:
+            raise ValueError('MOCK.latency.mean must be positive for the exponential distribution')
+
+        if not isinstance(config['realTimeFactor'], (int, float)) or config['realTimeFactor'] < 0:
+            raise ValueError('MOCK.realTimeFactor must be a non-negative number')
+
+        for name in cls.RATES:
+            if not isinstance(config[name], (int, float)) or not 0 <= config[name] <= 1:
+                raise ValueError('MOCK.' + name + ' must be a number between 0 and 1')
+
+        if sum(config[name] for name in cls.RATES) > 1:
+            raise ValueError('MOCK rates must not add up to more than 1')
+
+    def sampleLatency(self, duration: float):
+        """
+        :param duration: Duration of the request's audio in secs
+        :return: Latency of the request in secs.
+        """
+
+        latency = self.config['latency']
+        distribution = latency.get('distribution', 'constant')
+
+        with self.lock:
+            if distribution == 'constant':
+                value = latency.get('value', 0)
+            elif distribution == 'uniform':
+                value = self.random.uniform(latency.get('low', 0), latency.get('high', 1))
+            elif distribution == 'normal':
+                value = self.random.gauss(latency.get('mean', 0.3), latency.get('sigma', 0.1))
+            elif distribution == 'lognormal':
+                value = self.random.lognormvariate(0, latency.get('sigma', 0.5)) * latency.get('median', 0.3)
+            else:
+                value = self.random.expovariate(1 / latency.get('mean', 0.3))
+
+        return max(value, 0) + self.config['realTimeFactor'] * duration
+
+    def sampleOutcome(self):
+        """
+        :return: 'error', 'timeout', 'unintelligible' or 'success', by the configured rates.
+        """
+
+        with self.lock:
+            draw = self.random.random()
+
+        for outcome in ('error', 'timeout', 'unintelligible'):
+            rate = self.config[outcome + 'Rate']
+            if draw < rate:
+                return outcome
+            draw -= rate
+
+        return 'success'
+
+    @classmethod
+    def getTranscript(cls, data: bytes, duration: float):
+        """
+        :param data: Recognized audio, in any encoding
+        :param duration: Duration of the audio in secs
+        :return: Tuple (text, confidence, words) derived from the audio's content, so the same audio
+                 always gets the same transcript.
+        """
+
+        generator = random.Random(hashlib.sha1(data).digest())
+        count = max(int(duration * cls.WORDS_PER_SECOND), 1)
+        step = duration / count
+
+        words = [Word(generator.choice(cls.VOCABULARY), round(index * step, 3), round((index + 1) * step, 3),
+                      round(generator.uniform(0.75, 0.99), 3))
+                 for index in range(count)]
+        confidence = round(sum(word.confidence for word in words) / count, 3)
+
+        return (' '.join(word.text for word in words), confidence, words)
+
+    def request(self, recognizer: sr.Recognizer, audio: sr.AudioData):
+        """
+        Simulates a recognition request: waits for the sampled latency, then fails or returns the transcript.
+        :param recognizer: A recognizer instance, not used
+        :param audio: Audio to recognize
+        :return: Tuple (text, confidence, words), word timings relative to the beginning of the audio.
+        @:raises:
+            RequestError, socket.timeout, UnknownValueError: by the configured rates
+        """
+
+        data = audio.get_raw_data()
+        duration = len(data) / (audio.sample_rate * audio.sample_width)
+        outcome = self.sampleOutcome()
+
+        time.sleep(self.sampleLatency(duration))
+
+        if outcome == 'error':
+            raise sr.RequestError('mock: simulated request failure')
+        if outcome == 'timeout':
+            raise socket.timeout('mock: simulated timeout')
+        if outcome == 'unintelligible':
+            raise sr.UnknownValueError()
+
+        return self.getTranscript(data, duration)
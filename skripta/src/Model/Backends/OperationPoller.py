@@ -0,0 +1,122 @@
+import heapq
+import itertools
+import socket
+import threading
+import time
+
+import speech_recognition as sr
+
+from concurrent.futures import Future
+from typing import Callable
+
+
+class OperationPoller:
+    """
+    Polls the status of long-running operations in a single background thread, shared by all jobs of the process,
+    so waiting for an operation does not hold a worker thread. Each operation resolves a future.
+    Operations are polled with a growing interval, the earliest due first.
+    """
+
+    INTERVAL = 1.0  # delay of the first poll in secs
+    MAX_INTERVAL = 15.0
+    BACKOFF = 1.5
+
+    def __init__(self):
+        """
+        Constructor method, the polling thread is started with the first operation.
+        """
+
+        self.queue = []  # heap of (due time, sequence number, operation)
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def add(self, poll: Callable[[], object], future: Future, deadline: float, cleanup: Callable[[], None] = None):
+        """
+        Adds an operation.
+        :param poll: Callable checking the operation, returns None while it runs and its result when it is done,
+                     raises an exception if it failed
+        :param future: Future resolved by the operation's result (or exception), polling stops if it is cancelled
+        :param deadline: Time limit of the operation in secs, it fails with socket.timeout after it
+        :param cleanup: Callable called once the operation is finished, failed or cancelled
+        :return:
+        """
+
+        operation = {'poll': poll, 'future': future, 'deadline': time.monotonic() + deadline, 'cleanup': cleanup,
+                     'interval': self.INTERVAL}
+
+        with self.condition:
+            heapq.heappush(self.queue, (time.monotonic() + self.INTERVAL, next(self.sequence), operation))
+
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='operation-poller', daemon=True)
+                self.thread.start()
+
+            self.condition.notify()
+
+    def run(self):
+        """
+        Polls the due operations until the process exits.
+        :return:
+        """
+
+        while True:
+            with self.condition:
+                while not self.queue or self.queue[0][0] > time.monotonic():
+                    self.condition.wait(self.queue[0][0] - time.monotonic() if self.queue else None)
+
+                _, _, operation = heapq.heappop(self.queue)
+
+            if self.pollOperation(operation):
+                self.finish(operation)
+                continue
+
+            with self.condition:
+                operation['interval'] = min(operation['interval'] * self.BACKOFF, self.MAX_INTERVAL)
+                heapq.heappush(self.queue, (time.monotonic() + operation['interval'], next(self.sequence), operation))
+
+    def pollOperation(self, operation: dict):
+        """
+        :param operation: The polled operation
+        :return: True if the operation is finished (or its future cancelled), False if it still runs.
+        """
+
+        future = operation['future']
+        if future.cancelled():
+            return True
+
+        try:
+            result = operation['poll']()
+            if result is None and time.monotonic() < operation['deadline']:
+                return False
+
+            if result is None:
+                raise socket.timeout('operation did not finish in time')
+
+        except Exception as e:
+            # any failure fails only the operation, the poller keeps running
+            if future.set_running_or_notify_cancel():
+                future.set_exception(e)
+            return True
+
+        if future.set_running_or_notify_cancel():
+            future.set_result(result)
+        return True
+
+    @staticmethod
+    def finish(operation: dict):
+        """
+        Runs the operation's cleanup, whose failure only leaves the resources behind.
+        :param operation: The finished operation
+        :return:
+        """
+
+        if operation['cleanup'] is not None:
+            try:
+                operation['cleanup']()
+            except (sr.RequestError, socket.timeout):
+                pass
+
+
+# poller shared by all backends of the process
+POLLER = OperationPoller()
@@ -0,0 +1,200 @@
+import concurrent.futures
+import time
+
+import speech_recognition as sr
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List
+
+from src.Model.Backends.RecognitionBackend import RecognitionBackend
+from src.Model.Enums.BackendPolicy import BackendPolicy
+
+
+class PolicyBackend(RecognitionBackend):
+    """
+    Combines several backends on every request, so a failing or slow service does not fail the job.
+
+    With the fallback policy, the backends are tried in the given order until one of them succeeds,
+    i.e. Google first and offline Sphinx when Google fails. With the race policy, the audio is sent to all of them
+    (each one after the hedge delay, if the earlier ones have not answered by then) and the first success wins;
+    the other requests are abandoned. An unintelligible result counts as a failure, so the next backend gets a chance.
+
+    Every request of a member backend is reported to the listener under the member's API, once the policy decides:
+    the failures of the members are reported as failures only when all of them failed, the failed and the still
+    running requests besides a success are reported as abandoned.
+    """
+
+    CHECK_INTERVAL = 0.5  # secs between checks of a cancelled request
+
+    def __init__(self, backends: List[RecognitionBackend], policy: BackendPolicy, hedgeDelay: float = 0):
+        """
+        Constructor method.
+        :param backends: Member backends (not yet opened), in the order of preference
+        :param policy: How the members are combined
+        :param hedgeDelay: Race only, delay in secs before the request is sent to the next backend too,
+                           0 to send it to all of them at once
+        """
+
+        super().__init__(backends[0].options, backends[0].environment)
+
+        self.backends = backends
+        self.policy = policy
+        self.hedgeDelay = hedgeDelay
+
+        self.API = backends[0].API
+        self.PIPELINE_DEPTH = max(backend.PIPELINE_DEPTH for backend in backends)
+
+        self.requestExecutor = None  # runs the policy of each request
+        self.attemptExecutor = None  # runs the members' requests
+
+    def open(self):
+        opened = []
+
+        try:
+            for backend in self.backends:
+                # the members' requests are reported by the policy
+                backend.listener = None
+                backend.open()
+                opened.append(backend)
+
+        except ValueError as e:
+            for backend in opened:
+                backend.close()
+            raise ValueError(backend.API.__str__() + ': ' + e.__str__())
+
+        self.requestExecutor = ThreadPoolExecutor(self.PIPELINE_DEPTH, 'policy')
+        self.attemptExecutor = ThreadPoolExecutor(self.PIPELINE_DEPTH * len(self.backends), 'policy-attempt')
+
+    def submit(self, recognizer: sr.Recognizer, audio: sr.AudioData):
+        """
+        Starts the request by the policy.
+        :param recognizer: A recognizer instance
+        :param audio: Audio to recognize
+        :return: Future of the tuple (text, confidence, words) of the winning backend, cancelling it abandons
+                 the members' requests. If all members fail, the primary backend's error is raised,
+                 unless one of them found the speech unintelligible.
+        """
+
+        future = Future()
+        self.requestExecutor.submit(self.run, recognizer, audio, future)
+
+        return future
+
+    def recognize(self, recognizer: sr.Recognizer, audio: sr.AudioData):
+        # the members hold their own concurrency limits
+        return self.submit(recognizer, audio).result()
+
+    def run(self, recognizer: sr.Recognizer, audio: sr.AudioData, future: Future):
+        """
+        Sends the audio to the members by the policy, until one of them succeeds or all of them fail.
+        :param recognizer: A recognizer instance
+        :param audio: Audio to recognize
+        :param future: Future resolved by the result
+        :return:
+        """
+
+        waiting = list(self.backends)
+        attempts = {}  # running attempt -> (member, start time, list with the member's future, once submitted)
+        failures = []  # (member, latency, error) of the failed attempts
+        nextStart = 0
+
+        try:
+            while waiting or attempts:
+                if future.cancelled():
+                    return
+
+                # fallback starts the next member only when the previous one failed, race when the delay passes
+                if waiting and (not attempts or self.policy == BackendPolicy.RACE and time.monotonic() >= nextStart):
+                    backend = waiting.pop(0)
+                    submitted = []
+                    attempt = self.attemptExecutor.submit(self.attempt, backend, recognizer, audio, submitted)
+                    attempts[attempt] = (backend, time.monotonic(), submitted)
+                    nextStart = time.monotonic() + self.hedgeDelay
+                    continue
+
+                timeout = self.CHECK_INTERVAL
+                if waiting and self.policy == BackendPolicy.RACE:
+                    timeout = min(max(nextStart - time.monotonic(), 0), timeout)
+
+                done, _ = concurrent.futures.wait(attempts, timeout, concurrent.futures.FIRST_COMPLETED)
+
+                for attempt in done:
+                    backend, startTime, _ = attempts.pop(attempt)
+
+                    try:
+                        result = attempt.result()
+                    except Exception as e:
+                        # any failure of a member fails only its attempt
+                        failures.append((backend, time.monotonic() - startTime, e))
+                        continue
+
+                    self.reportMember(backend, audio, time.monotonic() - startTime)
+                    if future.set_running_or_notify_cancel():
+                        future.set_result(result)
+                    return
+
+            # all members failed
+            errors = [error for _, _, error in failures]
+            for backend, latency, error in failures:
+                self.reportMember(backend, audio, latency, error)
+            failures = []
+
+            if future.set_running_or_notify_cancel():
+                unknown = [error for error in errors if isinstance(error, sr.UnknownValueError)]
+                future.set_exception(unknown[0] if unknown else errors[0])
+
+        except Exception as e:
+            # i.e. the executor is already shut down
+            if not future.done():
+                future.set_exception(e)
+
+        finally:
+            # the losing requests are abandoned
+            for backend, latency, _ in failures:
+                self.reportMember(backend, audio, latency, abandoned=True)
+
+            for attempt, (backend, startTime, submitted) in attempts.items():
+                attempt.cancel()
+                for memberFuture in submitted:
+                    memberFuture.cancel()
+                self.reportMember(backend, audio, time.monotonic() - startTime, abandoned=True)
+
+    def reportMember(self, backend: RecognitionBackend, audio: sr.AudioData, latency: float,
+                     error: Exception = None, abandoned: bool = False):
+        """
+        Reports a member's request to the listener.
+        :param backend: The member backend
+        :param audio: Audio of the request
+        :param latency: Latency of the request in secs
+        :param error: Exception the request failed with, None if it succeeded or was abandoned
+        :param abandoned: The request's outcome was not needed
+        :return:
+        """
+
+        if self.listener is not None:
+            self.listener(backend.API, self.getDuration(audio), latency, error, abandoned=abandoned)
+
+    @staticmethod
+    def attempt(backend: RecognitionBackend, recognizer: sr.Recognizer, audio: sr.AudioData, submitted: list):
+        """
+        Makes the request of a member.
+        :param backend: The member backend
+        :param recognizer: A recognizer instance
+        :param audio: Audio to recognize
+        :param submitted: List receiving the member's future, so it can be cancelled
+        :return: Tuple (text, confidence, words), see RecognitionBackend.recognize
+        """
+
+        memberFuture = backend.submit(recognizer, audio)
+        submitted.append(memberFuture)
+
+        return memberFuture.result()
+
+    def close(self):
+        # running requests are not waited for, their results are dropped
+        for executor in (self.requestExecutor, self.attemptExecutor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        for backend in self.backends:
+            backend.close()
@@ -0,0 +1,195 @@
+import socket
+import threading
+import time
+
+import speech_recognition as sr
+
+from concurrent.futures import Future
+
+
+class RecognitionBackend:
+    """
+    Base class of recognition backends. A backend declares its capabilities as class attributes,
+    gets its credentials and options from env.json and the transcription options, and owns its resources
+    (connections, decoders) between open() and close().
+
+    Requests of all instances of a backend in the process share the backend's concurrency limit,
+    so parallel jobs (i.e. in the transcription server) do not exceed the service's quota.
+    """
+
+    API = None
+
+    CREDENTIALS = ()  # env.json keys the backend needs
+    LOCAL = False  # runs on this machine, no requests are made
+
+    SUPPORTS_PHRASES = False
+    SUPPORTS_GRAMMAR = False
+    STREAMING = False
+
+    MAX_REQUEST_DURATION = None  # longest audio accepted by one request in secs, None if unlimited
+    MAX_PAYLOAD = None  # largest request body in bytes, None if unlimited
+    SAMPLE_RATE = 16000  # preferred sample format of the audio
+    SAMPLE_WIDTH = 2
+    CONCURRENCY = 4  # requests made at once by all jobs of the process
+    PIPELINE_DEPTH = 1  # requests of a job in flight at once, more than one only for asynchronous backends
+    LATENCY_MODEL = None  # (overhead, cost) of a request assumed until it is measured, see ChunkPlanner
+
+    TIMEOUT = 1800  # request timeout in secs
+
+    semaphores = {}
+    semaphoresLock = threading.Lock()
+
+    def __init__(self, options, environment: dict):
+        """
+        Constructor method.
+        :param options: Recognizer.CommonOptions of the transcription (language, phrases, grammar)
+        :param environment: Environmental variables from env.json
+        """
+
+        self.options = options
+        self.environment = environment
+
+        # called with (api, audio duration, latency, error) after every request made by submit, error is None on success;
+        # a combining backend passes abandoned=True for the requests whose outcome was not needed
+        self.listener = None
+
+    @classmethod
+    def getCapabilities(cls):
+        """
+        :return: JSON serializable description of the backend's capabilities.
+        """
+
+        return {
+            'local': cls.LOCAL,
+            'phrases': cls.SUPPORTS_PHRASES,
+            'grammar': cls.SUPPORTS_GRAMMAR,
+            'streaming': cls.STREAMING,
+            'maxRequestDuration': cls.MAX_REQUEST_DURATION,
+            'maxPayload': cls.MAX_PAYLOAD,
+            'sampleRate': cls.SAMPLE_RATE,
+            'sampleWidth': cls.SAMPLE_WIDTH,
+            'concurrency': cls.CONCURRENCY,
+            'pipelineDepth': cls.PIPELINE_DEPTH,
+        }
+
+    @staticmethod
+    def getDuration(audio: sr.AudioData):
+        """
+        :param audio: Audio data
+        :return: Duration of the audio in secs.
+        """
+
+        return len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+
+    @classmethod
+    def getSemaphore(cls):
+        """
+        :return: Semaphore limiting the backend's concurrent requests, shared by all its instances.
+        """
+
+        with RecognitionBackend.semaphoresLock:
+            if cls not in RecognitionBackend.semaphores:
+                RecognitionBackend.semaphores[cls] = threading.BoundedSemaphore(cls.CONCURRENCY)
+            return RecognitionBackend.semaphores[cls]
+
+    def open(self):
+        """
+        Checks the credentials and acquires the backend's resources.
+        @:raises:
+            ValueError: if the credentials or the configuration are missing or invalid
+        :return:
+        """
+
+        missing = [key for key in self.CREDENTIALS if not self.environment.get(key)]
+        if missing:
+            raise ValueError('missing credentials in env.json: ' + ', '.join(missing))
+
+    def recognize(self, recognizer: sr.Recognizer, audio: sr.AudioData):
+        """
+        Makes a recognition request, waiting while the backend's concurrency limit is reached.
+        :param recognizer: A recognizer instance
+        :param audio: Audio to recognize
+        :return: Tuple (text, confidence, words), where confidence may be None and words may be empty,
+                 depending on what the API supplies. Word timings are relative to the beginning of the audio.
+        @:raises:
+            RequestError: if the credentials are invalid, there are internet connection issues or if the engine was not installed properly
+            UnknownValueError: if the speech recognition process failed due to speech being unintelligible
+            AssertionError: if the api request arguments are not of expected type
+            socket.timeout: if the request takes more than half an hour to retrieve result
+        """
+
+        with self.getSemaphore():
+            return self.request(recognizer, audio)
+
+    def submit(self, recognizer: sr.Recognizer, audio: sr.AudioData):
+        """
+        Starts a recognition request, so the job can go on with the next audio while it runs.
+        By default, the blocking request is made in a daemon thread, so a cancelled job can stop waiting for it
+        at once, and the worker's exit does not wait for it either.
+        :param recognizer: A recognizer instance
+        :param audio: Audio to recognize
+        :return: Future of the tuple (text, confidence, words), see recognize. Cancelling it abandons the request.
+        @:raises:
+            RequestError, AssertionError, socket.timeout: if the request cannot be started
+        """
+
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+
+            startTime = time.monotonic()
+
+            try:
+                result = self.recognize(recognizer, audio)
+            except (sr.RequestError, sr.UnknownValueError, AssertionError, socket.timeout) as e:
+                self.report(audio, startTime, e)
+                future.set_exception(e)
+            except Exception as e:
+                # the waiting job gets any other failure too
+                future.set_exception(e)
+            else:
+                self.report(audio, startTime)
+                future.set_result(result)
+
+        threading.Thread(target=run, name='request', daemon=True).start()
+
+        return future
+
+    def report(self, audio: sr.AudioData, startTime: float, error: Exception = None):
+        """
+        Reports a finished request to the listener.
+        :param audio: Audio of the request
+        :param startTime: Start of the request (time.monotonic)
+        :param error: Exception the request failed with, None if it succeeded
+        :return:
+        """
+
+        if self.listener is not None:
+            self.listener(self.API, self.getDuration(audio), time.monotonic() - startTime, error)
+
+    def request(self, recognizer: sr.Recognizer, audio: sr.AudioData):
+        """
+        Makes the recognition request, see recognize.
+        :param recognizer: A recognizer instance
+        :param audio: Audio to recognize
+        :return: Tuple (text, confidence, words)
+        """
+
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Releases the backend's resources.
+        :return:
+        """
+
+        pass
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
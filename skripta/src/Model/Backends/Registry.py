@@ -0,0 +1,54 @@
+from src.Model.Backends.GoogleBackend import GoogleBackend
+from src.Model.Backends.GoogleCloudAsyncBackend import GoogleCloudAsyncBackend
+from src.Model.Backends.GoogleCloudBackend import GoogleCloudBackend
+from src.Model.Backends.HoundifyBackend import HoundifyBackend
+from src.Model.Backends.MockBackend import MockBackend
+from src.Model.Backends.RecognitionBackend import RecognitionBackend
+from src.Model.Backends.SphinxBackend import SphinxBackend
+from src.Model.Enums.API import API
+
+
+# backend class of each API
+BACKENDS = {backend.API: backend for backend in
+            (GoogleBackend, GoogleCloudBackend, SphinxBackend, HoundifyBackend, MockBackend, GoogleCloudAsyncBackend)}
+
+
+def registerBackend(backendClass: type):
+    """
+    Registers a backend, replacing the previous backend of its API. Usable as a class decorator.
+    :param backendClass: RecognitionBackend subclass
+    :return: The registered class.
+    """
+
+    if not issubclass(backendClass, RecognitionBackend) or not isinstance(backendClass.API, API):
+        raise TypeError('backend must be a RecognitionBackend subclass with an API')
+
+    BACKENDS[backendClass.API] = backendClass
+    return backendClass
+
+
+def getBackendClass(api: API):
+    """
+    :param api: The API
+    :return: The API's backend class.
+    @:raises:
+        ValueError: if no backend is registered for the API
+    """
+
+    if api not in BACKENDS:
+        raise ValueError('no backend registered for API: ' + api.__str__())
+
+    return BACKENDS[api]
+
+
+def createBackend(api: API, options, environment: dict):
+    """
+    :param api: The API
+    :param options: Recognizer.CommonOptions of the transcription
+    :param environment: Environmental variables from env.json
+    :return: A new, not yet opened backend instance.
+    @:raises:
+        ValueError: if no backend is registered for the API
+    """
+
+    return getBackendClass(api)(options, environment)
@@ -0,0 +1,56 @@
+import os
+
+import speech_recognition as sr
+
+from src.Model.Backends.RecognitionBackend import RecognitionBackend
+from src.Model.Enums.API import API
+from src.Model.Pipeline.Transcript import Word
+
+
+class SphinxBackend(RecognitionBackend):
+    """
+    CMU Sphinx, offline recognition with PocketSphinx.
+    """
+
+    API = API.SPHINX
+    LOCAL = True
+
+    SUPPORTS_PHRASES = True
+    SUPPORTS_GRAMMAR = True
+
+    CONCURRENCY = os.cpu_count() or 1  # decoding is CPU bound
+
+    def request(self, recognizer: sr.Recognizer, audio: sr.AudioData):
+        decoder = recognizer.recognize_sphinx(audio, self.options.language, self.options.phrases,
+                                              self.options.grammar, show_all=True)
+
+        return self.parseResult(decoder)
+
+    @staticmethod
+    def parseResult(decoder):
+        """
+        :param decoder: PocketSphinx decoder after the decoding (show_all=True)
+        :return: Tuple (text, None, words) with word timings and posterior probabilities. The hypothesis' own
+                 probability is not a calibrated confidence (it stays 0 unless posteriors are computed),
+                 so the words' posteriors stand for the utterance's confidence
+        @:raises:
+            UnknownValueError: if nothing was recognized
+        """
+
+        hypothesis = decoder.hyp()
+        if hypothesis is None or not hypothesis.hypstr:
+            raise sr.UnknownValueError()
+
+        logMath = decoder.get_logmath()
+        framesPerSecond = 100  # decoder's default frame rate
+
+        words = []
+        for segment in decoder.seg():
+            # skip silence and filler words, strip pronunciation variants i.e. "word(2)"
+            if segment.word.startswith(('<', '[')):
+                continue
+
+            words.append(Word(segment.word.split('(')[0], segment.start_frame / framesPerSecond,
+                              (segment.end_frame + 1) / framesPerSecond, logMath.exp(segment.prob)))
+
+        return (hypothesis.hypstr, None, words)
@@ -0,0 +1,404 @@
+import base64
+import hashlib
+import hmac
+import http.client
+import json
+import random
+import socket
+import threading
+import time
+import uuid
+
+import speech_recognition as sr
+
+from urllib.parse import quote, urlencode, urlsplit
+
+from src.Model.Utils.Metrics import Metrics
+
+
+class HttpClient:
+    """
+    Minimal HTTP client for recognition endpoints, with persistent connections (one per thread)
+    and retries of throttled (429), failed (5xx) and dropped requests.
+    Unlike the urllib requests made by speech_recognition, the endpoint is configurable,
+    so the requests can be pointed to the local stand-in server (src/Model/standin.py).
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    DEFAULT_RETRIES = 3
+    MAX_BACKOFF = 30
+
+    def __init__(self, api: str, endpoint: str, timeout: float = None, retries: int = DEFAULT_RETRIES,
+                 backoff: float = 0.5):
+        """
+        Constructor method.
+        :param api: Name of the API, used in metrics
+        :param endpoint: URL of the endpoint, e.g. http://127.0.0.1:8010/speech-api/v2/recognize
+        :param timeout: Socket timeout in secs, None for no timeout
+        :param retries: Number of retries of a failed request
+        :param backoff: Delay before the first retry in secs, doubled for each further retry
+        """
+
+        url = urlsplit(endpoint)
+        if url.scheme not in ('http', 'https') or not url.hostname:
+            raise ValueError('invalid endpoint: ' + endpoint)
+
+        self.api = api
+        self.connectionClass = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self.host = url.hostname
+        self.port = url.port
+        self.path = url.path or '/'
+
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+        self.local = threading.local()
+        self.connections = []  # connections of all threads, closed by close
+        self.connectionsLock = threading.Lock()
+
+    def getConnection(self):
+        """
+        :return: The calling thread's connection to the endpoint's host.
+        """
+
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.connectionClass(self.host, self.port, timeout=self.timeout)
+            self.local.connection = connection
+            with self.connectionsLock:
+                self.connections.append(connection)
+
+        return connection
+
+    def resetConnection(self):
+        """
+        Closes the calling thread's connection, a new one is opened by the next request.
+        :return:
+        """
+
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+            with self.connectionsLock:
+                if connection in self.connections:
+                    self.connections.remove(connection)
+
+    def getDelay(self, attempt: int, retryAfter: str = None):
+        """
+        :param attempt: Number of the failed attempt, starting with 0
+        :param retryAfter: Value of the response's Retry-After header, if any
+        :return: Delay before the next attempt in secs, exponential with full jitter unless the server sets it.
+        """
+
+        if retryAfter is not None and retryAfter.isdigit():
+            return min(int(retryAfter), self.MAX_BACKOFF)
+
+        return random.uniform(0, min(self.backoff * 2 ** attempt, self.MAX_BACKOFF))
+
+    def post(self, query: dict, body: bytes, headers: dict):
+        """
+        Posts the body to the endpoint, retrying transient failures.
+        :param query: Query string parameters
+        :param body: Request body
+        :param headers: Request headers
+        :return: Response body.
+        @:raises:
+            RequestError: if the request fails, or still fails after all retries
+            socket.timeout: if the endpoint does not respond in time
+        """
+
+        return self.request('POST', '', query, body, headers)
+
+    def request(self, method: str, path: str, query: dict = None, body: bytes = None, headers: dict = None):
+        """
+        Makes a request, retrying transient failures.
+        :param method: HTTP method
+        :param path: Path relative to the endpoint's path
+        :param query: Query string parameters
+        :param body: Request body
+        :param headers: Request headers
+        :return: Response body.
+        @:raises:
+            RequestError: if the request fails, or still fails after all retries
+            socket.timeout: if the endpoint does not respond in time
+        """
+
+        path = (self.path.rstrip('/') + path or '/') + ('?' + urlencode(query) if query else '')
+
+        for attempt in range(self.retries + 1):
+            retryAfter = None
+
+            try:
+                connection = self.getConnection()
+                connection.request(method, path, body, headers or {})
+                response = connection.getresponse()
+                content = response.read()
+
+                if 200 <= response.status < 300:
+                    return content
+
+                reason = response.status.__str__()
+                retryAfter = response.getheader('Retry-After')
+                if response.getheader('Connection', '').lower() == 'close':
+                    self.resetConnection()
+
+                if response.status not in self.RETRY_STATUSES:
+                    raise sr.RequestError('recognition request failed: {} {}'.format(response.status,
+                                                                                     response.reason))
+
+            except socket.timeout:
+                self.resetConnection()
+                raise
+
+            except (http.client.HTTPException, ConnectionError) as e:
+                # dropped connection, or a kept-alive connection closed by the server
+                self.resetConnection()
+                reason = type(e).__name__
+
+            except OSError as e:
+                self.resetConnection()
+                raise sr.RequestError('recognition connection failed: ' + e.__str__())
+
+            if attempt == self.retries:
+                break
+
+            Metrics.retries.inc(api=self.api, reason=reason)
+            time.sleep(self.getDelay(attempt, retryAfter))
+
+        raise sr.RequestError('recognition request failed after {} retries: {}'.format(self.retries, reason))
+
+    def close(self):
+        """
+        Closes the connections of all threads, a later request opens a new one.
+        :return:
+        """
+
+        with self.connectionsLock:
+            connections = self.connections
+            self.connections = []
+            # the threads drop their closed connections
+            self.local = threading.local()
+
+        for connection in connections:
+            connection.close()
+
+
+class GoogleWebClient(HttpClient):
+    """
+    Client of the Google Speech API v2 endpoint, in the request format of Recognizer.recognize_google.
+    """
+
+    def recognize(self, audio: sr.AudioData, key: str, language: str):
+        """
+        :param audio: Audio to recognize
+        :param key: API key
+        :param language: Language of the audio
+        :return: The first non-empty result (as recognize_google with show_all=True), or an empty list.
+        @:raises:
+            RequestError, socket.timeout: see HttpClient.post
+        """
+
+        flacData = audio.get_flac_data(convert_rate=None if audio.sample_rate >= 8000 else 8000, convert_width=2)
+        headers = {'Content-Type': 'audio/x-flac; rate={}'.format(max(audio.sample_rate, 8000))}
+        query = {'client': 'chromium', 'lang': language, 'key': key, 'pFilter': 0}
+
+        response = self.post(query, flacData, headers).decode('utf8')
+
+        # one JSON object per line, the first one usually has an empty result
+        for line in response.split('\n'):
+            if not line:
+                continue
+            try:
+                result = json.loads(line)['result']
+            except (ValueError, KeyError):
+                raise sr.RequestError('invalid recognition response')
+            if result:
+                return result[0]
+
+        return []
+
+
+class HoundifyWebClient(HttpClient):
+    """
+    Client of the Houndify audio endpoint, in the request format of Recognizer.recognize_houndify.
+    """
+
+    def recognize(self, audio: sr.AudioData, clientID: str, clientKey: str):
+        """
+        :param audio: Audio to recognize
+        :param clientID: Houndify client ID
+        :param clientKey: Houndify client key (base64)
+        :return: The decoded response (as recognize_houndify with show_all=True).
+        @:raises:
+            RequestError, socket.timeout: see HttpClient.post
+        """
+
+        wavData = audio.get_wav_data(convert_rate=None if audio.sample_rate in (8000, 16000) else 16000,
+                                     convert_width=2)
+
+        userID, requestID = uuid.uuid4().__str__(), uuid.uuid4().__str__()
+        requestTime = int(time.time()).__str__()
+        signature = base64.urlsafe_b64encode(
+            hmac.new(base64.urlsafe_b64decode(clientKey), (userID + ';' + requestID + requestTime).encode('utf8'),
+                     hashlib.sha256).digest()).decode('utf8')
+
+        headers = {
+            'Content-Type': 'application/json',
+            'Hound-Request-Info': json.dumps({'ClientID': clientID, 'UserID': userID}),
+            'Hound-Request-Authentication': userID + ';' + requestID,
+            'Hound-Client-Authentication': ';'.join((clientID, requestTime, signature)),
+        }
+
+        try:
+            return json.loads(self.post({}, wavData, headers).decode('utf8'))
+        except ValueError:
+            raise sr.RequestError('invalid recognition response')
+
+
+class GoogleCloudClient:
+    """
+    Client of the Google Cloud Speech API's long-running recognition, with the audio staged in a Cloud Storage bucket.
+    Both endpoints are configurable, so the requests can be pointed to the local stand-in server.
+    """
+
+    SPEECH_ENDPOINT = 'https://speech.googleapis.com/v1'
+    STORAGE_ENDPOINT = 'https://storage.googleapis.com'
+    SCOPE = 'https://www.googleapis.com/auth/cloud-platform'
+
+    def __init__(self, api: str, credentials: dict, bucket: str, speechEndpoint: str = None,
+                 storageEndpoint: str = None, timeout: float = None, retries: int = HttpClient.DEFAULT_RETRIES):
+        """
+        Constructor method.
+        :param api: Name of the API, used in metrics
+        :param credentials: Service account credentials (the parsed JSON key file)
+        :param bucket: Name of the bucket the audio is uploaded to
+        :param speechEndpoint: URL of the Speech API, including the version
+        :param storageEndpoint: URL of the Cloud Storage API
+        :param timeout: Socket timeout in secs, None for no timeout
+        :param retries: Number of retries of a failed request
+        @:raises:
+            ValueError: if an endpoint is invalid, or the credentials cannot be used
+        """
+
+        self.speech = HttpClient(api, speechEndpoint or self.SPEECH_ENDPOINT, timeout, retries)
+        self.storage = HttpClient(api, storageEndpoint or self.STORAGE_ENDPOINT, timeout, retries)
+        self.bucket = bucket
+
+        self.credentials = self.loadCredentials(credentials)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def loadCredentials(info: dict):
+        """
+        :param info: Service account credentials
+        :return: google-auth credentials, or None if the info is not a service account key
+                 (i.e. the dummy credentials of the stand-in server, which does not check them).
+        @:raises:
+            ValueError: if the google-auth package is not installed, or the key is invalid
+        """
+
+        if not isinstance(info, dict) or 'private_key' not in info:
+            return None
+
+        try:
+            from google.oauth2 import service_account
+        except ImportError:
+            raise ValueError('long-running recognition requires the google-auth package')
+
+        return service_account.Credentials.from_service_account_info(info, scopes=[GoogleCloudClient.SCOPE])
+
+    def getHeaders(self, contentType: str):
+        """
+        :param contentType: Content type of the request body
+        :return: Request headers, with an access token refreshed when it expires.
+        @:raises:
+            RequestError: if the access token cannot be obtained
+        """
+
+        headers = {'Content-Type': contentType}
+
+        if self.credentials is not None:
+            from google.auth.exceptions import GoogleAuthError
+            from google.auth.transport.requests import Request
+
+            with self.lock:
+                try:
+                    if not self.credentials.valid:
+                        self.credentials.refresh(Request())
+                except GoogleAuthError as e:
+                    raise sr.RequestError('authorization failed: ' + e.__str__())
+
+                headers['Authorization'] = 'Bearer ' + self.credentials.token
+
+        return headers
+
+    def upload(self, name: str, data: bytes, contentType: str):
+        """
+        :param name: Name of the object
+        :param data: Content of the object
+        :param contentType: Content type of the object
+        :return: URI of the uploaded object (gs://bucket/name).
+        @:raises:
+            RequestError, socket.timeout: see HttpClient.request
+        """
+
+        self.storage.request('POST', '/upload/storage/v1/b/' + quote(self.bucket, safe='') + '/o',
+                             {'uploadType': 'media', 'name': name}, data, self.getHeaders(contentType))
+
+        return 'gs://' + self.bucket + '/' + name
+
+    def delete(self, name: str):
+        """
+        :param name: Name of the object to delete
+        :return:
+        @:raises:
+            RequestError, socket.timeout: see HttpClient.request
+        """
+
+        self.storage.request('DELETE', '/storage/v1/b/' + quote(self.bucket, safe='') + '/o/' + quote(name, safe=''),
+                             headers=self.getHeaders('application/json'))
+
+    def startRecognition(self, config: dict, uri: str):
+        """
+        :param config: Recognition config
+        :param uri: URI of the uploaded audio
+        :return: Name of the started operation.
+        @:raises:
+            RequestError, socket.timeout: see HttpClient.request
+        """
+
+        body = json.dumps({'config': config, 'audio': {'uri': uri}}).encode('utf8')
+        response = self.speech.request('POST', '/speech:longrunningrecognize', body=body,
+                                       headers=self.getHeaders('application/json'))
+
+        try:
+            return json.loads(response.decode('utf8'))['name']
+        except (ValueError, KeyError):
+            raise sr.RequestError('invalid recognition response')
+
+    def getOperation(self, name: str):
+        """
+        :param name: Name of the operation
+        :return: The operation, with the recognition response once it is done.
+        @:raises:
+            RequestError, socket.timeout: see HttpClient.request
+        """
+
+        response = self.speech.request('GET', '/operations/' + quote(name, safe=''),
+                                       headers=self.getHeaders('application/json'))
+
+        try:
+            return json.loads(response.decode('utf8'))
+        except ValueError:
+            raise sr.RequestError('invalid recognition response')
+
+    def close(self):
+        """
+        Closes the connections to both endpoints, a later request opens a new one.
+        :return:
+        """
+
+        self.speech.close()
+        self.storage.close()
@@ -10,6 +10,8 @@ class API(Enum):
     GOOGLE_CLOUD = 1
     SPHINX = 2
     HOUNDIFY = 3
+    MOCK = 4  # offline simulation for load testing, not offered in the GUI
+    GOOGLE_CLOUD_ASYNC = 5  # long-running recognition for long audio, not offered in the GUI
 
     def __str__(self):
         """
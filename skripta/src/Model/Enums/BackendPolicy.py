@@ -0,0 +1,19 @@
+from enum import Enum
+
+
+class BackendPolicy(Enum):
+    """
+    Utility Enumeration of the ways several backends are combined on every request.
+    Fallback tries the backends in the given order until one of them succeeds.
+    Race sends the audio to all of them and takes the first success, abandoning the others.
+    """
+
+    FALLBACK = 0
+    RACE = 1
+
+    def __str__(self):
+        """
+        :return: The option's name in lowercase
+        """
+
+        return self.name.lower()
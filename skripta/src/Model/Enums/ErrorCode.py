@@ -0,0 +1,25 @@
+from enum import Enum
+
+
+class ErrorCode(Enum):
+    """
+    Utility Enumeration of all error codes the worker process can report.
+    Each code corresponds to one error dialog type.
+    """
+
+    UNKNOWN = 0
+    UNAUTHORISED = 1
+    MIC_NOT_FOUND = 2
+    DAMAGED_FILE = 3
+    INVALID_FORMAT = 4
+    FAILED_REQUEST = 5
+    LISTENING_TIMED_OUT = 6
+    TIMED_OUT = 7
+    FILE_NOT_FOUND = 8
+
+    def __str__(self):
+        """
+        :return: The code's name in lowercase
+        """
+
+        return self.name.lower()
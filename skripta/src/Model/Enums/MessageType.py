@@ -0,0 +1,22 @@
+from enum import Enum
+
+
+class MessageType(Enum):
+    """
+    Utility Enumeration of all message types exchanged between the worker process and the controller.
+    CANCEL is sent by the controller (on worker's standard input), all others by the worker.
+    """
+
+    RESULT = 0
+    PROGRESS = 1
+    ERROR = 2
+    LOG = 3
+    METRICS = 4
+    CANCEL = 5
+
+    def __str__(self):
+        """
+        :return: The type's name in lowercase
+        """
+
+        return self.name.lower()
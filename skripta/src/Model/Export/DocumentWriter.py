@@ -0,0 +1,231 @@
+import io
+import zipfile
+
+from xml.sax.saxutils import escape
+
+from src.Model.Export.TranscriptWriter import TranscriptWriter
+from src.Model.Pipeline.Transcript import Segment
+
+
+class ParagraphWriter(TranscriptWriter):
+    """
+    Base class of document writers that write every segment as a paragraph.
+    """
+
+    HEADER = ''
+    FOOTER = ''
+
+    def writeHeader(self):
+        """
+        Writes the document's prologue.
+        :return:
+        """
+
+        self.file.write(self.HEADER)
+
+    def formatSegment(self, segment: Segment):
+        """
+        Writes the segment as a paragraph.
+        :param segment:
+        :return:
+        """
+
+        self.file.write(self.formatParagraph(segment.text))
+
+    def formatParagraph(self, text: str):
+        """
+        :param text: Paragraph's text
+        :return: The paragraph in the document's markup.
+        """
+
+        raise NotImplementedError
+
+    def writeFooter(self):
+        """
+        Writes the document's epilogue.
+        :return:
+        """
+
+        self.file.write(self.FOOTER)
+
+
+class HtmlWriter(ParagraphWriter):
+    """
+    HTML document writer.
+    """
+
+    HEADER = '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>Transkript</title>\n</head>\n<body>\n'
+    FOOTER = '</body>\n</html>\n'
+
+    def formatParagraph(self, text: str):
+        return '<p>' + escape(text) + '</p>\n'
+
+
+class TexWriter(ParagraphWriter):
+    """
+    LaTeX document writer.
+    """
+
+    HEADER = '\\documentclass{article}\n\\usepackage[utf8]{inputenc}\n\\usepackage[T1]{fontenc}\n\n' \
+             '\\begin{document}\n\n'
+    FOOTER = '\\end{document}\n'
+
+    SPECIAL_CHARACTERS = {
+        '\\': '\\textbackslash{}', '&': '\\&', '%': '\\%', '$': '\\$', '#': '\\#', '_': '\\_',
+        '{': '\\{', '}': '\\}', '~': '\\textasciitilde{}', '^': '\\textasciicircum{}',
+    }
+
+    def formatParagraph(self, text: str):
+        return ''.join(self.SPECIAL_CHARACTERS.get(character, character) for character in text) + '\n\n'
+
+
+class RtfWriter(ParagraphWriter):
+    """
+    Rich text format document writer. Non-ASCII characters are written as unicode escapes.
+    """
+
+    HEADER = '{\\rtf1\\ansi\\deff0{\\fonttbl{\\f0 Times New Roman;}}\n'
+    FOOTER = '}\n'
+
+    def formatParagraph(self, text: str):
+        escaped = []
+
+        for character in text:
+            code = ord(character)
+
+            if character in '\\{}':
+                escaped.append('\\' + character)
+            elif code < 128:
+                escaped.append(character)
+            else:
+                # RTF expects signed 16-bit code units, characters outside BMP as surrogate pairs
+                encoded = character.encode('utf-16-le')
+                for index in range(0, len(encoded), 2):
+                    value = int.from_bytes(encoded[index:index + 2], 'little')
+                    escaped.append('\\u{}?'.format(value - 65536 if value > 32767 else value))
+
+        return '{\\pard ' + ''.join(escaped) + '\\par}\n'
+
+
+class WordXmlWriter(ParagraphWriter):
+    """
+    Word 2003 XML (WordprocessingML) document writer.
+    """
+
+    HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n' \
+             '<?mso-application progid="Word.Document"?>\n' \
+             '<w:wordDocument xmlns:w="http://schemas.microsoft.com/office/word/2003/wordml"><w:body>\n'
+    FOOTER = '</w:body></w:wordDocument>\n'
+
+    def formatParagraph(self, text: str):
+        return '<w:p><w:r><w:t>' + escape(text) + '</w:t></w:r></w:p>\n'
+
+
+class UotWriter(ParagraphWriter):
+    """
+    Unified Office Format (UOF 1.0) text document writer.
+    """
+
+    HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n' \
+             '<uof:UOF xmlns:uof="http://schemas.uof.org/cn/2003/uof" ' \
+             'xmlns:字="http://schemas.uof.org/cn/2003/uof-wordproc" ' \
+             'uof:language="cn" uof:version="1.0" uof:mimetype="vnd.uof.text">\n' \
+             '<uof:文字处理><字:主体>\n'
+    FOOTER = '</字:主体></uof:文字处理>\n</uof:UOF>\n'
+
+    def formatParagraph(self, text: str):
+        return '<字:段落><字:句><字:文本串>' + escape(text) + '</字:文本串></字:句></字:段落>\n'
+
+
+class ZipDocumentWriter(ParagraphWriter):
+    """
+    Base class of zip packaged document writers (ODF, OOXML).
+    Static package parts are written on open, the main part is streamed into the archive segment by segment.
+    """
+
+    MAIN_PART = ''
+    STATIC_PARTS = ()  # tuples (name, content, compress)
+
+    def open(self):
+        """
+        Creates the archive, writes the static parts and opens the main part for writing.
+        :return:
+        """
+
+        self.archive = zipfile.ZipFile(self.temporaryPath, 'w', zipfile.ZIP_DEFLATED)
+
+        for name, content, compress in self.STATIC_PARTS:
+            self.archive.writestr(name, content, zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED)
+
+        self.file = io.TextIOWrapper(self.archive.open(self.MAIN_PART, 'w', force_zip64=True), encoding='utf8')
+        self.writeHeader()
+
+    def closeFile(self):
+        """
+        Closes the main part and the archive.
+        :return:
+        """
+
+        self.file.close()
+        self.archive.close()
+
+
+class OdtWriter(ZipDocumentWriter):
+    """
+    OpenDocument text (.odt) writer.
+    """
+
+    MAIN_PART = 'content.xml'
+    STATIC_PARTS = (
+        # mimetype has to be the first, uncompressed entry
+        ('mimetype', 'application/vnd.oasis.opendocument.text', False),
+        ('META-INF/manifest.xml',
+         '<?xml version="1.0" encoding="UTF-8"?>\n'
+         '<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0" '
+         'manifest:version="1.2">\n'
+         '<manifest:file-entry manifest:full-path="/" manifest:version="1.2" '
+         'manifest:media-type="application/vnd.oasis.opendocument.text"/>\n'
+         '<manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>\n'
+         '</manifest:manifest>\n', True),
+    )
+
+    HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n' \
+             '<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" ' \
+             'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" office:version="1.2">' \
+             '<office:body><office:text>\n'
+    FOOTER = '</office:text></office:body></office:document-content>\n'
+
+    def formatParagraph(self, text: str):
+        return '<text:p>' + escape(text) + '</text:p>\n'
+
+
+class DocxWriter(ZipDocumentWriter):
+    """
+    Office Open XML (.docx) writer.
+    """
+
+    MAIN_PART = 'word/document.xml'
+    STATIC_PARTS = (
+        ('[Content_Types].xml',
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+         '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+         '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+         '<Default Extension="xml" ContentType="application/xml"/>'
+         '<Override PartName="/word/document.xml" '
+         'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+         '</Types>\n', True),
+        ('_rels/.rels',
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+         '<Relationship Id="rId1" '
+         'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+         'Target="word/document.xml"/>'
+         '</Relationships>\n', True),
+    )
+
+    HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n' \
+             '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>\n'
+    FOOTER = '<w:sectPr/></w:body></w:document>\n'
+
+    def formatParagraph(self, text: str):
+        return '<w:p><w:r><w:t xml:space="preserve">' + escape(text) + '</w:t></w:r></w:p>\n'
@@ -0,0 +1,182 @@
+import textwrap
+
+from src.Model.Export.TranscriptWriter import TranscriptWriter
+from src.Model.Pipeline.Transcript import Segment
+
+
+class SubtitleWriter(TranscriptWriter):
+    """
+    Base class of subtitle writers. Long segments are split into cues of readable length,
+    at word timings if the API supplied them, proportionally to the text length otherwise.
+    """
+
+    MAX_CUE_DURATION = 7
+    MAX_LINE_LENGTH = 42
+    MAX_LINES = 2
+
+    def __init__(self, path: str):
+        """
+        Constructor method.
+        :param path: Destination file path
+        """
+
+        super().__init__(path)
+        self.cuesWritten = 0
+
+    def formatSegment(self, segment: Segment):
+        """
+        Writes the segment as one or more cues.
+        :param segment:
+        :return:
+        """
+
+        for start, end, text in self.getCues(segment):
+            self.formatCue(start, end, '\n'.join(textwrap.wrap(text, self.MAX_LINE_LENGTH)))
+            self.cuesWritten += 1
+
+    def getCues(self, segment: Segment):
+        """
+        Splits the segment into cues.
+        :param segment:
+        :return: List of (start, end, text) tuples.
+        @:raises:
+            ValueError: if neither the segment nor its words are timed, i.e. for a segment of an edited text
+        """
+
+        maxCharacters = self.MAX_LINE_LENGTH * self.MAX_LINES
+
+        timedWords = [word for word in segment.words if word.start is not None]
+        if timedWords:
+            words = [(word.text, word.start, word.end) for word in timedWords]
+        elif segment.start is None or segment.end is None:
+            raise ValueError('subtitles need the timings of the recognized segments, the transcript has none')
+        else:
+            # interpolate word timings from their position in the text
+            texts = segment.text.split()
+            totalLength = sum(len(text) + 1 for text in texts)
+            duration = segment.end - segment.start
+
+            words, position = [], 0
+            for text in texts:
+                start = segment.start + duration * position / totalLength
+                position += len(text) + 1
+                words.append((text, start, segment.start + duration * position / totalLength))
+
+        cues = []
+        for text, start, end in words:
+            if cues:
+                cueText, cueStart, cueEnd = cues[-1]
+                if len(cueText) + 1 + len(text) <= maxCharacters and end - cueStart <= self.MAX_CUE_DURATION:
+                    cues[-1] = (cueText + ' ' + text, cueStart, end)
+                    continue
+
+            cues.append((text, start, end))
+
+        return [(start, end, text) for text, start, end in cues]
+
+    @staticmethod
+    def formatTimestamp(seconds: float, separator: str):
+        """
+        :param seconds: Time in secs
+        :param separator: Separator of seconds and milliseconds
+        :return: Time in format HH:MM:SS<separator>mmm.
+        """
+
+        milliseconds = int(round(max(seconds, 0) * 1000))
+        hours, milliseconds = divmod(milliseconds, 3600000)
+        minutes, milliseconds = divmod(milliseconds, 60000)
+        seconds, milliseconds = divmod(milliseconds, 1000)
+
+        return '{:02d}:{:02d}:{:02d}{}{:03d}'.format(hours, minutes, seconds, separator, milliseconds)
+
+    @staticmethod
+    def parseTimestamp(text: str):
+        """
+        :param text: Time in format [HH:]MM:SS,mmm or [HH:]MM:SS.mmm
+        :return: Time in secs.
+        """
+
+        seconds = 0.0
+        for part in text.strip().replace(',', '.').split(':'):
+            seconds = seconds * 60 + float(part)
+
+        return seconds
+
+    @staticmethod
+    def readCues(path: str):
+        """
+        Reads the cues of a SubRip or WebVTT file, as segments (without word timings).
+        :param path: Subtitle file path
+        :return: Generator of Segment instances.
+        """
+
+        index = 0
+        timing, lines = None, []
+
+        with open(path, 'r', encoding='utf8') as file:
+            for line in file:
+                line = line.strip()
+
+                if '-->' in line:
+                    start, end = line.split('-->')
+                    timing, lines = (start, end.split()[0]), []
+                elif line and timing is not None:
+                    lines.append(line)
+                elif not line and timing is not None:
+                    yield Segment(index, SubtitleWriter.parseTimestamp(timing[0]),
+                                  SubtitleWriter.parseTimestamp(timing[1]), ' '.join(lines))
+                    index += 1
+                    timing = None
+
+        if timing is not None:
+            yield Segment(index, SubtitleWriter.parseTimestamp(timing[0]), SubtitleWriter.parseTimestamp(timing[1]),
+                          ' '.join(lines))
+
+    def formatCue(self, start: float, end: float, text: str):
+        """
+        Writes a single cue.
+        :param start: Start time in secs
+        :param end: End time in secs
+        :param text: Cue text, already wrapped into lines
+        :return:
+        """
+
+        raise NotImplementedError
+
+
+class SrtWriter(SubtitleWriter):
+    """
+    SubRip (.srt) subtitle writer.
+    """
+
+    def formatCue(self, start: float, end: float, text: str):
+        """
+        Writes a numbered SubRip cue.
+        :return:
+        """
+
+        self.file.write('{}\n{} --> {}\n{}\n\n'.format(self.cuesWritten + 1, self.formatTimestamp(start, ','),
+                                                       self.formatTimestamp(end, ','), text))
+
+
+class VttWriter(SubtitleWriter):
+    """
+    WebVTT (.vtt) subtitle writer.
+    """
+
+    def writeHeader(self):
+        """
+        Writes the WebVTT signature.
+        :return:
+        """
+
+        self.file.write('WEBVTT\n\n')
+
+    def formatCue(self, start: float, end: float, text: str):
+        """
+        Writes a WebVTT cue.
+        :return:
+        """
+
+        self.file.write('{} --> {}\n{}\n\n'.format(self.formatTimestamp(start, '.'), self.formatTimestamp(end, '.'),
+                                                   text))
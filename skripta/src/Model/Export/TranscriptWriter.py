@@ -0,0 +1,199 @@
+import json
+import os
+
+from typing import TextIO, Iterable, Iterator
+
+from src.Model.Pipeline.Transcript import Transcript, Segment
+
+
+class TranscriptWriter:
+    """
+    Base class of transcript writers. Writes a transcript to a file segment by segment,
+    so the output can be streamed while the recognition is still running.
+    Output goes through a large buffer to a temporary '.part' file, which replaces the destination only when
+    the writer is closed, so the destination never contains a half-written transcript.
+    Usage: with Writer(path) as writer: writer.writeSegment(segment) ...
+    """
+
+    BUFFER_SIZE = 1024 * 1024
+
+    def __init__(self, path: str):
+        """
+        Constructor method.
+        :param path: Destination file path
+        """
+
+        self.path = path
+        self.temporaryPath = path + '.part'
+        self.file: TextIO = None
+        self.segmentsWritten = 0
+
+    def open(self):
+        """
+        Opens the temporary file and writes the header.
+        :return:
+        """
+
+        self.file = open(self.temporaryPath, 'w', encoding='utf8', buffering=self.BUFFER_SIZE)
+        self.writeHeader()
+
+    def writeSegment(self, segment: Segment):
+        """
+        Writes a transcribed segment. Segments have to be written in order of their start times.
+        :param segment:
+        :return:
+        """
+
+        if not segment.text:
+            return
+
+        self.formatSegment(segment)
+        self.segmentsWritten += 1
+
+    def writeTranscript(self, transcript: Transcript):
+        """
+        Writes all segments of the given transcript.
+        :param transcript:
+        :return:
+        """
+
+        self.writeSegments(transcript.segments)
+
+    def writeSegments(self, segments: Iterable[Segment]):
+        """
+        Writes all given segments, i.e. lazily read from a spool file.
+        :param segments:
+        :return:
+        """
+
+        for segment in segments:
+            self.writeSegment(segment)
+
+    def close(self):
+        """
+        Writes the footer, closes the temporary file and atomically moves it to the destination.
+        :return:
+        """
+
+        if self.file is None:
+            return
+
+        self.writeFooter()
+        self.closeFile()
+        self.file = None
+
+        os.replace(self.temporaryPath, self.path)
+
+    def abort(self):
+        """
+        Closes and removes the temporary file, the destination is left untouched.
+        :return:
+        """
+
+        if self.file is None:
+            return
+
+        self.closeFile()
+        self.file = None
+
+        os.remove(self.temporaryPath)
+
+    def closeFile(self):
+        """
+        Closes the temporary file (and any container around it).
+        :return:
+        """
+
+        self.file.close()
+
+    def writeHeader(self):
+        """
+        Writes the beginning of the file, if the format has one.
+        :return:
+        """
+
+        pass
+
+    def formatSegment(self, segment: Segment):
+        """
+        Writes a non-empty segment in the writer's format.
+        :param segment:
+        :return:
+        """
+
+        raise NotImplementedError
+
+    def writeFooter(self):
+        """
+        Writes the end of the file, if the format has one.
+        :return:
+        """
+
+        pass
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        if excType is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class TextWriter(TranscriptWriter):
+    """
+    Plain text writer, segments are separated by spaces (the same text as shown in the result dialog).
+    """
+
+    def formatSegment(self, segment: Segment):
+        """
+        Writes the segment's text.
+        :param segment:
+        :return:
+        """
+
+        if self.segmentsWritten:
+            self.file.write(' ')
+
+        self.file.write(segment.text)
+
+
+class JsonLinesWriter(TranscriptWriter):
+    """
+    Writes every segment (with timings) as a line of JSON. Used as a spool file that can be later
+    converted to any format without holding the whole transcript in memory.
+    """
+
+    def writeSegment(self, segment: Segment):
+        """
+        Writes the segment, including the empty ones (they carry the timings of unintelligible parts).
+        :param segment:
+        :return:
+        """
+
+        self.formatSegment(segment)
+        self.segmentsWritten += 1
+
+    def formatSegment(self, segment: Segment):
+        """
+        Writes the segment as a line of JSON.
+        :param segment:
+        :return:
+        """
+
+        self.file.write(json.dumps(segment.toDict(), ensure_ascii=False) + '\n')
+
+    @staticmethod
+    def readSegments(path: str) -> Iterator[Segment]:
+        """
+        Lazily reads the segments of a file written by JsonLinesWriter.
+        :param path: Path to the file
+        :return: Iterator over segments.
+        """
+
+        with open(path, 'r', encoding='utf8', buffering=TranscriptWriter.BUFFER_SIZE) as file:
+            for line in file:
+                if line.strip():
+                    yield Segment.fromDict(json.loads(line))
@@ -0,0 +1,95 @@
+import os
+
+from typing import Iterable
+
+from src.Model.Export.DocumentWriter import HtmlWriter, TexWriter, RtfWriter, WordXmlWriter, UotWriter, OdtWriter, \
+    DocxWriter
+from src.Model.Export.SubtitleWriter import SubtitleWriter, SrtWriter, VttWriter
+from src.Model.Export.TranscriptWriter import TextWriter, JsonLinesWriter
+from src.Model.Pipeline.Transcript import Segment
+
+# writer class for each supported file extension, plain text for all others
+WRITERS = {
+    '.txt': TextWriter,
+    '.srt': SrtWriter,
+    '.vtt': VttWriter,
+    '.jsonl': JsonLinesWriter,
+    '.html': HtmlWriter,
+    '.tex': TexWriter,
+    '.rtf': RtfWriter,
+    '.xml': WordXmlWriter,
+    '.uot': UotWriter,
+    '.odt': OdtWriter,
+    '.docx': DocxWriter,
+}
+
+# formats whose transcripts can be read back
+READABLE_EXTENSIONS = ('.txt', '.jsonl', '.srt', '.vtt')
+
+
+def createWriter(path: str):
+    """
+    :param path: Destination file path
+    :return: A new transcript writer for the file's format (chosen by the extension).
+    """
+
+    extension = os.path.splitext(path)[1].lower()
+    return WRITERS.get(extension, TextWriter)(path)
+
+
+def isTimedFormat(path: str):
+    """
+    :param path: Destination file path
+    :return: True if the format needs segment timings (i.e. subtitles), False otherwise.
+    """
+
+    return os.path.splitext(path)[1].lower() in ('.srt', '.vtt')
+
+
+def getTextSegments(lines: Iterable[str]):
+    """
+    Splits an (edited) transcript text into untimed segments, one for each non-empty line.
+    :param lines: Lines of the transcript text
+    :return: Generator of Segment instances.
+    """
+
+    index = 0
+    for line in lines:
+        if line.strip():
+            yield Segment(index, None, None, line.strip())
+            index += 1
+
+
+def readSegments(path: str):
+    """
+    Reads the segments of a stored transcript - a JSON lines spool file, subtitles, or a plain text file.
+    :param path: Source file path
+    :return: Generator of Segment instances.
+    """
+
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == '.jsonl':
+        yield from JsonLinesWriter.readSegments(path)
+        return
+
+    if extension in ('.srt', '.vtt'):
+        yield from SubtitleWriter.readCues(path)
+        return
+
+    with open(path, 'r', encoding='utf8') as file:
+        yield from getTextSegments(file)
+
+
+def exportTranscript(segments: Iterable[Segment], path: str):
+    """
+    Writes the segments into the file, in the format chosen by the file's extension.
+    :param segments: Transcript's segments
+    :param path: Destination file path
+    :return: The destination path.
+    """
+
+    with createWriter(path) as writer:
+        writer.writeSegments(segments)
+
+    return path
@@ -1,11 +1,15 @@
 import os
-from pathlib import Path
+from typing import Iterable
 
-import speech_recognition as sr
-from PyQt6.QtCore import QThread
+from PyQt6.QtCore import QThread, QFileSystemWatcher
 
-from src.Model.Utils.AlsaContext import hideAlsaErrors
+from src.Model.Pipeline.Decoders import openDecoder
+from src.Model.Pipeline.Transcript import Segment
+from src.Model.Utils.LanguagesCache import LanguagesCache
+from src.Model.Utils.MicrophoneRegistry import MicrophoneRegistry
+from src.Model.Utils.Paths import RESULT_DIRECTORY
 from src.Model.Workers.LanguagesLookup import LanguagesLookup
+from src.Model.Workers.TranscriptExport import TranscriptExport
 
 
 class Model:
@@ -18,16 +22,35 @@ class Model:
         Initializes a Model.
         """
 
-        self.googleLanguages = [['English (United States)', 'en-US']]
+        self.googleLanguages, isStale = LanguagesCache.load()
 
         self.thread = QThread()
         self.worker = LanguagesLookup()
 
-        self.fetchGoogleLanguages()
+        # network is used only when the cached list is outdated
+        if isStale:
+            self.fetchGoogleLanguages()
+
+        self.exportThread = None
+        self.exportWorker = None
+
+        self.microphones = MicrophoneRegistry()
+        self.deviceWatcher = QFileSystemWatcher()
+        self.watchAudioDevices()
+
+    def watchAudioDevices(self):
+        """
+        Invalidates the cached microphones whenever a sound device is plugged in or out (Linux only).
+        :return:
+        """
+
+        if os.path.isdir('/dev/snd'):
+            self.deviceWatcher.addPath('/dev/snd')
+            self.deviceWatcher.directoryChanged.connect(lambda path: self.microphones.invalidate())
 
     def fetchGoogleLanguages(self):
         """
-        Starts a new thread that fetches supported languages.
+        Starts a new thread that fetches supported languages and refreshes their cache.
         Saves the result to googleLanguages property.
         :return:
         """
@@ -51,6 +74,29 @@ class Model:
 
         self.googleLanguages = languages
 
+    def exportTranscript(self, segments: Iterable[Segment], path: str, indexSegments: Iterable[Segment] = None):
+        """
+        Starts a new thread that writes the transcript into a document.
+        :param segments: Transcript's segments
+        :param path: Destination file path
+        :param indexSegments: Segments indexed for the document, None if it is not indexed
+        :return: The export worker, emitting finished(path) or failed(message) when done.
+        """
+
+        self.exportThread = QThread()
+        self.exportWorker = TranscriptExport(segments, path, indexSegments)
+        self.exportWorker.moveToThread(self.exportThread)
+
+        self.exportThread.started.connect(self.exportWorker.run)
+        self.exportWorker.finished.connect(self.exportThread.quit)
+        self.exportWorker.failed.connect(self.exportThread.quit)
+        self.exportThread.finished.connect(self.exportWorker.deleteLater)
+        self.exportThread.finished.connect(self.exportThread.deleteLater)
+
+        self.exportThread.start()
+
+        return self.exportWorker
+
     @staticmethod
     def createResultDirectory():
         """
@@ -58,9 +104,8 @@ class Model:
         :return:
         """
 
-        dirPath = str(Path.home()) + "/Transkripti"
-        if not os.path.isdir(dirPath):
-            os.mkdir(dirPath)
+        if not os.path.isdir(RESULT_DIRECTORY):
+            os.mkdir(RESULT_DIRECTORY)
 
     @staticmethod
     def getAudioDuration(filePath: str):
@@ -71,18 +116,17 @@ class Model:
         """
 
         try:
-            with sr.AudioFile(filePath) as source:
-                return source.DURATION
+            with openDecoder(filePath) as decoder:
+                return decoder.duration
 
-        except ValueError as e:
+        except (ValueError, OSError) as e:
             print('ValueError - Audio Duration: ', e.__str__())
             return None
 
-    @staticmethod
-    def getMicrophones():
+    def getMicrophones(self, refresh: bool = False):
         """
+        :param refresh: If True, the devices are scanned again instead of using the cached list
         :return: The list of available microphone inputs.
         """
 
-        with hideAlsaErrors():
-            return sr.Microphone.list_microphone_names()
+        return self.microphones.getNames(refresh)
@@ -0,0 +1,84 @@
+import speech_recognition as sr
+
+from src.Model.Pipeline.Decoders import openDecoder
+from src.Model.Pipeline.Normalizer import Normalizer
+
+
+class DecodedAudioSource(sr.AudioSource):
+    """
+    Audio source streaming normalized (mono, 16 kHz, 16-bit) frames from any decodable audio file (see Decoders),
+    usable wherever speech_recognition expects an AudioFile (i.e. for ambient noise adjustment).
+    """
+
+    CHUNK = 4096
+
+    SAMPLE_RATE = Normalizer.SAMPLE_RATE
+    SAMPLE_WIDTH = Normalizer.SAMPLE_WIDTH
+
+    def __init__(self, path: str):
+        """
+        Constructor method.
+        :param path: Path to the audio file
+        """
+
+        self.path = path
+        self.decoder = None
+        self.normalizer = None
+        self.stream = None
+
+    def __enter__(self):
+        """
+        Opens the decoder and reads the stream's properties.
+        @:raises:
+            ValueError: if the file cannot be decoded
+            FileNotFoundError: if the file does not exist
+        :return:
+        """
+
+        self.decoder = openDecoder(self.path)
+        self.normalizer = self.createNormalizer()
+
+        self.DURATION = self.decoder.duration
+        self.FRAME_COUNT = None if self.DURATION is None else int(self.DURATION * self.SAMPLE_RATE)
+
+        self.stream = self
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.decoder.close()
+        self.stream = None
+
+    def createNormalizer(self):
+        """
+        :return: A new normalizer of the decoder's output.
+        """
+
+        return Normalizer(self.decoder.sampleRate, self.decoder.sampleWidth, self.decoder.channels)
+
+    def read(self, frames: int):
+        """
+        :param frames: Approximate number of normalized frames to read
+        :return: Normalized frames, empty at the end of the stream.
+        """
+
+        toRead = max(frames * self.decoder.sampleRate // self.SAMPLE_RATE, 1)
+
+        # the resampler may need more input before it outputs anything
+        while True:
+            data = self.decoder.read(toRead)
+            if not data:
+                return self.normalizer.flush()
+
+            normalized = self.normalizer.process(data)
+            if normalized:
+                return normalized
+
+    def seek(self, seconds: float):
+        """
+        Moves to the given time.
+        :param seconds: Time in secs from the beginning of the file
+        :return:
+        """
+
+        self.decoder.seek(int(seconds * self.decoder.sampleRate))
+        self.normalizer = self.createNormalizer()
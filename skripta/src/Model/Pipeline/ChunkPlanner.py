@@ -0,0 +1,120 @@
+import math
+
+from typing import Iterable, Iterator
+
+from src.Model.Backends.RecognitionBackend import RecognitionBackend
+from src.Model.Pipeline.Segmenter import AudioSegment, EnergySegmenter
+from src.Model.Utils.RealTimeFactors import RealTimeFactors
+
+
+class ChunkPlanner:
+    """
+    Plans the longest chunk of audio sent to a backend in one request.
+
+    The hard limit is given by the backend's maximal request duration and payload size.
+    Within it, the length follows the measured latency of the backend's requests (latency = overhead + cost * duration):
+    a chunk is just long enough for the per-request overhead to take at most 1 - EFFICIENCY of the throughput.
+    Longer chunks would gain little, while delaying the progress and the cancellation, and costing more when they fail.
+    """
+
+    DEFAULT_DURATION = 30  # until the backend's latency is measured, unless the backend assumes its latency
+    MIN_DURATION = 10  # shorter chunks would cut the speech too often
+    MAX_DURATION = 120  # for backends without limits, others are bound only by their own limits
+
+    EFFICIENCY = 0.9
+    SAFETY_MARGIN = 0.9  # share of the backend's limits used
+    PAYLOAD_OVERHEAD = 4 / 3  # request bodies may be base64 encoded
+
+    def __init__(self, backendClass: type, latencyModel: tuple = None):
+        """
+        Constructor method.
+        :param backendClass: RecognitionBackend subclass the chunks are planned for
+        :param latencyModel: Tuple (overhead, cost) of the backend's requests (see RealTimeFactors.getLatencyModel),
+                             None if unknown
+        """
+
+        self.backendClass = backendClass
+        self.latencyModel = latencyModel
+
+    @staticmethod
+    def forBackend(backendClass: type):
+        """
+        :param backendClass: RecognitionBackend subclass
+        :return: Planner using the latency measured by earlier runs of the backend.
+        """
+
+        return ChunkPlanner(backendClass, RealTimeFactors.getLatencyModel(backendClass.API.__str__()))
+
+    def getLimit(self):
+        """
+        :return: The longest chunk the backend accepts in secs, with a safety margin.
+        """
+
+        backend: RecognitionBackend = self.backendClass
+        limits = []
+
+        if backend.MAX_REQUEST_DURATION is None and backend.MAX_PAYLOAD is None:
+            limits.append(self.MAX_DURATION)
+
+        if backend.MAX_REQUEST_DURATION is not None:
+            limits.append(backend.MAX_REQUEST_DURATION * self.SAFETY_MARGIN)
+
+        if backend.MAX_PAYLOAD is not None:
+            bytesPerSecond = backend.SAMPLE_RATE * backend.SAMPLE_WIDTH * self.PAYLOAD_OVERHEAD
+            limits.append(backend.MAX_PAYLOAD / bytesPerSecond * self.SAFETY_MARGIN)
+
+        return min(limits)
+
+    def getDuration(self):
+        """
+        :return: The planned chunk length in secs.
+        """
+
+        limit = self.getLimit()
+        latencyModel = self.latencyModel or self.backendClass.LATENCY_MODEL
+
+        if latencyModel is None:
+            return min(self.DEFAULT_DURATION, limit)
+
+        overhead, cost = latencyModel
+
+        # cost * d / (overhead + cost * d) >= EFFICIENCY
+        if cost > 0:
+            duration = self.EFFICIENCY / (1 - self.EFFICIENCY) * overhead / cost
+        else:
+            duration = math.inf if overhead > 0 else 0
+
+        return min(max(duration, self.MIN_DURATION), limit)
+
+    def split(self, segments: Iterable[AudioSegment], duration: float = None) -> Iterator[AudioSegment]:
+        """
+        Splits the segments longer than the planned length at their quietest frames, and renumbers them.
+        :param segments: Audio segments
+        :param duration: Length of the parts in secs, the planned length if None
+        :return: Iterator over segments fitting the plan.
+        """
+
+        duration = duration or self.getDuration()
+        index = 0
+
+        for segment in segments:
+            if segment.duration <= duration:
+                parts = [segment]
+            else:
+                # every frame counts as speech, so the segment is cut only by its length
+                segmenter = EnergySegmenter(segment.sampleRate, segment.sampleWidth, -1, maxSegment=duration,
+                                            padding=0)
+                parts = segmenter.split([segment.data], segment.start)
+
+            for part in parts:
+                part.index = index
+                index += 1
+                yield part
+
+    def countRequests(self, duration: float):
+        """
+        :param duration: Duration of a speech segment in secs
+        :return: Number of requests the segment takes.
+        """
+
+        return max(math.ceil(duration / self.getDuration()), 1)
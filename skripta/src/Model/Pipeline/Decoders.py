@@ -0,0 +1,485 @@
+import audioop
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import wave
+
+try:
+    import aifc
+except ImportError:  # removed in Python 3.13, AIFF files are then decoded by ffmpeg
+    aifc = None
+
+
+class DecodingError(ValueError):
+    """
+    Raised when the audio stream turns out to be undecodable while it is read, after the decoder was opened.
+    """
+
+    pass
+
+
+class AudioDecoder:
+    """
+    Base class of streaming audio decoders. A decoder reads the stream's properties when opened,
+    and then returns the decoded PCM frames (little-endian, signed, interleaved channels) in chunks.
+    """
+
+    EXTENSIONS = ()
+
+    def __init__(self, path: str):
+        """
+        Constructor method.
+        :param path: Path to the audio file
+        """
+
+        self.path = path
+
+        self.sampleRate = None
+        self.sampleWidth = None
+        self.channels = None
+        self.frameCount = None  # None if unknown
+
+    @property
+    def duration(self):
+        """
+        :return: Duration of the audio in secs, or None if unknown.
+        """
+
+        return None if self.frameCount is None else self.frameCount / self.sampleRate
+
+    @property
+    def frameWidth(self):
+        """
+        :return: Size of one (multichannel) frame in bytes.
+        """
+
+        return self.sampleWidth * self.channels
+
+    def open(self):
+        """
+        Reads the stream's properties.
+        @:raises:
+            ValueError: if the file is not in the decoder's format
+        :return:
+        """
+
+        raise NotImplementedError
+
+    def read(self, frames: int):
+        """
+        :param frames: Maximal number of frames to read
+        :return: Decoded frames, empty at the end of the stream.
+        """
+
+        raise NotImplementedError
+
+    def seek(self, frame: int):
+        """
+        Moves to the given frame. By default, the stream is reopened and the frames before are decoded and dropped.
+        :param frame: Number of frames from the beginning
+        :return:
+        """
+
+        self.close()
+        self.open()
+
+        while frame > 0:
+            skipped = len(self.read(min(frame, 64 * 1024))) // self.frameWidth
+            if not skipped:
+                return
+            frame -= skipped
+
+    def close(self):
+        """
+        Releases the decoder's resources.
+        :return:
+        """
+
+        pass
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+
+class WaveDecoder(AudioDecoder):
+    """
+    Decoder of PCM WAV files.
+    """
+
+    EXTENSIONS = ('.wav',)
+
+    def open(self):
+        """
+        Reads the stream's properties from the WAV header.
+        @:raises:
+            ValueError: if the file is not a PCM WAV file
+        :return:
+        """
+
+        try:
+            self.reader = wave.open(self.path, 'rb')
+        except (wave.Error, EOFError) as e:
+            raise ValueError('invalid WAV file: ' + e.__str__())
+
+        self.sampleRate = self.reader.getframerate()
+        self.sampleWidth = self.reader.getsampwidth()
+        self.channels = self.reader.getnchannels()
+        self.frameCount = self.reader.getnframes()
+
+    def read(self, frames: int):
+        """
+        :param frames: Maximal number of frames to read
+        :return: Decoded frames, empty at the end of the stream.
+        """
+
+        data = self.reader.readframes(frames)
+
+        # 8-bit WAV samples are unsigned
+        return audioop.bias(data, 1, -128) if self.sampleWidth == 1 else data
+
+    def seek(self, frame: int):
+        """
+        Moves to the given frame, the frames before are skipped without decoding.
+        :param frame: Number of frames from the beginning
+        :return:
+        """
+
+        self.reader.setpos(min(frame, self.frameCount))
+
+    def close(self):
+        """
+        Closes the file.
+        :return:
+        """
+
+        if getattr(self, 'reader', None) is not None:
+            self.reader.close()
+            self.reader = None
+
+
+class AiffDecoder(AudioDecoder):
+    """
+    Decoder of uncompressed AIFF and AIFF-C files.
+    """
+
+    EXTENSIONS = ('.aiff', '.aif', '.aifc') if aifc is not None else ()
+
+    def open(self):
+        """
+        Reads the stream's properties from the AIFF header.
+        @:raises:
+            ValueError: if the file is not an uncompressed AIFF file
+        :return:
+        """
+
+        try:
+            self.reader = aifc.open(self.path, 'rb')
+        except (aifc.Error, EOFError) as e:
+            raise ValueError('invalid AIFF file: ' + e.__str__())
+
+        self.sampleRate = self.reader.getframerate()
+        self.sampleWidth = self.reader.getsampwidth()
+        self.channels = self.reader.getnchannels()
+        self.frameCount = self.reader.getnframes()
+
+    def read(self, frames: int):
+        """
+        :param frames: Maximal number of frames to read
+        :return: Decoded frames, empty at the end of the stream.
+        """
+
+        data = self.reader.readframes(frames)
+
+        # AIFF samples are big-endian
+        return audioop.byteswap(data, self.sampleWidth) if self.sampleWidth > 1 else data
+
+    def seek(self, frame: int):
+        """
+        Moves to the given frame, the frames before are skipped without decoding.
+        :param frame: Number of frames from the beginning
+        :return:
+        """
+
+        self.reader.setpos(min(frame, self.frameCount))
+
+    def close(self):
+        """
+        Closes the file.
+        :return:
+        """
+
+        if getattr(self, 'reader', None) is not None:
+            self.reader.close()
+            self.reader = None
+
+
+class PipeDecoder(AudioDecoder):
+    """
+    Base class of decoders running an external decoder process, whose standard output is raw PCM.
+    The process is started on the first read, so opening the decoder only reads the stream's properties.
+    """
+
+    def __init__(self, path: str):
+        """
+        Constructor method.
+        :param path: Path to the audio file
+        """
+
+        super().__init__(path)
+
+        self.process = None
+        self.errors = None  # temporary file with the process' standard error
+        self.startFrame = 0
+        self.framesRead = 0
+
+    def getCommand(self):
+        """
+        :return: Command line of the decoder process, decoding from self.startFrame.
+        """
+
+        raise NotImplementedError
+
+    def read(self, frames: int):
+        """
+        Starts the decoder process on the first read.
+        :param frames: Maximal number of frames to read
+        :return: Decoded frames, empty at the end of the stream.
+        @:raises:
+            DecodingError: if the process fails before it decodes any audio
+        """
+
+        if self.process is None:
+            # standard error goes to a file, a full pipe would block the process while the output is read
+            self.errors = tempfile.TemporaryFile()
+            self.process = subprocess.Popen(self.getCommand(), stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                            stderr=self.errors)
+            self.framesRead = 0
+
+        data = self.process.stdout.read(frames * self.frameWidth)
+
+        if not data and self.process.wait() != 0 and self.framesRead == 0:
+            self.errors.seek(0)
+            raise DecodingError('decoding failed: ' + self.errors.read().decode('utf8', errors='replace'))
+
+        self.framesRead += len(data) // self.frameWidth
+        return data
+
+    def close(self):
+        """
+        Stops the decoder process, the next read starts a new one from self.startFrame.
+        :return:
+        """
+
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.kill()
+            self.process.wait()
+
+            self.process.stdout.close()
+            self.process = None
+
+        if self.errors is not None:
+            self.errors.close()
+            self.errors = None
+
+
+class FlacDecoder(PipeDecoder):
+    """
+    Decoder of native FLAC files, using the flac command line tool (bundled with speech_recognition).
+    """
+
+    EXTENSIONS = ('.flac',)
+
+    @staticmethod
+    def getConverter():
+        """
+        :return: Path to the flac executable, or None if it is not available.
+        """
+
+        try:
+            import speech_recognition as sr
+            return sr.get_flac_converter()
+        except (ImportError, OSError):
+            return shutil.which('flac')
+
+    @staticmethod
+    def parseStreamInfo(header: bytes):
+        """
+        :param header: The first 42 bytes of a FLAC stream
+        :return: Tuple (sampleRate, channels, bitsPerSample, frameCount), where frameCount is None if unknown.
+        @:raises:
+            ValueError: if the header is not a FLAC header
+        """
+
+        # 'fLaC' signature, followed by the STREAMINFO metadata block
+        if len(header) < 42 or header[:4] != b'fLaC' or header[4] & 0x7F != 0:
+            raise ValueError('invalid FLAC file')
+
+        info = int.from_bytes(header[18:26], 'big')
+
+        return info >> 44, ((info >> 41) & 0x07) + 1, ((info >> 36) & 0x1F) + 1, (info & 0xFFFFFFFFF) or None
+
+    def open(self):
+        """
+        Reads the stream's properties from the FLAC header.
+        @:raises:
+            ValueError: if the file is not a FLAC file, its sample size is unsupported, or flac is not available
+            FileNotFoundError: if the file does not exist
+        :return:
+        """
+
+        with open(self.path, 'rb') as file:
+            header = file.read(42)
+
+        self.sampleRate, self.channels, bitsPerSample, self.frameCount = self.parseStreamInfo(header)
+
+        if bitsPerSample not in (8, 16, 24, 32):
+            raise ValueError('unsupported FLAC sample size: {} bits'.format(bitsPerSample))
+
+        self.sampleWidth = bitsPerSample // 8
+
+        self.converter = self.getConverter()
+        if self.converter is None:
+            raise ValueError('FLAC decoding requires the flac tool')
+
+    def getCommand(self):
+        """
+        :return: Command line of flac, decoding from self.startFrame.
+        """
+
+        return [self.converter, '--decode', '--stdout', '--silent', '--force-raw-format', '--endian=little',
+                '--sign=signed', '--skip={}'.format(self.startFrame), self.path]
+
+    def seek(self, frame: int):
+        """
+        Moves to the given frame, the next read restarts the decoder process from it.
+        :param frame: Number of frames from the beginning
+        :return:
+        """
+
+        self.close()
+        self.startFrame = frame
+
+
+class FfmpegDecoder(PipeDecoder):
+    """
+    Decoder of any format supported by a locally installed ffmpeg (MP3, OGG, Opus, M4A, ...).
+    Audio is decoded to 16-bit PCM, with at most two channels.
+    """
+
+    EXTENSIONS = ('.mp3', '.ogg', '.oga', '.opus', '.m4a', '.aac', '.wma', '.webm', '.mka', '.mp4', '.amr')
+
+    @staticmethod
+    def isAvailable():
+        """
+        :return: True if ffmpeg and ffprobe are installed, False otherwise.
+        """
+
+        return shutil.which('ffmpeg') is not None and shutil.which('ffprobe') is not None
+
+    def open(self):
+        """
+        Reads the stream's properties with ffprobe.
+        @:raises:
+            ValueError: if ffmpeg is not installed or the file has no audio stream
+            FileNotFoundError: if the file does not exist
+        :return:
+        """
+
+        if not self.isAvailable():
+            raise ValueError('decoding of ' + os.path.splitext(self.path)[1] + ' files requires ffmpeg')
+
+        if not os.path.isfile(self.path):
+            raise FileNotFoundError(self.path)
+
+        command = ['ffprobe', '-v', 'error', '-select_streams', 'a:0', '-show_entries',
+                   'stream=sample_rate,channels:format=duration', '-of', 'json', self.path]
+        probe = subprocess.run(command, stdin=subprocess.DEVNULL, capture_output=True)
+
+        try:
+            properties = json.loads(probe.stdout)
+            stream = properties['streams'][0]
+            self.sampleRate = int(stream['sample_rate'])
+            self.channels = min(int(stream['channels']), 2)
+        except (ValueError, KeyError, IndexError):
+            raise ValueError('no audio stream found: ' + probe.stderr.decode('utf8', errors='replace'))
+
+        self.sampleWidth = 2
+
+        duration = properties.get('format', {}).get('duration')
+        self.frameCount = int(float(duration) * self.sampleRate) if duration else None
+
+    def getCommand(self):
+        """
+        :return: Command line of ffmpeg, decoding from self.startFrame.
+        """
+
+        return ['ffmpeg', '-nostdin', '-v', 'error', '-ss', '{:.6f}'.format(self.startFrame / self.sampleRate),
+                '-i', self.path, '-vn', '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', self.channels.__str__(),
+                '-ar', self.sampleRate.__str__(), '-']
+
+    def seek(self, frame: int):
+        """
+        Moves to the given frame, the next read restarts the decoder process from it.
+        :param frame: Number of frames from the beginning
+        :return:
+        """
+
+        self.close()
+        self.startFrame = frame
+
+
+# decoders in order of preference, ffmpeg is the fallback for all formats
+DECODERS = (WaveDecoder, AiffDecoder, FlacDecoder, FfmpegDecoder)
+
+
+def getSupportedExtensions():
+    """
+    :return: Tuple of all audio file extensions that can be decoded on this machine.
+    """
+
+    extensions = [extension for decoder in DECODERS[:-1] for extension in decoder.EXTENSIONS]
+
+    if FfmpegDecoder.isAvailable():
+        extensions += [extension for extension in FfmpegDecoder.EXTENSIONS if extension not in extensions]
+        extensions += [extension for extension in ('.aiff', '.aif', '.aifc') if extension not in extensions]
+
+    return tuple(extensions)
+
+
+def openDecoder(path: str):
+    """
+    Opens a decoder for the file, chosen by the file's extension.
+    If the native decoder fails, or the format has none, ffmpeg is tried (if installed).
+    :param path: Path to the audio file
+    :return: An opened AudioDecoder instance.
+    @:raises:
+        ValueError: if the file cannot be decoded
+        FileNotFoundError: if the file does not exist
+    """
+
+    extension = os.path.splitext(path)[1].lower()
+    error = None
+
+    for decoderClass in DECODERS:
+        if decoderClass is not FfmpegDecoder and extension not in decoderClass.EXTENSIONS:
+            continue
+
+        if decoderClass is FfmpegDecoder and error is not None and not FfmpegDecoder.isAvailable():
+            break
+
+        decoder = decoderClass(path)
+        try:
+            decoder.open()
+            return decoder
+        except ValueError as e:
+            decoder.close()
+            error = e
+
+    raise error
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import time
+
+from src.Model.Pipeline.Transcript import Segment
+from src.Model.Utils.Paths import CACHE_DIRECTORY
+
+
+class JobCheckpoint:
+    """
+    Per-job checkpoint of transcribed segments, so an interrupted job resumes from the first unfinished segment.
+    The checkpoint is a JSON lines file: a header {"job": .., "energyThreshold": .., "maxSegment": ..} followed by
+    one segment per line, each appended and synced to disk as soon as the segment is transcribed.
+    The header keeps the segmenter's settings, so the resumed job splits the audio the same way.
+    """
+
+    DIRECTORY = CACHE_DIRECTORY / 'jobs'
+    TIME_TO_LIVE = 7 * 24 * 3600  # abandoned checkpoints are removed after a week
+
+    def __init__(self, jobId: str, directory: os.PathLike = None):
+        """
+        Constructor method, loads the job's previous checkpoint if there is one.
+        :param jobId: Identifier of the job (see getJobId)
+        :param directory: Directory of the checkpoints, the default one in the cache directory if None
+        """
+
+        self.jobId = jobId
+        self.directory = directory or self.DIRECTORY
+        self.path = os.path.join(self.directory, jobId + '.jsonl')
+        self.file = None
+
+        self.energyThreshold = None
+        self.maxSegment = None
+        self.segments = []
+        self.load()
+
+    @staticmethod
+    def getJobId(*settings):
+        """
+        :param settings: JSON serializable job settings, i.e. the file's identity and the recognition options
+        :return: Identifier of the job.
+        """
+
+        return hashlib.sha1(json.dumps(settings, default=str).encode('utf8')).hexdigest()
+
+    def load(self):
+        """
+        Loads the segmenter's settings and the segments of the previous run. A partially written last line is ignored.
+        :return:
+        """
+
+        try:
+            with open(self.path, 'r', encoding='utf8') as file:
+                header = json.loads(file.readline())
+                if header.get('job') != self.jobId:
+                    return
+
+                segments = []
+                for line in file:
+                    try:
+                        segments.append(Segment.fromDict(json.loads(line)))
+                    except (ValueError, KeyError):
+                        break
+
+        except (OSError, ValueError, AttributeError):
+            return
+
+        self.energyThreshold = header.get('energyThreshold')
+        self.maxSegment = header.get('maxSegment')
+        self.segments = segments
+
+    def start(self, energyThreshold: float, maxSegment: float = None):
+        """
+        Opens the checkpoint for appending new segments, (re)writing the header and the resumed segments.
+        :param energyThreshold: Energy threshold used by the segmenter, reused when the job is resumed
+        :param maxSegment: Maximal segment duration used by the segmenter, reused when the job is resumed
+        :return:
+        """
+
+        self.prune()
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.energyThreshold = energyThreshold
+        self.maxSegment = maxSegment
+        self.file = open(self.path, 'w', encoding='utf8')
+        self.file.write(json.dumps({'job': self.jobId, 'energyThreshold': energyThreshold,
+                                    'maxSegment': maxSegment}) + '\n')
+
+        for segment in self.segments:
+            self.file.write(json.dumps(segment.toDict(), ensure_ascii=False) + '\n')
+        self.sync()
+
+    def getResumed(self, index: int, start: float):
+        """
+        :param index: Index of the current audio segment
+        :param start: Start time of the current audio segment in secs
+        :return: The segment transcribed in the previous run, or None if it has to be transcribed.
+                 If the audio segment does not match the stored one, the following stored segments are dropped.
+        """
+
+        if index >= len(self.segments):
+            return None
+
+        segment = self.segments[index]
+        if segment.start is not None and abs(segment.start - start) < 0.001:
+            return segment
+
+        self.segments = self.segments[:index]
+        self.start(self.energyThreshold, self.maxSegment)
+        return None
+
+    def add(self, segment: Segment):
+        """
+        Appends a newly transcribed segment.
+        :param segment:
+        :return:
+        """
+
+        self.segments.append(segment)
+        self.file.write(json.dumps(segment.toDict(), ensure_ascii=False) + '\n')
+        self.sync()
+
+    def sync(self):
+        """
+        Writes the buffered lines to disk.
+        :return:
+        """
+
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        """
+        Closes the checkpoint, keeping it for the next run of the job.
+        :return:
+        """
+
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def remove(self):
+        """
+        Closes and removes the checkpoint of a finished job.
+        :return:
+        """
+
+        self.close()
+
+        if os.path.isfile(self.path):
+            os.remove(self.path)
+
+    def prune(self):
+        """
+        Removes the abandoned checkpoints of other jobs.
+        :return:
+        """
+
+        if not os.path.isdir(self.directory):
+            return
+
+        limit = time.time() - self.TIME_TO_LIVE
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if path != self.path and os.path.getmtime(path) < limit:
+                os.remove(path)
@@ -0,0 +1,160 @@
+from math import gcd
+
+import numpy as np
+
+
+class Normalizer:
+    """
+    Streaming normalization stage: downmixes PCM blocks to mono and resamples them to 16 kHz, 16-bit.
+    The format suits every supported backend as is (Sphinx needs 16 kHz, Google APIs and Houndify accept it),
+    so speech_recognition does not convert the audio again for each request.
+    Resampling is a polyphase FIR filter (as scipy.signal.resample_poly), evaluated for whole blocks at once,
+    with the filter's history kept between blocks.
+    """
+
+    SAMPLE_RATE = 16000
+    SAMPLE_WIDTH = 2
+
+    FILTER_HALF_LENGTH = 10  # filter half length, in multiples of the larger resampling factor
+
+    def __init__(self, sampleRate: int, sampleWidth: int, channels: int, targetRate: int = SAMPLE_RATE):
+        """
+        Constructor method.
+        :param sampleRate: Sample rate of the input in Hz
+        :param sampleWidth: Sample width of the input in bytes (little-endian, signed)
+        :param channels: Number of interleaved input channels
+        :param targetRate: Sample rate of the output in Hz
+        """
+
+        self.sampleWidth = sampleWidth
+        self.channels = channels
+
+        divisor = gcd(targetRate, sampleRate)
+        self.up = targetRate // divisor
+        self.down = sampleRate // divisor
+
+        self.inputCount = 0
+        self.outputCount = 0
+
+        if self.up == self.down:
+            return
+
+        from scipy.signal import firwin
+
+        # low-pass filter at the upsampled rate, its delay is compensated so output times match input times
+        factor = max(self.up, self.down)
+        halfLength = self.FILTER_HALF_LENGTH * factor
+        taps = firwin(2 * halfLength + 1, 1 / factor, window=('kaiser', 5.0)) * self.up
+
+        self.delay = halfLength
+        self.phaseLength = -(-len(taps) // self.up)
+
+        # phases[p, j] is the weight of the input sample j steps before the output's nearest one, for phase p
+        padded = np.zeros(self.phaseLength * self.up)
+        padded[:len(taps)] = taps
+        self.phases = padded.reshape(self.phaseLength, self.up).T.copy()
+
+        # input history, starting with silence before the first sample
+        self.history = np.zeros(self.phaseLength)
+        self.historyStart = -self.phaseLength
+
+    def toSamples(self, block: bytes):
+        """
+        :param block: Interleaved PCM frames
+        :return: Mono samples as floats, in the 16-bit range.
+        """
+
+        width = self.sampleWidth
+
+        if width == 3:
+            bytes3 = np.frombuffer(block, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+            samples = (bytes3[:, 0] | (bytes3[:, 1] << 8) | (bytes3[:, 2] << 16)) << 8 >> 8
+        else:
+            samples = np.frombuffer(block, dtype={1: np.int8, 2: '<i2', 4: '<i4'}[width])
+
+        samples = samples.astype(np.float64) * (32768 / (1 << (8 * width - 1)))
+
+        if self.channels > 1:
+            samples = samples[:len(samples) - len(samples) % self.channels].reshape(-1, self.channels).mean(axis=1)
+
+        return samples
+
+    @staticmethod
+    def toBytes(samples: np.ndarray):
+        """
+        :param samples: Samples as floats, in the 16-bit range
+        :return: 16-bit PCM frames.
+        """
+
+        return np.clip(np.rint(samples), -32768, 32767).astype('<i2').tobytes()
+
+    def process(self, block: bytes):
+        """
+        :param block: Interleaved PCM frames of the input
+        :return: Normalized frames, as many as the input received so far allows.
+        """
+
+        samples = self.toSamples(block)
+        self.inputCount += len(samples)
+
+        if self.up == self.down:
+            self.outputCount += len(samples)
+            return self.toBytes(samples)
+
+        self.history = np.concatenate((self.history, samples))
+        return self.toBytes(self.resample(self.historyStart + len(self.history) - 1))
+
+    def flush(self):
+        """
+        :return: The remaining normalized frames, at the end of the input.
+        """
+
+        if self.up == self.down:
+            return b''
+
+        # the filter's look-ahead reads silence after the last sample
+        self.history = np.concatenate((self.history, np.zeros(self.delay // self.up + self.phaseLength)))
+        totalCount = -(-self.inputCount * self.up // self.down)
+
+        return self.toBytes(self.resample(None, totalCount))
+
+    def resample(self, lastInput: int = None, totalCount: int = None):
+        """
+        Computes the output samples whose input samples are all in the history, and drops the unneeded history.
+        :param lastInput: Index of the last received input sample, None when flushing
+        :param totalCount: Total number of output samples when flushing
+        :return: The output samples.
+        """
+
+        if lastInput is not None:
+            # output n needs the inputs up to (n * down + delay) // up
+            endCount = max(((lastInput + 1) * self.up - self.delay - 1) // self.down + 1, self.outputCount)
+        else:
+            endCount = totalCount
+
+        outputs = np.arange(self.outputCount, endCount)
+        positions = outputs * self.down + self.delay
+        nearest = positions // self.up
+        phases = positions % self.up
+
+        indexes = (nearest - self.historyStart)[:, None] - np.arange(self.phaseLength)[None, :]
+        samples = np.einsum('nj,nj->n', self.history[indexes], self.phases[phases])
+
+        self.outputCount = endCount
+
+        # keep the inputs needed by the next output
+        nextNearest = (endCount * self.down + self.delay) // self.up
+        drop = max(nextNearest - self.phaseLength + 1 - self.historyStart, 0)
+        self.history = self.history[drop:]
+        self.historyStart += drop
+
+        return samples
+
+    def normalize(self, data: bytes):
+        """
+        Normalizes a whole recording at once, i.e. the microphone input.
+        :param data: Interleaved PCM frames
+        :return: Normalized frames.
+        """
+
+        return self.process(data) + self.flush()
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from typing import List
+
+from src.Model.Pipeline.Transcript import Word
+from src.Model.Utils.Metrics import Metrics
+from src.Model.Utils.Paths import CACHE_DIRECTORY
+
+
+class SegmentCache:
+    """
+    Local cache (SQLite) of recognized segments, keyed by the speech fingerprint and the recognition settings.
+    Re-running a slightly modified recording re-recognizes only the segments whose speech changed.
+    Fingerprints (energy envelopes, see AudioSegment.getFingerprint) match exactly, or else within a tolerance,
+    since trimming a resampled recording changes its samples slightly.
+    The cache may be shared by threads.
+    """
+
+    CACHE_PATH = CACHE_DIRECTORY / 'segments.sqlite'
+    MAX_ENTRIES = 100000
+    SCHEMA_VERSION = 2  # entries of older versions have incompatible fingerprints, they are dropped
+
+    # tolerance of a match, in envelope frames and steps (see AudioSegment.FINGERPRINT_STEPS)
+    LENGTH_TOLERANCE = 1
+    MAX_DIFFERENCE = 2
+    MEAN_DIFFERENCE = 0.75
+    MIN_LENGTH = 10  # shorter speech matches only exactly, its envelope tells too little
+
+    def __init__(self, path: os.PathLike = None):
+        """
+        Opens (and creates if needed) the cache database.
+        :param path: Database path, the default one in the cache directory if None
+        """
+
+        path = path or self.CACHE_PATH
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+
+        if self.connection.execute('PRAGMA user_version').fetchone()[0] < self.SCHEMA_VERSION:
+            self.connection.executescript('''
+                DROP TABLE IF EXISTS segments;
+                PRAGMA user_version = {};
+            '''.format(self.SCHEMA_VERSION))
+
+        self.connection.executescript('''
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS segments (
+                key TEXT PRIMARY KEY,
+                settings TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                envelope BLOB NOT NULL,
+                result TEXT NOT NULL,
+                used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS segments_used ON segments (used);
+            CREATE INDEX IF NOT EXISTS segments_envelope ON segments (settings, length);
+        ''')
+
+    @staticmethod
+    def getKey(settings: tuple, fingerprint: str):
+        """
+        :param settings: JSON serializable recognition settings affecting the result (api, language, ...)
+        :param fingerprint: Fingerprint of the segment's speech
+        :return: Cache key of the segment's result.
+        """
+
+        return hashlib.sha1(json.dumps([settings, fingerprint], default=str).encode('utf8')).hexdigest()
+
+    @staticmethod
+    def getSettingsKey(settings: tuple):
+        """
+        :param settings: JSON serializable recognition settings affecting the result
+        :return: Key of the settings, shared by all segments recognized with them.
+        """
+
+        return hashlib.sha1(json.dumps(settings, default=str).encode('utf8')).hexdigest()
+
+    @classmethod
+    def getDifference(cls, envelope: bytes, other: bytes):
+        """
+        :param envelope: Energy envelope of a segment's speech
+        :param other: Energy envelope of another segment's speech
+        :return: Mean difference of the envelopes' frames, or None if they are not within the tolerance.
+        """
+
+        length = min(len(envelope), len(other))
+        if abs(len(envelope) - len(other)) > cls.LENGTH_TOLERANCE or length < cls.MIN_LENGTH:
+            return None
+
+        differences = [abs(value - otherValue) for value, otherValue in zip(envelope, other)]
+        if max(differences) > cls.MAX_DIFFERENCE or sum(differences) / length > cls.MEAN_DIFFERENCE:
+            return None
+
+        return sum(differences) / length
+
+    def get(self, settings: tuple, fingerprint: str):
+        """
+        :param settings: JSON serializable recognition settings affecting the result
+        :param fingerprint: Fingerprint of the segment's speech
+        :return: Tuple (text, confidence, words) with word timings relative to the speech offset,
+                 or None if the segment is not cached.
+        """
+
+        key = self.getKey(settings, fingerprint)
+
+        with self.lock:
+            row = self.connection.execute('SELECT key, result FROM segments WHERE key = ?', (key,)).fetchone()
+
+            if row is None:
+                row = self.findSimilar(settings, bytes.fromhex(fingerprint))
+
+            if row is not None:
+                self.connection.execute('UPDATE segments SET used = ? WHERE key = ?', (time.time(), row[0]))
+                self.connection.commit()
+
+        Metrics.cacheLookups.inc(cache='segments', result='miss' if row is None else 'hit')
+
+        if row is None:
+            return None
+
+        result = json.loads(row[1])
+        return result['text'], result['confidence'], [Word.fromDict(word) for word in result['words']]
+
+    def findSimilar(self, settings: tuple, envelope: bytes):
+        """
+        :param settings: JSON serializable recognition settings affecting the result
+        :param envelope: Energy envelope of the segment's speech
+        :return: Row (key, result) of the closest segment within the tolerance, or None if there is none.
+        """
+
+        if len(envelope) < self.MIN_LENGTH:
+            return None
+
+        rows = self.connection.execute('SELECT key, result, envelope FROM segments '
+                                       'WHERE settings = ? AND length BETWEEN ? AND ?',
+                                       (self.getSettingsKey(settings), len(envelope) - self.LENGTH_TOLERANCE,
+                                        len(envelope) + self.LENGTH_TOLERANCE))
+
+        best, bestDifference = None, None
+        for key, result, other in rows:
+            difference = self.getDifference(envelope, other)
+            if difference is not None and (bestDifference is None or difference < bestDifference):
+                best, bestDifference = (key, result), difference
+
+        return best
+
+    def put(self, settings: tuple, fingerprint: str, text: str, confidence: float, words: List[Word]):
+        """
+        Stores the segment's result.
+        :param settings: JSON serializable recognition settings affecting the result
+        :param fingerprint: Fingerprint of the segment's speech
+        :param text: Recognized text, empty if the speech was unintelligible
+        :param confidence: Confidence between 0 and 1, or None
+        :param words: Recognized words, with timings relative to the speech offset
+        :return:
+        """
+
+        result = json.dumps({'text': text, 'confidence': confidence, 'words': [word.toDict() for word in words]})
+        envelope = bytes.fromhex(fingerprint)
+
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO segments (key, settings, length, envelope, result, used) '
+                                    'VALUES (?, ?, ?, ?, ?, ?)',
+                                    (self.getKey(settings, fingerprint), self.getSettingsKey(settings),
+                                     len(envelope), envelope, result, time.time()))
+            self.connection.commit()
+
+    def prune(self):
+        """
+        Removes the least recently used segments above the maximal number of entries.
+        :return:
+        """
+
+        with self.lock:
+            self.connection.execute('DELETE FROM segments WHERE key NOT IN '
+                                    '(SELECT key FROM segments ORDER BY used DESC LIMIT ?)', (self.MAX_ENTRIES,))
+            self.connection.commit()
+
+    def close(self):
+        """
+        Prunes and closes the cache.
+        :return:
+        """
+
+        self.prune()
+        self.connection.close()
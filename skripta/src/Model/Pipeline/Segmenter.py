@@ -0,0 +1,237 @@
+import audioop
+import math
+
+from typing import Iterable, Iterator
+
+
+class AudioSegment:
+    """
+    A part of the audio stream that contains speech, as raw PCM data.
+    """
+
+    FINGERPRINT_LEVEL = 8  # speech is delimited by samples louder than 1/8 of the peak
+    FINGERPRINT_CHUNK = 160  # samples scanned at once while looking for the speech bounds
+    FINGERPRINT_FRAME = 0.02  # secs of speech per value of the energy envelope
+    FINGERPRINT_STEPS = 4  # envelope values per doubling of the RMS energy
+
+    def __init__(self, index: int, start: float, data: bytes, sampleRate: int, sampleWidth: int):
+        """
+        Constructor method.
+        :param index: Ordinal number of the segment
+        :param start: Start time in secs, relative to the beginning of the audio file
+        :param data: Mono PCM frames
+        :param sampleRate: Sample rate in Hz
+        :param sampleWidth: Sample width in bytes
+        """
+
+        self.index = index
+        self.start = start
+        self.data = data
+        self.sampleRate = sampleRate
+        self.sampleWidth = sampleWidth
+
+    @property
+    def duration(self):
+        """
+        :return: Duration of the segment in secs.
+        """
+
+        return len(self.data) / (self.sampleRate * self.sampleWidth)
+
+    @property
+    def end(self):
+        """
+        :return: End time in secs, relative to the beginning of the audio file.
+        """
+
+        return self.start + self.duration
+
+    def getSpeechBounds(self):
+        """
+        Finds the first and the last sample louder than a fraction of the segment's peak.
+        Unlike the segment's boundaries, they do not depend on the segmenter's frame grid.
+        :return: Tuple (start, end) of byte offsets in the segment's data.
+        """
+
+        width = self.sampleWidth
+        level = audioop.max(self.data, width) // self.FINGERPRINT_LEVEL
+        chunkSize = self.FINGERPRINT_CHUNK * width
+
+        if level == 0:
+            return 0, len(self.data)
+
+        start = 0
+        while audioop.max(self.data[start:start + chunkSize], width) <= level:
+            start += chunkSize
+        while abs(audioop.getsample(self.data[start:start + width], width, 0)) <= level:
+            start += width
+
+        end = len(self.data) - len(self.data) % width
+        while audioop.max(self.data[max(end - chunkSize, 0):end], width) <= level:
+            end -= chunkSize
+        while abs(audioop.getsample(self.data[end - width:end], width, 0)) <= level:
+            end -= width
+
+        return start, end
+
+    def getFingerprint(self):
+        """
+        Fingerprints the segment's speech, so the same speech is recognized even if it was cut a bit differently,
+        i.e. after the audio was trimmed or the transcribed window shifted.
+        The fingerprint is the speech's energy envelope (one byte of quantized log RMS energy per frame), not its exact
+        samples: trimming a resampled file shifts the resampler's phase, which changes every later sample slightly.
+        Envelopes are compared with a tolerance by SegmentCache.
+        :return: Tuple (fingerprint, speech_offset), the fingerprint as a hex string,
+                 the speech offset in secs relative to the segment's start.
+        """
+
+        start, end = self.getSpeechBounds()
+
+        frameSize = max(int(self.sampleRate * self.FINGERPRINT_FRAME), 1) * self.sampleWidth
+        envelope = bytearray()
+
+        for offset in range(start, end - frameSize + 1, frameSize):
+            energy = audioop.rms(self.data[offset:offset + frameSize], self.sampleWidth)
+            envelope.append(min(int(round(math.log2(energy) * self.FINGERPRINT_STEPS)), 255) if energy > 1 else 0)
+
+        return envelope.hex(), start / (self.sampleRate * self.sampleWidth)
+
+    def toAudioData(self):
+        """
+        :return: The segment as speech_recognition's AudioData instance.
+        """
+
+        import speech_recognition as sr
+
+        return sr.AudioData(self.data, self.sampleRate, self.sampleWidth)
+
+
+class EnergySegmenter:
+    """
+    Splits a stream of mono PCM blocks into speech segments, using the same energy threshold as the recognizer.
+    A segment ends after a long enough pause, or is cut at its quietest frame when it gets too long.
+    Parts of the stream without speech are dropped.
+    """
+
+    FRAME_DURATION = 0.03
+
+    def __init__(self, sampleRate: int, sampleWidth: int, energyThreshold: float, minSilence: float = 0.5,
+                 maxSegment: float = 30, padding: float = 0.2):
+        """
+        Constructor method.
+        :param sampleRate: Sample rate in Hz
+        :param sampleWidth: Sample width in bytes
+        :param energyThreshold: Frames with RMS energy above this value are considered speech
+        :param minSilence: Duration of a pause (in secs) that ends a segment
+        :param maxSegment: Maximal duration of a segment in secs
+        :param padding: Duration of silence (in secs) kept before and after the speech
+        """
+
+        self.sampleRate = sampleRate
+        self.sampleWidth = sampleWidth
+        self.energyThreshold = energyThreshold
+
+        self.frameSize = max(int(sampleRate * self.FRAME_DURATION), 1) * sampleWidth
+        self.minSilenceFrames = max(int(minSilence / self.FRAME_DURATION), 1)
+        self.maxSegmentFrames = max(int(maxSegment / self.FRAME_DURATION), 1)
+        self.paddingFrames = int(padding / self.FRAME_DURATION)
+
+    def split(self, blocks: Iterable[bytes], start: float = 0) -> Iterator[AudioSegment]:
+        """
+        Lazily splits the stream, each segment is yielded as soon as it is complete.
+        :param blocks: Mono PCM blocks of any size
+        :param start: Time of the stream's first frame in secs, relative to the beginning of the audio file
+        :return: Iterator over speech segments.
+        """
+
+        index = 0
+        position = 0  # number of frames read so far
+
+        frames = []  # frames of the current segment (or preceding silence)
+        energies = []
+        speechStart = None
+        silentFrames = 0
+
+        for frame in self.getFrames(blocks):
+            energy = audioop.rms(frame, self.sampleWidth)
+            position += 1
+
+            frames.append(frame)
+            energies.append(energy)
+
+            if speechStart is None:
+                if energy > self.energyThreshold:
+                    speechStart = max(len(frames) - 1 - self.paddingFrames, 0)
+                    del frames[:speechStart], energies[:speechStart]
+                    speechStart = 0
+                    silentFrames = 0
+                elif len(frames) > self.paddingFrames:
+                    del frames[0], energies[0]
+                continue
+
+            silentFrames = silentFrames + 1 if energy <= self.energyThreshold else 0
+
+            # end of speech after a pause
+            if silentFrames >= self.minSilenceFrames:
+                keep = len(frames) - silentFrames + min(self.paddingFrames, silentFrames)
+                yield self.createSegment(index, start, position - len(frames), frames[:keep])
+                index += 1
+
+                del frames[:keep], energies[:keep]
+                speechStart = None
+                continue
+
+            # too long, cut at the quietest frame of the last fifth
+            if len(frames) >= self.maxSegmentFrames:
+                searchFrom = int(len(energies) * 0.8)
+                cut = searchFrom + min(range(len(energies) - searchFrom), key=lambda i: energies[searchFrom + i]) + 1
+
+                yield self.createSegment(index, start, position - len(frames), frames[:cut])
+                index += 1
+
+                del frames[:cut], energies[:cut]
+
+                # the rest may be just the beginning of a pause
+                silentFrames = 0
+                while silentFrames < len(energies) and energies[-1 - silentFrames] <= self.energyThreshold:
+                    silentFrames += 1
+
+                if silentFrames == len(frames):
+                    del frames[:len(frames) - self.paddingFrames], energies[:len(energies) - self.paddingFrames]
+                    speechStart = None
+
+        if speechStart is not None and frames:
+            yield self.createSegment(index, start, position - len(frames), frames)
+
+    def getFrames(self, blocks: Iterable[bytes]):
+        """
+        :param blocks: PCM blocks of any size
+        :return: Iterator over PCM frames of FRAME_DURATION (the last one may be shorter).
+        """
+
+        remainder = b''
+
+        for block in blocks:
+            data = remainder + block
+            end = len(data) - len(data) % self.frameSize
+
+            for offset in range(0, end, self.frameSize):
+                yield data[offset:offset + self.frameSize]
+
+            remainder = data[end:]
+
+        if remainder:
+            yield remainder
+
+    def createSegment(self, index: int, start: float, firstFrame: int, frames: list):
+        """
+        :param index: Ordinal number of the segment
+        :param start: Time of the stream's first frame in secs
+        :param firstFrame: Position of the segment's first frame in the stream
+        :param frames: Segment's PCM frames
+        :return: New AudioSegment instance.
+        """
+
+        frameDuration = self.frameSize / (self.sampleRate * self.sampleWidth)
+        return AudioSegment(index, start + firstFrame * frameDuration, b''.join(frames), self.sampleRate,
+                            self.sampleWidth)
@@ -0,0 +1,202 @@
+from typing import List
+
+
+def roundTime(seconds: float):
+    """
+    :param seconds: Time in secs, or None
+    :return: The time rounded to milliseconds, or None.
+    """
+
+    return None if seconds is None else round(seconds, 3)
+
+
+class Word:
+    """
+    A recognized word with its timing and confidence, as far as the API supplies them.
+    """
+
+    def __init__(self, text: str, start: float = None, end: float = None, confidence: float = None):
+        """
+        Constructor method.
+        :param text: The word
+        :param start: Start time in secs, relative to the beginning of the audio file
+        :param end: End time in secs, relative to the beginning of the audio file
+        :param confidence: Confidence between 0 and 1
+        """
+
+        self.text = text
+        self.start = start
+        self.end = end
+        self.confidence = confidence
+
+    def toDict(self):
+        """
+        :return: JSON serializable representation of the word.
+        """
+
+        return {'text': self.text, 'start': roundTime(self.start), 'end': roundTime(self.end),
+                'confidence': self.confidence}
+
+    @staticmethod
+    def fromDict(data: dict):
+        """
+        :param data: Dictionary created by toDict()
+        :return: New Word instance.
+        """
+
+        return Word(data['text'], data.get('start'), data.get('end'), data.get('confidence'))
+
+
+class Segment:
+    """
+    A transcribed part of the audio between two pauses.
+    """
+
+    def __init__(self, index: int, start: float, end: float, text: str = '', confidence: float = None,
+                 words: List[Word] = None):
+        """
+        Constructor method.
+        :param index: Ordinal number of the segment
+        :param start: Start time in secs, relative to the beginning of the audio file
+        :param end: End time in secs, relative to the beginning of the audio file
+        :param text: Recognized text, empty if the speech was unintelligible
+        :param confidence: Confidence between 0 and 1, or None if the API does not supply it
+        :param words: Recognized words with timings, if the API supplies them
+        """
+
+        self.index = index
+        self.start = start
+        self.end = end
+        self.text = text
+        self.confidence = confidence
+        self.words = words or []
+
+    def toDict(self):
+        """
+        :return: JSON serializable representation of the segment.
+        """
+
+        return {'index': self.index, 'start': roundTime(self.start), 'end': roundTime(self.end), 'text': self.text,
+                'confidence': self.confidence, 'words': [word.toDict() for word in self.words]}
+
+    @staticmethod
+    def fromDict(data: dict):
+        """
+        :param data: Dictionary created by toDict()
+        :return: New Segment instance.
+        """
+
+        return Segment(data['index'], data['start'], data['end'], data.get('text', ''), data.get('confidence'),
+                       [Word.fromDict(word) for word in data.get('words', [])])
+
+
+class Transcript:
+    """
+    Structured transcription result: the list of segments with their timings.
+    """
+
+    def __init__(self, offset: float = 0, segments: List[Segment] = None):
+        """
+        Constructor method.
+        :param offset: Start of the transcribed window in secs (FileOptions.offset)
+        :param segments: Transcribed segments, ordered by start time
+        """
+
+        self.offset = offset
+        self.segments = segments or []
+
+    def addSegment(self, segment: Segment):
+        """
+        Adds the segment, keeping the segments ordered by their start time.
+        :param segment:
+        :return:
+        """
+
+        self.segments.append(segment)
+
+        if len(self.segments) > 1 and self.segments[-2].start > segment.start:
+            self.segments.sort(key=lambda item: item.start)
+
+    def getText(self):
+        """
+        :return: Text of all non-empty segments, separated by spaces.
+        """
+
+        return ' '.join(segment.text for segment in self.segments if segment.text)
+
+    def isEmpty(self):
+        """
+        :return: True if no segment contains recognized text, False otherwise.
+        """
+
+        return not any(segment.text for segment in self.segments)
+
+    def toDict(self):
+        """
+        :return: JSON serializable representation of the transcript.
+        """
+
+        return {'offset': self.offset, 'segments': [segment.toDict() for segment in self.segments]}
+
+    @staticmethod
+    def fromDict(data: dict):
+        """
+        :param data: Dictionary created by toDict()
+        :return: New Transcript instance.
+        """
+
+        return Transcript(data.get('offset', 0), [Segment.fromDict(segment) for segment in data.get('segments', [])])
+
+
+class TranscriptPreview:
+    """
+    Bounded beginning of the transcript's text, for transcripts that are streamed to files instead of kept in memory.
+    """
+
+    def __init__(self, limit: int = None):
+        """
+        Constructor method.
+        :param limit: Maximal number of characters, unbounded if None
+        """
+
+        self.limit = limit
+        self.parts = []
+        self.length = 0
+        self.truncated = False
+        self.empty = True
+
+    def add(self, text: str):
+        """
+        Appends the segment's text as long as the limit is not reached.
+        :param text: Segment's text
+        :return:
+        """
+
+        if not text:
+            return
+
+        self.empty = False
+        if self.truncated:
+            return
+
+        piece = (' ' if self.parts else '') + text
+        if self.limit is not None and self.length + len(piece) > self.limit:
+            piece = piece[:self.limit - self.length]
+            self.truncated = True
+
+        self.parts.append(piece)
+        self.length += len(piece)
+
+    def getText(self):
+        """
+        :return: The previewed text.
+        """
+
+        return ''.join(self.parts)
+
+    def isEmpty(self):
+        """
+        :return: True if no added segment contained text, False otherwise.
+        """
+
+        return self.empty
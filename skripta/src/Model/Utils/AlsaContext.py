@@ -1,4 +1,6 @@
+import threading
 from ctypes import *
+from ctypes.util import find_library
 from contextlib import contextmanager
 
 ERROR_HANDLER_FUNC = CFUNCTYPE(None, c_char_p, c_int, c_char_p, c_int, c_char_p)
@@ -11,13 +13,72 @@ def py_error_handler(filename, line, function, err, fmt):
 c_error_handler = ERROR_HANDLER_FUNC(py_error_handler)
 
 
+class AlsaErrorHandler:
+    """
+    Process-wide manager of the ALSA error handler.
+    The library is resolved once; the silent handler is installed by the first user and removed by the last one,
+    so nested and concurrent contexts are safe. Without libasound (i.e. not on Linux) it does nothing.
+    """
+
+    _lock = threading.Lock()
+    _users = 0
+    _library = None
+    _resolved = False
+
+    @classmethod
+    def getLibrary(cls):
+        """
+        :return: The loaded libasound, or None if it is not available.
+        """
+
+        if not cls._resolved:
+            for name in ('libasound.so', 'libasound.so.2', find_library('asound')):
+                if name is None:
+                    continue
+                try:
+                    cls._library = cdll.LoadLibrary(name)
+                    break
+                except OSError:
+                    continue
+
+            cls._resolved = True
+
+        return cls._library
+
+    @classmethod
+    def acquire(cls):
+        """
+        Installs the silent error handler if this is the first user.
+        :return:
+        """
+
+        with cls._lock:
+            library = cls.getLibrary()
+            if cls._users == 0 and library is not None:
+                library.snd_lib_error_set_handler(c_error_handler)
+            cls._users += 1
+
+    @classmethod
+    def release(cls):
+        """
+        Restores the default error handler if this is the last user.
+        :return:
+        """
+
+        with cls._lock:
+            cls._users -= 1
+            if cls._users == 0 and cls._library is not None:
+                cls._library.snd_lib_error_set_handler(None)
+
+
 @contextmanager
 def hideAlsaErrors():
     """
     Context for disabling ALSA errors.
     :return:
     """
-    sound = cdll.LoadLibrary('libasound.so')
-    sound.snd_lib_error_set_handler(c_error_handler)
-    yield
-    sound.snd_lib_error_set_handler(None)
\ No newline at end of file
+    AlsaErrorHandler.acquire()
+    try:
+        yield
+    finally:
+        AlsaErrorHandler.release()
@@ -0,0 +1,59 @@
+import os
+import sys
+import threading
+
+from typing import BinaryIO
+
+from src.Model.Enums.MessageType import MessageType
+from src.Model.Utils.MessageProtocol import MessageReader
+
+
+class CancelToken:
+    """
+    Cooperative cancellation flag of a transcription job.
+    The job checks it between requests, so it can stop cleanly and keep what it has already transcribed.
+    """
+
+    def __init__(self):
+        """
+        Initializes a token that is not cancelled.
+        """
+
+        self.event = threading.Event()
+
+    def cancel(self):
+        """
+        Requests the cancellation of the job.
+        :return:
+        """
+
+        self.event.set()
+
+    def isCancelled(self):
+        """
+        :return: True if the cancellation was requested, False otherwise.
+        """
+
+        return self.event.is_set()
+
+    def watch(self, stream: BinaryIO = None):
+        """
+        Starts a daemon thread which cancels the token when a cancel message arrives on the stream.
+        :param stream: Binary input stream carrying protocol frames, worker's standard input by default
+        :return:
+        """
+
+        stream = stream or sys.stdin.buffer
+
+        def readMessages():
+            reader = MessageReader()
+
+            # the descriptor is read directly: a thread blocked in the buffered stream holds its lock,
+            # and the interpreter aborts when it finds the lock taken at exit
+            for data in iter(lambda: os.read(stream.fileno(), 4096), b''):
+                for messageType, payload in reader.feed(data):
+                    if messageType == MessageType.CANCEL:
+                        self.cancel()
+                        return
+
+        threading.Thread(target=readMessages, name='cancel-watch', daemon=True).start()
@@ -1,5 +1,7 @@
 import mimetypes
 
+from src.Model.Pipeline.Decoders import getSupportedExtensions
+
 
 class FileTypeUtil:
     """
@@ -43,9 +45,10 @@ class FileTypeUtil:
         :return: A string like "(TypeName1 *ext1;;TypeName2 *ext2;; ... ;;TypeNameN *extn)".
         """
 
-        return "All formats (*odt *docx *uot *xml *tex *txt *html);;" \
+        return "All formats (*odt *docx *uot *xml *tex *rtf *txt *html *srt *vtt);;" \
                "ODF Text Document (*odt);;Word 2007-365 (*docx);;Unified Office Format text (*uot);;Word 2003 XML " \
-               "(*xml);;HTML (*html);;TeX (*tex);;Rich text (*rtf);; Text(*txt)"
+               "(*xml);;HTML (*html);;TeX (*tex);;Rich text (*rtf);; Text(*txt);;SubRip subtitles, recognized text without edits (*srt);;" \
+               "WebVTT subtitles, recognized text without edits (*vtt)"
 
     @staticmethod
     def getTextualExtensionsAsList():
@@ -59,7 +62,7 @@ class FileTypeUtil:
     @staticmethod
     def getSupportedExtensions():
         """
-        :return: A tuple containing all audio extensions that are supported by Speech Recognition library.
+        :return: A tuple containing all audio extensions that can be decoded (compressed formats need ffmpeg).
         """
 
-        return ('.wav', '.aiff', 'aifc', '.flac')
+        return getSupportedExtensions()
@@ -0,0 +1,72 @@
+import json
+import os
+import time
+
+from typing import List
+
+from src.Model.Utils.Paths import ROOT_DIRECTORY, CACHE_DIRECTORY
+
+
+class LanguagesCache:
+    """
+    Utility class handling the local, versioned cache of languages supported by Google's Speech-to-Text API.
+    The cache is a JSON file {"version": .., "fetched": <unix time>, "languages": [[name, tag], ...]}.
+    If the user's cache is missing or outdated, the list bundled with the app is used.
+    """
+
+    VERSION = 1
+    TIME_TO_LIVE = 30 * 24 * 3600  # refresh monthly
+
+    CACHE_PATH = CACHE_DIRECTORY / 'languages.json'
+    BUNDLED_PATH = ROOT_DIRECTORY / 'resources/languages.json'
+
+    @staticmethod
+    def read(path: os.PathLike):
+        """
+        :param path: Path to a cache file
+        :return: Tuple (languages, fetch_time), or None if the file is missing, invalid or of another version.
+        """
+
+        try:
+            with open(path, 'r', encoding='utf8') as file:
+                data = json.load(file)
+
+            if data['version'] != LanguagesCache.VERSION or not data['languages']:
+                return None
+
+            return ([list(language) for language in data['languages']], data['fetched'])
+
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def load():
+        """
+        :return: Tuple (languages, is_stale), where languages is a list of [language-name, language-tag] lists.
+        """
+
+        cached = LanguagesCache.read(LanguagesCache.CACHE_PATH) or LanguagesCache.read(LanguagesCache.BUNDLED_PATH)
+
+        if cached is None:
+            return ([['English (United States)', 'en-US']], True)
+
+        languages, fetched = cached
+        return (languages, time.time() - fetched > LanguagesCache.TIME_TO_LIVE)
+
+    @staticmethod
+    def save(languages: List[List[str]]):
+        """
+        Atomically replaces the user's cache with the given languages.
+        :param languages: List of [language-name, language-tag] lists
+        :return:
+        """
+
+        data = {'version': LanguagesCache.VERSION, 'fetched': int(time.time()), 'languages': languages}
+
+        os.makedirs(CACHE_DIRECTORY, exist_ok=True)
+        temporaryPath = LanguagesCache.CACHE_PATH.with_suffix('.tmp')
+
+        with open(temporaryPath, 'w', encoding='utf8') as file:
+            json.dump(data, file, ensure_ascii=False)
+
+        os.replace(temporaryPath, LanguagesCache.CACHE_PATH)
@@ -0,0 +1,115 @@
+import json
+import sys
+import threading
+
+from typing import List, Tuple, TextIO
+
+from src.Model.Enums.ErrorCode import ErrorCode
+from src.Model.Enums.MessageType import MessageType
+
+
+class MessageProtocol:
+    """
+    Utility class describing the framed message protocol between the worker process and the controller.
+    Every message is a single line of JSON on the worker's standard output channel: {"type": "<type>", ...payload}.
+    Standard error channel is left for third party noise (ALSA, logging) and is never parsed.
+    """
+
+    _lock = threading.Lock()
+
+    @staticmethod
+    def encode(messageType: MessageType, **payload):
+        """
+        :param messageType: Type of the message
+        :param payload: JSON serializable message content
+        :return: The message frame as bytes, terminated by a newline.
+        """
+
+        payload['type'] = messageType.__str__()
+        return (json.dumps(payload) + '\n').encode('utf8')
+
+    @staticmethod
+    def decode(frame: bytes):
+        """
+        Parses a single message frame.
+        Frames that are not valid protocol messages (i.e. stray prints) are treated as log messages.
+        :param frame: One line of worker's output, without the trailing newline
+        :return: Tuple (message_type, payload)
+        """
+
+        text = frame.decode('utf8', errors='replace')
+
+        try:
+            payload = json.loads(text)
+            messageType = MessageType[payload.pop('type').upper()]
+        except (ValueError, KeyError, AttributeError, TypeError):
+            return (MessageType.LOG, {'message': text})
+
+        if messageType == MessageType.ERROR:
+            try:
+                payload['code'] = ErrorCode[payload.get('code', '').upper()]
+            except KeyError:
+                payload['code'] = ErrorCode.UNKNOWN
+
+        return (messageType, payload)
+
+    @staticmethod
+    def send(messageType: MessageType, stream: TextIO = None, **payload):
+        """
+        Writes a message to the given stream (worker's standard output by default) and flushes it.
+        Safe to call from multiple threads.
+        :param messageType: Type of the message
+        :param stream: Output text stream
+        :param payload: JSON serializable message content
+        :return:
+        """
+
+        stream = stream or sys.stdout
+        frame = MessageProtocol.encode(messageType, **payload).decode('utf8')
+
+        with MessageProtocol._lock:
+            stream.write(frame)
+            stream.flush()
+
+
+class MessageReader:
+    """
+    Incremental reader of protocol frames. Buffers partial lines between reads.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty reader.
+        """
+
+        self.buffer = b''
+
+    def feed(self, data: bytes) -> List[Tuple[MessageType, dict]]:
+        """
+        Appends the given data to the buffer and decodes all complete frames.
+        :param data: Raw bytes read from the worker's output
+        :return: The list of decoded (message_type, payload) tuples.
+        """
+
+        self.buffer += data
+        *frames, self.buffer = self.buffer.split(b'\n')
+
+        return [MessageProtocol.decode(frame) for frame in frames if frame.strip()]
+
+    def flush(self) -> List[Tuple[MessageType, dict]]:
+        """
+        Decodes whatever is left in the buffer, i.e. after the worker process has finished.
+        :return: The list of decoded (message_type, payload) tuples.
+        """
+
+        frames, self.buffer = [self.buffer], b''
+
+        return [MessageProtocol.decode(frame) for frame in frames if frame.strip()]
+
+    def reset(self):
+        """
+        Drops any buffered data.
+        :return:
+        """
+
+        self.buffer = b''
@@ -0,0 +1,289 @@
+import bisect
+import threading
+
+from typing import Iterable, Tuple
+
+
+class Metric:
+    """
+    Base class of all metric types. Holds one value per combination of label values.
+    """
+
+    type = 'untyped'
+
+    def __init__(self, name: str, description: str, labelNames: Iterable[str] = ()):
+        """
+        Constructor method.
+        :param name: Metric name, i.e. "skripta_requests_total"
+        :param description: Metric help text
+        :param labelNames: Names of the labels every sample must define
+        """
+
+        self.name = name
+        self.description = description
+        self.labelNames = tuple(labelNames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def getKey(self, labels: dict):
+        """
+        :param labels: Label values keyed by label names
+        :return: Tuple of label values in the order of label names.
+        """
+
+        return tuple(str(labels.get(labelName, '')) for labelName in self.labelNames)
+
+    def formatLabels(self, key: Tuple[str, ...], extra: Tuple[Tuple[str, str], ...] = ()):
+        """
+        :param key: Tuple of label values
+        :param extra: Additional (name, value) pairs, i.e. histogram's "le" label
+        :return: Labels in exposition format, i.e. '{api="google"}', or an empty string.
+        """
+
+        pairs = list(zip(self.labelNames, key)) + list(extra)
+        if not pairs:
+            return ''
+
+        escaped = ['{}="{}"'.format(name, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                   for name, value in pairs]
+        return '{' + ','.join(escaped) + '}'
+
+    def render(self):
+        """
+        :return: The metric in Prometheus text exposition format.
+        """
+
+        lines = ['# HELP {} {}'.format(self.name, self.description), '# TYPE {} {}'.format(self.name, self.type)]
+
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append('{}{} {}'.format(self.name, self.formatLabels(key), formatValue(value)))
+
+        return '\n'.join(lines)
+
+    def snapshot(self):
+        """
+        :return: JSON serializable copy of all values, keyed by label values joined with ','.
+        """
+
+        with self.lock:
+            return {','.join(key): value for key, value in self.values.items()}
+
+
+class Counter(Metric):
+    """
+    Monotonically increasing metric.
+    """
+
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        """
+        Increases the counter.
+        :param amount: Non-negative increment
+        :param labels: Label values
+        :return:
+        """
+
+        key = self.getKey(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    Metric that can go up and down.
+    """
+
+    type = 'gauge'
+
+    def set(self, value: float, **labels):
+        """
+        Sets the gauge to the given value.
+        :param value:
+        :param labels: Label values
+        :return:
+        """
+
+        key = self.getKey(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        """
+        Increases the gauge.
+        :param amount: Increment, may be negative
+        :param labels: Label values
+        :return:
+        """
+
+        key = self.getKey(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        """
+        Decreases the gauge.
+        :param amount: Decrement
+        :param labels: Label values
+        :return:
+        """
+
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """
+    Metric that counts observations in cumulative buckets.
+    """
+
+    type = 'histogram'
+
+    def __init__(self, name: str, description: str, labelNames: Iterable[str] = (), buckets: Iterable[float] = ()):
+        """
+        Constructor method.
+        :param name: Metric name
+        :param description: Metric help text
+        :param labelNames: Names of the labels every sample must define
+        :param buckets: Sorted upper bounds of the buckets, +Inf is implied
+        """
+
+        super().__init__(name, description, labelNames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        """
+        Records an observation.
+        :param value: Observed value
+        :param labels: Label values
+        :return:
+        """
+
+        key = self.getKey(labels)
+        with self.lock:
+            counts, total, count = self.values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(counts):
+                counts[index] += 1
+            self.values[key] = (counts, total + value, count + 1)
+
+    def render(self):
+        """
+        :return: The histogram in Prometheus text exposition format (cumulative buckets, sum and count).
+        """
+
+        lines = ['# HELP {} {}'.format(self.name, self.description), '# TYPE {} {}'.format(self.name, self.type)]
+
+        with self.lock:
+            for key, (counts, total, count) in sorted(self.values.items()):
+                cumulative = 0
+                for bound, bucketCount in zip(self.buckets, counts):
+                    cumulative += bucketCount
+                    lines.append('{}_bucket{} {}'.format(
+                        self.name, self.formatLabels(key, (('le', formatValue(bound)),)), cumulative))
+
+                lines.append('{}_bucket{} {}'.format(self.name, self.formatLabels(key, (('le', '+Inf'),)), count))
+                lines.append('{}_sum{} {}'.format(self.name, self.formatLabels(key), formatValue(total)))
+                lines.append('{}_count{} {}'.format(self.name, self.formatLabels(key), count))
+
+        return '\n'.join(lines)
+
+    def snapshot(self):
+        """
+        :return: JSON serializable {labels: {"sum": .., "count": ..}} dictionary.
+        """
+
+        with self.lock:
+            return {','.join(key): {'sum': total, 'count': count} for key, (counts, total, count) in self.values.items()}
+
+
+class MetricsRegistry:
+    """
+    A collection of metrics that can be rendered together.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty registry.
+        """
+
+        self.metrics = []
+
+    def register(self, metric: Metric):
+        """
+        Adds the metric to the registry.
+        :param metric:
+        :return: The given metric.
+        """
+
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        :return: All registered metrics in Prometheus text exposition format.
+        """
+
+        return '\n'.join(metric.render() for metric in self.metrics) + '\n'
+
+    def snapshot(self):
+        """
+        :return: JSON serializable dictionary of all metric values, keyed by metric names.
+        """
+
+        return {metric.name: metric.snapshot() for metric in self.metrics}
+
+
+def formatValue(value: float):
+    """
+    :param value:
+    :return: The value formatted for the exposition format (integers without a decimal point).
+    """
+
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+REAL_TIME_FACTOR_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 5, 10)
+
+
+class Metrics:
+    """
+    Metrics collected by the recognition worker and the transcription server.
+    """
+
+    requests = REGISTRY.register(
+        Counter('skripta_requests_total', 'Recognition requests by API backend and outcome.', ('api', 'outcome')))
+
+    requestLatency = REGISTRY.register(
+        Histogram('skripta_request_latency_seconds', 'Recognition request latency by API backend.', ('api',),
+                  LATENCY_BUCKETS))
+
+    retries = REGISTRY.register(
+        Counter('skripta_request_retries_total', 'Retried recognition requests by API backend and reason.',
+                ('api', 'reason')))
+
+    reruns = REGISTRY.register(
+        Counter('skripta_reruns_total', 'Low-confidence segments recognized again by API backend and outcome.',
+                ('api', 'outcome')))
+
+    audioSeconds = REGISTRY.register(
+        Counter('skripta_audio_seconds_total', 'Seconds of audio submitted for recognition.', ('api',)))
+
+    realTimeFactor = REGISTRY.register(
+        Histogram('skripta_real_time_factor', 'Processing time divided by audio duration.', ('api',),
+                  REAL_TIME_FACTOR_BUCKETS))
+
+    cacheLookups = REGISTRY.register(
+        Counter('skripta_cache_lookups_total', 'Cache lookups by cache name and result (hit/miss).',
+                ('cache', 'result')))
+
+    queueDepth = REGISTRY.register(
+        Gauge('skripta_queue_depth', 'Number of jobs waiting to be processed.', ('queue',)))
+
+    errors = REGISTRY.register(
+        Counter('skripta_errors_total', 'Errors by type.', ('type',)))
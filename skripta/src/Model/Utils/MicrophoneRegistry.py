@@ -0,0 +1,97 @@
+import threading
+
+from typing import List
+
+from src.Model.Utils.AlsaContext import hideAlsaErrors
+
+
+class MicrophoneInfo:
+    """
+    A helper class describing one audio device and its input capabilities.
+    """
+
+    def __init__(self, index: int, name: str, maxInputChannels: int, defaultSampleRate: float):
+        """
+        Constructor method.
+        :param index: PortAudio device index (the one expected by speech_recognition's Microphone)
+        :param name: Device name
+        :param maxInputChannels: Maximal number of input channels, 0 for output-only devices
+        :param defaultSampleRate: Device's default sample rate in Hz
+        """
+
+        self.index = index
+        self.name = name
+        self.maxInputChannels = maxInputChannels
+        self.defaultSampleRate = defaultSampleRate
+
+    def isInput(self):
+        """
+        :return: True if the device can record audio, False otherwise.
+        """
+
+        return self.maxInputChannels > 0
+
+
+class MicrophoneRegistry:
+    """
+    Process-wide cache of audio devices.
+    Devices are enumerated once (a full PortAudio scan), and again only after invalidate() is called,
+    i.e. on a hot-plug event, or when a refresh is explicitly requested.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty registry.
+        """
+
+        self.devices = None
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def enumerate():
+        """
+        Scans all audio devices.
+        :return: The list of MicrophoneInfo instances, ordered by device index.
+        """
+
+        import pyaudio
+
+        with hideAlsaErrors():
+            audio = pyaudio.PyAudio()
+            try:
+                devices = []
+                for index in range(audio.get_device_count()):
+                    info = audio.get_device_info_by_index(index)
+                    devices.append(MicrophoneInfo(index, info.get('name'), int(info.get('maxInputChannels', 0)),
+                                                  float(info.get('defaultSampleRate', 0))))
+                return devices
+            finally:
+                audio.terminate()
+
+    def getDevices(self, refresh: bool = False) -> List[MicrophoneInfo]:
+        """
+        :param refresh: If True, the devices are scanned again
+        :return: The list of all audio devices, ordered by device index.
+        """
+
+        with self.lock:
+            if refresh or self.devices is None:
+                self.devices = self.enumerate()
+            return self.devices
+
+    def getNames(self, refresh: bool = False) -> List[str]:
+        """
+        :param refresh: If True, the devices are scanned again
+        :return: The list of device names, same as speech_recognition's Microphone.list_microphone_names().
+        """
+
+        return [device.name for device in self.getDevices(refresh)]
+
+    def invalidate(self):
+        """
+        Drops the cached devices, the next lookup scans them again.
+        :return:
+        """
+
+        with self.lock:
+            self.devices = None
@@ -0,0 +1,12 @@
+import os
+from pathlib import Path
+
+# Absolute path to app root dir
+# (kept free of heavy imports, so the worker process can use it without loading the GUI)
+ROOT_DIRECTORY = Path(__file__).resolve().parent.parent.parent.parent
+
+# Directory of the app's caches, i.e. ~/.cache/skripta
+CACHE_DIRECTORY = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'skripta'
+
+# Directory of the saved transcripts, i.e. ~/Transkripti
+RESULT_DIRECTORY = Path.home() / 'Transkripti'
@@ -0,0 +1,130 @@
+import json
+import os
+import sys
+import threading
+
+from typing import Iterable, Tuple
+
+from src.Model.Utils.Paths import CACHE_DIRECTORY
+
+
+class RealTimeFactors:
+    """
+    Utility class keeping the real-time factors (request time / audio time) measured by earlier runs, per API.
+    The statistics are a JSON file {"<api>": {"latency": <secs>, "audio": <secs>, "runs": <count>, ...}, ...},
+    where older runs weigh less, so predictions follow changes of the services.
+    Sums over the single requests are kept as well, to fit the latency of a request to its audio duration.
+    """
+
+    STATS_PATH = CACHE_DIRECTORY / 'realtime-factors.json'
+    DECAY = 0.8  # weight of the previous statistics when a run is recorded
+
+    MIN_REQUESTS = 5  # requests needed to fit the latency model
+    REQUEST_SUMS = ('requests', 'sumAudio', 'sumAudio2', 'sumLatency', 'sumAudioLatency')
+
+    _lock = threading.Lock()
+
+    @staticmethod
+    def load():
+        """
+        :return: Dictionary of statistics per API name, empty if there are none.
+        """
+
+        try:
+            with open(RealTimeFactors.STATS_PATH, 'r', encoding='utf8') as file:
+                stats = json.load(file)
+            return stats if isinstance(stats, dict) else {}
+
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def get(api: str):
+        """
+        :param api: API name
+        :return: Tuple (real_time_factor, runs), or (None, 0) if the API was never measured.
+        """
+
+        stats = RealTimeFactors.load().get(api)
+
+        if not stats or not stats.get('audio'):
+            return (None, 0)
+
+        return (stats['latency'] / stats['audio'], stats.get('runs', 0))
+
+    @staticmethod
+    def getLatencyModel(api: str):
+        """
+        Fits the latency of the API's requests to their audio duration, as latency = overhead + cost * duration.
+        :param api: API name
+        :return: Tuple (overhead, cost) in secs and secs per second of audio,
+                 or None if there are too few requests, or their durations do not differ enough.
+        """
+
+        stats = RealTimeFactors.load().get(api) or {}
+        count, sumAudio, sumAudio2, sumLatency, sumAudioLatency = (stats.get(key, 0)
+                                                                   for key in RealTimeFactors.REQUEST_SUMS)
+
+        if count < RealTimeFactors.MIN_REQUESTS:
+            return None
+
+        meanAudio = sumAudio / count
+        meanLatency = sumLatency / count
+        variance = sumAudio2 / count - meanAudio ** 2
+
+        # durations within about a second of each other cannot tell the overhead from the cost
+        if variance < 1:
+            return None
+
+        cost = max((sumAudioLatency / count - meanAudio * meanLatency) / variance, 0)
+        overhead = max(meanLatency - cost * meanAudio, 0)
+
+        return (overhead, cost)
+
+    @staticmethod
+    def record(api: str, requests: Iterable[Tuple[float, float]]):
+        """
+        Adds a finished run to the statistics, and atomically replaces the statistics file.
+        :param api: API name
+        :param requests: Tuples (audio, latency) of the run's requests: duration of the recognized audio
+                         and time of the request in secs
+        :return:
+        """
+
+        requests = list(requests)
+        audio = sum(duration for duration, _ in requests)
+
+        if audio <= 0:
+            return
+
+        with RealTimeFactors._lock:
+            stats = RealTimeFactors.load()
+            previous = stats.get(api) or {}
+            decay = RealTimeFactors.DECAY
+
+            stats[api] = {
+                'latency': previous.get('latency', 0) * decay + sum(latency for _, latency in requests),
+                'audio': previous.get('audio', 0) * decay + audio,
+                'runs': previous.get('runs', 0) + 1,
+            }
+
+            sums = (len(requests), audio, sum(duration ** 2 for duration, _ in requests),
+                    sum(latency for _, latency in requests),
+                    sum(duration * latency for duration, latency in requests))
+
+            for key, value in zip(RealTimeFactors.REQUEST_SUMS, sums):
+                stats[api][key] = previous.get(key, 0) * decay + value
+
+            temporaryPath = RealTimeFactors.STATS_PATH.with_suffix('.{}.tmp'.format(os.getpid()))
+
+            # statistics are only used for predictions, so failing to store them is not an error
+            try:
+                os.makedirs(CACHE_DIRECTORY, exist_ok=True)
+
+                with open(temporaryPath, 'w', encoding='utf8') as file:
+                    json.dump(stats, file)
+
+                os.replace(temporaryPath, RealTimeFactors.STATS_PATH)
+
+            except OSError as e:
+                print('OSError - Real-time factors: ', e.__str__(), file=sys.stderr)
@@ -0,0 +1,209 @@
+import os
+import sqlite3
+
+from typing import Iterable
+
+from src.Model.Export.Writers import READABLE_EXTENSIONS, readSegments
+from src.Model.Pipeline.Transcript import Segment
+from src.Model.Utils.Paths import CACHE_DIRECTORY, RESULT_DIRECTORY
+
+
+def toMilliseconds(seconds: float):
+    """
+    :param seconds: Time in secs, or None
+    :return: Time in whole milliseconds, or None.
+    """
+
+    return None if seconds is None else int(round(seconds * 1000))
+
+
+class TranscriptIndex:
+    """
+    Local full-text index (SQLite FTS5) of saved transcripts, storing the segments' time offsets.
+    Files are indexed when saved, others are picked up incrementally by update() (by size and modification time).
+    """
+
+    INDEX_PATH = CACHE_DIRECTORY / 'transcripts.sqlite'
+
+    def __init__(self, path: os.PathLike = None):
+        """
+        Opens (and creates if needed) the index database.
+        :param path: Database path, the default one in the cache directory if None
+        """
+
+        path = path or self.INDEX_PATH
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript('''
+            PRAGMA journal_mode = WAL;
+            PRAGMA foreign_keys = ON;
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                size INTEGER,
+                modified INTEGER
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS segments USING fts5(
+                text, file_id UNINDEXED, start_ms UNINDEXED, end_ms UNINDEXED, tokenize = 'unicode61'
+            );
+        ''')
+
+    def recordSegments(self, path: str, segments: Iterable[Segment]):
+        """
+        Replaces the file's indexed segments while they are being written, i.e. by a transcript writer.
+        Changes are committed by close(), or by the context manager's successful exit.
+        :param path: Path of the transcript file
+        :param segments: Transcript's segments
+        :return: Generator passing the segments through.
+        """
+
+        fileId = self.resetFile(path)
+
+        for segment in segments:
+            if segment.text:
+                self.connection.execute('INSERT INTO segments (text, file_id, start_ms, end_ms) VALUES (?, ?, ?, ?)',
+                                        (segment.text, fileId, toMilliseconds(segment.start),
+                                         toMilliseconds(segment.end)))
+            yield segment
+
+    def addFile(self, path: str, segments: Iterable[Segment]):
+        """
+        Replaces the file's indexed segments.
+        :param path: Path of the transcript file
+        :param segments: Transcript's segments
+        :return:
+        """
+
+        for _ in self.recordSegments(path, segments):
+            pass
+
+    def resetFile(self, path: str):
+        """
+        Removes the file's indexed segments and registers it again, without size and modification time.
+        :param path: Path of the transcript file
+        :return: The file's id.
+        """
+
+        path = os.path.abspath(path)
+        self.removeFile(path)
+
+        cursor = self.connection.execute('INSERT INTO files (path) VALUES (?)', (path,))
+        return cursor.lastrowid
+
+    def removeFile(self, path: str):
+        """
+        Removes the file from the index.
+        :param path: Path of the transcript file
+        :return:
+        """
+
+        row = self.connection.execute('SELECT id FROM files WHERE path = ?', (os.path.abspath(path),)).fetchone()
+        if row is None:
+            return
+
+        self.connection.execute('DELETE FROM segments WHERE file_id = ?', row)
+        self.connection.execute('DELETE FROM files WHERE id = ?', row)
+
+    def update(self, directory: os.PathLike = RESULT_DIRECTORY):
+        """
+        Indexes new and changed readable transcripts in the directory (recursively),
+        and removes the deleted ones from the index.
+        :param directory: Directory of the transcripts
+        :return: Number of (re)indexed files.
+        """
+
+        directory = os.path.abspath(directory)
+        # compared as a prefix, LIKE would treat '_' and '%' in the directory's name as wildcards
+        prefix = os.path.join(directory, '')
+        indexed = {path: (size, modified) for path, size, modified in
+                   self.connection.execute('SELECT path, size, modified FROM files WHERE substr(path, 1, ?) = ?',
+                                           (len(prefix), prefix))}
+        updated = 0
+
+        for root, _, names in os.walk(directory):
+            for name in names:
+                path = os.path.join(root, name)
+                if os.path.splitext(name)[1].lower() not in READABLE_EXTENSIONS:
+                    indexed.pop(path, None)
+                    continue
+
+                state = indexed.pop(path, None)
+                try:
+                    status = os.stat(path)
+                except OSError as e:
+                    # deleted meanwhile, or unreadable
+                    print('Exception - index transcript: ', e.__str__())
+                    continue
+
+                if state == (status.st_size, status.st_mtime_ns):
+                    continue
+
+                try:
+                    self.addFile(path, readSegments(path))
+                except (OSError, ValueError) as e:
+                    print('Exception - index transcript: ', e.__str__())
+                    continue
+
+                self.markIndexed(path)
+                updated += 1
+
+        # remaining entries were deleted
+        for path in indexed:
+            if not os.path.exists(path):
+                self.removeFile(path)
+
+        self.connection.commit()
+
+        return updated
+
+    def markIndexed(self, path: str):
+        """
+        Stores the file's current size and modification time, so unchanged files are skipped by update().
+        :param path: Path of the transcript file
+        :return:
+        """
+
+        status = os.stat(path)
+        self.connection.execute('UPDATE files SET size = ?, modified = ? WHERE path = ?',
+                                (status.st_size, status.st_mtime_ns, os.path.abspath(path)))
+
+    def search(self, query: str, limit: int = 50):
+        """
+        :param query: FTS5 query, i.e. words or "a phrase"
+        :param limit: Maximal number of matches
+        :return: List of matched segments, best first, as dictionaries {path, start, end, text},
+                 with start and end offsets in milliseconds (None for untimed transcripts).
+        @:raises:
+            ValueError: if the query is malformed
+        """
+
+        try:
+            rows = self.connection.execute('''
+                SELECT files.path, segments.start_ms, segments.end_ms,
+                       snippet(segments, 0, '[', ']', '...', 16)
+                FROM segments JOIN files ON files.id = segments.file_id
+                WHERE segments MATCH ?
+                ORDER BY rank LIMIT ?
+            ''', (query, limit)).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError('invalid query: ' + e.__str__())
+
+        return [{'path': path, 'start': start, 'end': end, 'text': text} for path, start, end, text in rows]
+
+    def close(self):
+        """
+        Commits the changes and closes the database.
+        :return:
+        """
+
+        self.connection.commit()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        if excType is not None:
+            self.connection.rollback()
+        self.close()
@@ -0,0 +1,148 @@
+import os
+import time
+
+from typing import Callable
+
+from src.Model.Backends.Registry import BACKENDS
+from src.Model.Enums.MessageType import MessageType
+from src.Model.Pipeline.AudioSource import DecodedAudioSource
+from src.Model.Pipeline.ChunkPlanner import ChunkPlanner
+from src.Model.Pipeline.Decoders import getSupportedExtensions
+from src.Model.Pipeline.Segmenter import EnergySegmenter
+from src.Model.Utils.MessageProtocol import MessageProtocol
+from src.Model.Utils.RealTimeFactors import RealTimeFactors
+from src.Model.Workers.Recognizer import Recognizer
+
+
+class Estimator:
+    """
+    Dry run of a file transcription: predicts its request count and duration without calling any API.
+    Files are decoded and split by the same energy segmenter as in the real run, so each segment is one request.
+    """
+
+    def __init__(self, fileOptions: Recognizer.FileOptions, commonOptions: Recognizer.CommonOptions,
+                 sink: Callable[..., None] = None):
+        """
+        Constructor method.
+        :param fileOptions: File options, the file may also be a directory (all supported files in it are estimated)
+        :param commonOptions: Energy threshold options (the API is not used, all APIs are estimated)
+        :param sink: Callable receiving (message_type, **payload), writes to standard output by default
+        """
+
+        self.fileOptions = fileOptions
+        self.commonOptions = commonOptions
+        self.sink = sink or MessageProtocol.send
+
+        self.planners = {api.__str__(): ChunkPlanner.forBackend(backendClass) for api, backendClass in BACKENDS.items()}
+
+    def getFiles(self):
+        """
+        :return: Sorted list of the audio files to estimate.
+        """
+
+        path = self.fileOptions.file
+        if not os.path.isdir(path):
+            return [path]
+
+        extensions = getSupportedExtensions()
+        return sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names
+                      if os.path.splitext(name)[1].lower() in extensions)
+
+    def estimateFile(self, path: str):
+        """
+        Decodes the file's window and splits it into speech segments, as long as the longest planned chunk.
+        Shorter chunks of other backends are counted by splitting the segments evenly.
+        :param path: Path to the audio file
+        :return: Dictionary {file, audioSeconds, speechSeconds, segments, requests} with requests per API name,
+                 or {file, error} if it cannot be decoded.
+        """
+
+        fileOptions = Recognizer.FileOptions(path, self.fileOptions.offset, self.fileOptions.duration)
+        recognizer = Recognizer(None, fileOptions, self.commonOptions)
+        offset = fileOptions.offset or 0
+
+        try:
+            with DecodedAudioSource(path) as source:
+                energyRecognizer = recognizer.initRecognizer(source)
+                source.seek(offset)
+
+                maxSegment = max(planner.getDuration() for planner in self.planners.values())
+                segmenter = EnergySegmenter(source.SAMPLE_RATE, source.SAMPLE_WIDTH,
+                                            recognizer.getSegmentThreshold(energyRecognizer), maxSegment=maxSegment)
+
+                blockSeconds = []
+
+                def countBlocks(blocks):
+                    for block in blocks:
+                        blockSeconds.append(len(block) / (source.SAMPLE_RATE * source.SAMPLE_WIDTH))
+                        yield block
+
+                # segments are only counted, so memory stays flat for long files
+                segments, speechSeconds = 0, 0.0
+                requests = dict.fromkeys(self.planners, 0)
+                for segment in segmenter.split(countBlocks(recognizer.readBlocks(source)), offset):
+                    segments += 1
+                    speechSeconds += segment.duration
+                    for api, planner in self.planners.items():
+                        requests[api] += planner.countRequests(segment.duration)
+
+            audioSeconds = sum(blockSeconds)
+
+        except (ValueError, OSError) as e:
+            return {'file': path, 'error': e.__str__()}
+
+        return {'file': path, 'audioSeconds': round(audioSeconds, 3), 'speechSeconds': round(speechSeconds, 3),
+                'segments': segments, 'requests': requests}
+
+    def estimateBackends(self, requests: dict, speechSeconds: float):
+        """
+        :param requests: Number of requests per API name
+        :param speechSeconds: Total duration of the segments in secs
+        :return: Dictionary of predictions per API name: request count, planned chunk length and predicted time,
+                 from the real-time factor measured by earlier runs (None if the API was never used).
+        """
+
+        backends = {}
+
+        for api, backendClass in BACKENDS.items():
+            realTimeFactor, runs = RealTimeFactors.get(api.__str__())
+
+            backends[api.__str__()] = {
+                'requests': 0 if backendClass.LOCAL else requests[api.__str__()],
+                'local': backendClass.LOCAL,
+                'chunkSeconds': round(self.planners[api.__str__()].getDuration(), 1),
+                'realTimeFactor': None if realTimeFactor is None else round(realTimeFactor, 4),
+                'measuredRuns': runs,
+                'predictedSeconds': None if realTimeFactor is None else round(realTimeFactor * speechSeconds, 1),
+            }
+
+        return backends
+
+    def run(self):
+        """
+        Estimates every file, sending each file's estimate as a progress message,
+        and the totals with the predictions per API as the result.
+        :return:
+        """
+
+        startTime = time.monotonic()
+        files = []
+
+        for path in self.getFiles():
+            estimate = self.estimateFile(path)
+            files.append(estimate)
+            self.sink(MessageType.PROGRESS, stage='estimated', estimate=estimate)
+
+        estimated = [estimate for estimate in files if 'error' not in estimate]
+        segments = sum(estimate['segments'] for estimate in estimated)
+        speechSeconds = sum(estimate['speechSeconds'] for estimate in estimated)
+
+        self.sink(MessageType.RESULT, estimate={
+            'files': files,
+            'audioSeconds': round(sum(estimate['audioSeconds'] for estimate in estimated), 3),
+            'speechSeconds': round(speechSeconds, 3),
+            'segments': segments,
+            'backends': self.estimateBackends({api: sum(estimate['requests'][api] for estimate in estimated)
+                                               for api in self.planners}, speechSeconds),
+            'elapsedSeconds': round(time.monotonic() - startTime, 3),
+        })
@@ -1,36 +1,116 @@
-import numpy as np
-import pandas as pd
+import urllib.request
+
+from html.parser import HTMLParser
+
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from src.Model.Utils.LanguagesCache import LanguagesCache
+
+
+class TableParser(HTMLParser):
+    """
+    Minimal HTML parser collecting the text of all table cells, grouped by tables and rows.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty parser.
+        """
+
+        super().__init__()
+
+        self.tables = []
+        self.cell = None
+
+    def handle_starttag(self, tag: str, attrs: list):
+        """
+        Starts a new table, row or cell.
+        :return:
+        """
+
+        if tag == 'table':
+            self.tables.append([])
+        elif tag == 'tr' and self.tables:
+            self.tables[-1].append([])
+        elif tag in ('td', 'th') and self.tables and self.tables[-1]:
+            self.cell = []
+
+    def handle_endtag(self, tag: str):
+        """
+        Closes the current cell.
+        :return:
+        """
+
+        if tag in ('td', 'th') and self.cell is not None:
+            self.tables[-1][-1].append(' '.join(''.join(self.cell).split()))
+            self.cell = None
+
+    def handle_data(self, data: str):
+        """
+        Collects the text of the current cell.
+        :return:
+        """
+
+        if self.cell is not None:
+            self.cell.append(data)
+
 
 class LanguagesLookup(QObject):
     """
     A worker class for lookup supported languages.
     """
 
+    URL = 'https://cloud.google.com/speech-to-text/docs/languages'
+
     finished = pyqtSignal(list)
 
+    @staticmethod
+    def parseLanguages(html: str):
+        """
+        Extracts the languages from the Google's languages page.
+        :param html: Page content
+        :return: Sorted list of unique [language-name, language-tag] lists.
+        """
+
+        parser = TableParser()
+        parser.feed(html)
+
+        languages = set()
+
+        for table in parser.tables:
+            if not table or 'BCP-47' not in table[0] or 'Name' not in table[0]:
+                continue
+
+            nameIndex = table[0].index('Name')
+            tagIndex = table[0].index('BCP-47')
+
+            for row in table[1:]:
+                if len(row) > max(nameIndex, tagIndex) and row[nameIndex] and row[tagIndex]:
+                    languages.add((row[nameIndex], row[tagIndex]))
+
+        return [list(language) for language in sorted(languages)]
+
     def run(self):
         """
-        Fetches the list of languages supported by Google's Speech-to-Text API.
+        Fetches the list of languages supported by Google's Speech-to-Text API and stores it in the local cache.
         When done, emits the result in the format of a list of 2-element lists [language-name, language-tag].
+        If the fetch fails, the cached (or bundled) list is emitted.
         :return:
         """
 
         try:
-            table = pd.read_html('https://cloud.google.com/speech-to-text/docs/languages', match='BCP-47')
-            dataframe = table[0]
+            with urllib.request.urlopen(self.URL, timeout=30) as response:
+                html = response.read().decode('utf8', errors='replace')
 
-            languages = dataframe['Name']
-            tags = dataframe['BCP-47']
+            result = self.parseLanguages(html)
+            if not result:
+                raise ValueError('languages table not found')
 
-            tuples = np.array((languages, tags)).T
-            resultTuples = [tuple(row) for row in tuples]
-            result = np.unique(resultTuples, axis=0)
+            LanguagesCache.save(result)
 
         except Exception as e:
             print('Exception - fetch languages: ', e.__str__())
-            self.finished.emit([['English (United States)', 'en-US']])
+            self.finished.emit(LanguagesCache.load()[0])
             return
 
         self.finished.emit(result)
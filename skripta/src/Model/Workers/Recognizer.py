@@ -1,15 +1,40 @@
+import collections
+import concurrent.futures
+import contextlib
+import copy
+import itertools
 import json
+import math
+import os
 import socket
-import sys
 
 import speech_recognition as sr
 
-from typing import Tuple, Union, Iterable, TextIO
+from typing import Tuple, Union, Iterable, Callable
 
 from src.Model.Enums.EnergyThresholdOption import EnergyThresholdOption
+from src.Model.Enums.ErrorCode import ErrorCode
 from src.Model.Enums.API import API
+from src.Model.Enums.BackendPolicy import BackendPolicy
+from src.Model.Enums.MessageType import MessageType
+from src.Model.Backends.PolicyBackend import PolicyBackend
+from src.Model.Backends.RecognitionBackend import RecognitionBackend
+from src.Model.Backends.Registry import createBackend, getBackendClass
+from src.Model.Export.Writers import createWriter
+from src.Model.Pipeline.AudioSource import DecodedAudioSource
+from src.Model.Pipeline.ChunkPlanner import ChunkPlanner
+from src.Model.Pipeline.Decoders import DecodingError
+from src.Model.Pipeline.JobCheckpoint import JobCheckpoint
+from src.Model.Pipeline.Normalizer import Normalizer
+from src.Model.Pipeline.SegmentCache import SegmentCache
+from src.Model.Pipeline.Segmenter import AudioSegment, EnergySegmenter
+from src.Model.Pipeline.Transcript import Transcript, TranscriptPreview, Segment, Word
 from src.Model.Utils.AlsaContext import hideAlsaErrors
-from src.main import ROOT_DIRECTORY
+from src.Model.Utils.CancelToken import CancelToken
+from src.Model.Utils.MessageProtocol import MessageProtocol
+from src.Model.Utils.Metrics import Metrics, REGISTRY
+from src.Model.Utils.Paths import ROOT_DIRECTORY
+from src.Model.Utils.RealTimeFactors import RealTimeFactors
 
 
 class Recognizer:
@@ -64,7 +89,9 @@ class Recognizer:
         """
 
         def __init__(self, energyOption: EnergyThresholdOption, energyValue: int, api: API, language: str,
-                     phrases: Union[Iterable[str], Iterable[Tuple[str, float]]], grammar: str):
+                     phrases: Union[Iterable[str], Iterable[Tuple[str, float]]], grammar: str,
+                     alternates: Iterable[API] = (), policy: BackendPolicy = BackendPolicy.FALLBACK,
+                     hedgeDelay: float = 0, rerun: 'Recognizer.RerunOptions' = None):
             """
             Constructor method.
             :param energyOption: Energy threshold option
@@ -73,6 +100,10 @@ class Recognizer:
             :param language: A language tag i.e. "en-US"
             :param phrases: Preferred phrases: list of phrases or list of (phrase, sensitivity)
             :param grammar: Path to a .gram file defining FSG or JSGF grammar
+            :param alternates: APIs combined with the selected one by the policy, in the order of preference
+            :param policy: How the APIs are combined on every segment, used only with alternates
+            :param hedgeDelay: Secs before a racing request is sent to the next API, 0 to send it to all at once
+            :param rerun: Re-recognition of low-confidence segments, segments are recognized once if None
             """
 
             self.energyValue = energyValue
@@ -81,20 +112,135 @@ class Recognizer:
             self.language = language
             self.phrases = phrases
             self.grammar = grammar
+            self.alternates = [alternate for alternate in alternates or [] if alternate != api]
+            self.policy = policy
+            self.hedgeDelay = hedgeDelay
+            self.rerun = rerun
 
             # print(energyOption, energyValue, api, language, phrases, grammar)
 
-    def __init__(self, micOptions: MicOptions, fileOptions: FileOptions, commonOptions: CommonOptions):
+        def getAPIs(self):
+            """
+            :return: The selected API followed by the alternates, without repetitions.
+            """
+
+            return list(dict.fromkeys([self.api, *self.alternates]))
+
+    class RerunOptions:
+        """
+        A helper subclass describing how segments recognized with a low confidence are recognized again.
+        """
+
+        def __init__(self, threshold: float, api: API = None,
+                     phrases: Union[Iterable[str], Iterable[Tuple[str, float]]] = None, maxSegment: float = None):
+            """
+            Constructor method.
+            :param threshold: Segments recognized with a lower confidence (between 0 and 1) are recognized again
+            :param api: API of the re-recognition, the selected API if None
+            :param phrases: Preferred phrases of the re-recognition, the common phrases if None
+            :param maxSegment: The segment is recognized again in parts of at most this many secs,
+                               split only by the API's limits if None
+            """
+
+            self.threshold = threshold
+            self.api = api
+            self.phrases = phrases
+            self.maxSegment = maxSegment
+
+    class OutputOptions:
+        """
+        A helper subclass describing where the transcript is written while the recognition runs.
+        """
+
+        def __init__(self, outputs: Iterable[str] = (), previewLimit: int = None):
+            """
+            Constructor method.
+            :param outputs: Paths of the output files, the format is chosen by the extension (.txt, .srt, .vtt, ...)
+            :param previewLimit: Maximal number of characters of the result text sent when outputs are given,
+                                 unbounded if None
+            """
+
+            self.outputs = list(outputs or [])
+            self.previewLimit = previewLimit
+
+    class PendingRequest:
+        """
+        A helper subclass describing a started transcription of an audio segment.
+        """
+
+        def __init__(self, audioSegment: AudioSegment):
+            """
+            Constructor method.
+            :param audioSegment: The transcribed audio segment
+            """
+
+            self.audioSegment = audioSegment
+            self.fingerprint = None  # None if the segment cache is not used
+            self.speechOffset = 0.0
+            self.cached = None  # (text, confidence, words) from the segment cache
+
+            self.future = None
+
+    CANCEL_CHECK_INTERVAL = 0.5  # secs between checks of the cancel token while waiting for a request
+    THRESHOLD_STEPS = 2  # steps per doubling of the grid of measured segmentation thresholds
+
+    def __init__(self, micOptions: MicOptions, fileOptions: FileOptions, commonOptions: CommonOptions,
+                 outputOptions: OutputOptions = None, sink: Callable[..., None] = None,
+                 segmentCache: SegmentCache = None, resumable: bool = False, cancelToken: CancelToken = None):
         """
         Initializes a worker instance with given SR options.
         :param micOptions: An instance of mic-input related transcription options.
         :param fileOptions: An instance of file-input related transcription options.
         :param commonOptions: An instance of api and background noise related options class.
+        :param outputOptions: An instance of output files related options, no files are written if None.
+        :param sink: Callable receiving (message_type, **payload) for every outgoing message,
+                     writes messages to standard output (see MessageProtocol) by default.
+        :param segmentCache: Cache of recognized segments, every segment is sent to the API if None.
+        :param resumable: If True, file transcriptions are checkpointed and resumed when run again.
+        :param cancelToken: Token checked before every request, the job cannot be cancelled if None.
         """
 
         self.micOptions = micOptions
         self.fileOptions = fileOptions
         self.commonOptions = commonOptions
+        self.outputOptions = outputOptions or Recognizer.OutputOptions()
+        self.sink = sink or MessageProtocol.send
+        self.segmentCache = segmentCache
+        self.resumable = resumable
+        self.cancelToken = cancelToken or CancelToken()
+
+        # (audio, latency) of every request in secs by API, for later predictions and chunk planning
+        self.requestTimings = {}
+
+    def sendResult(self, text: str, **payload):
+        """
+        Sends the transcription result to the sink.
+        :param text: The transcript
+        :param payload: Additional result data
+        :return:
+        """
+
+        self.sink(MessageType.RESULT, text=text, **payload)
+
+    def sendProgress(self, stage: str, **payload):
+        """
+        Sends a progress update to the sink.
+        :param stage: Name of the reached stage, i.e. "listened"
+        :param payload: Additional progress data
+        :return:
+        """
+
+        self.sink(MessageType.PROGRESS, stage=stage, **payload)
+
+    def sendError(self, code: ErrorCode, message: str):
+        """
+        Sends an error report to the sink.
+        :param code: Error code
+        :param message: Human readable error description
+        :return:
+        """
+
+        self.sink(MessageType.ERROR, code=code.__str__(), message=message)
 
     def initRecognizer(self, source: sr.AudioSource):
         """
@@ -106,107 +252,626 @@ class Recognizer:
         recognizer = sr.Recognizer()
         recognizer.operation_timeout = 1800  # api request timeouts after half an hour
 
+        # without a start value (i.e. an empty noise field in the GUI), the recognizer's default threshold is kept
+        energyValue = self.commonOptions.energyValue
+        if energyValue is None:
+            energyValue = recognizer.energy_threshold
+
         if self.commonOptions.energyOption == EnergyThresholdOption.FIXED:
-            recognizer.energy_threshold = self.commonOptions.energyValue
+            recognizer.energy_threshold = energyValue
             recognizer.dynamic_energy_threshold = False
 
         if self.commonOptions.energyOption == EnergyThresholdOption.MIXED:
-            recognizer.energy_threshold = self.commonOptions.energyValue
+            recognizer.energy_threshold = energyValue
 
         if self.commonOptions.energyOption == EnergyThresholdOption.DYNAMIC:
             recognizer.adjust_for_ambient_noise(source, 0.75)
 
         return recognizer
 
-    def getAPIResult(self, recognizer: sr.Recognizer, audio: sr.AudioData, env: TextIO):
+    def openBackend(self, apis: Iterable[API] = None, options: CommonOptions = None):
         """
-        Makes an API request and returns the result.
-        :param recognizer: A recognizer instance
-        :param audio: A audio data instance
-        :param env: An IO Stream containing environmental variables
-        :return: The result text
-        @:raises:
-            RequestError: if the env key is invalid, there are internet connection issues or if the Sphinx was not installed properly
-            UnknownValueError: if the speech recognition process failed due to speech being unintelligible
-            AssertionError: if the api request arguments are not of expected type
-            socket.timeout: if the request takes more than half an hour to retrieve result
+        Creates and opens the backend of the selected API, with credentials from env.json.
+        If alternate APIs are given, the backend combines them by the selected policy.
+        Every request of the backend updates the request metrics.
+        :param apis: APIs of the backend, the selected API and the alternates if None
+        :param options: Options of the backend, the common options if None
+        :return: The opened RecognitionBackend instance, or None if it cannot be opened (error is reported).
+        """
+
+        apis = apis or self.commonOptions.getAPIs()
+        options = options or self.commonOptions
+
+        environment = self.loadEnvironment(apis)
+        if environment is None:
+            return None
+
+        try:
+            backends = [createBackend(api, options, environment) for api in apis]
+            if len(backends) > 1:
+                backend = PolicyBackend(backends, self.commonOptions.policy, self.commonOptions.hedgeDelay)
+            else:
+                backend = backends[0]
+
+            backend.listener = self.recordRequest
+            backend.open()
+        except ValueError as e:
+            self.sendError(ErrorCode.UNAUTHORISED, "ValueError - Backend: " + e.__str__())
+            return None
+
+        return backend
+
+    def openRerunBackend(self):
         """
+        Creates and opens the backend re-recognizing low-confidence segments.
+        :return: The opened RecognitionBackend instance, or None if it cannot be opened (error is reported).
+        """
+
+        rerun = self.commonOptions.rerun
+
+        options = copy.copy(self.commonOptions)
+        if rerun.phrases is not None:
+            options.phrases = rerun.phrases
 
-        with env:
-            jsonData = json.load(env)
+        return self.openBackend([rerun.api or self.commonOptions.api], options)
 
-            if self.commonOptions.api == API.GOOGLE:
-                apiKey = jsonData["GOOGLE_API_KEY"]
-                return recognizer.recognize_google(audio, apiKey, self.commonOptions.language)
+    def loadEnvironment(self, apis: Iterable[API]):
+        """
+        :param apis: APIs of the opened backend
+        :return: Environmental variables from env.json, or None if the file cannot be read (error is reported).
+                 Backends needing no credentials run without the file.
+        """
 
-            if self.commonOptions.api == API.GOOGLE_CLOUD:
-                creds = json.dumps(jsonData["GOOGLE_CLOUD_CREDS"])
-                return recognizer.recognize_google_cloud(audio, creds, self.commonOptions.language,
-                                                         self.commonOptions.phrases)
+        try:
+            with open(ROOT_DIRECTORY.parent.__str__() + "/env.json", 'r') as env:
+                return json.load(env)
 
-            if self.commonOptions.api == API.HOUNDIFY:
-                clientID = jsonData["HOUNDIFY_CLIENT_ID"]
-                clientKey = jsonData["HOUNDIFY_CLIENT_KEY"]
-                return recognizer.recognize_houndify(audio, clientID, clientKey)
+        except FileNotFoundError:
+            if not any(getBackendClass(api).CREDENTIALS for api in apis):
+                return {}
+            self.sendError(ErrorCode.UNAUTHORISED, "FileNotFoundError - env file: env.json not found")
+            return None
 
-            if self.commonOptions.api == API.SPHINX:
-                return recognizer.recognize_sphinx(audio, self.commonOptions.language, self.commonOptions.phrases,
-                                                   self.commonOptions.grammar)
+        except (OSError, ValueError) as e:
+            self.sendError(ErrorCode.UNAUTHORISED, type(e).__name__ + " - env file: " + e.__str__())
+            return None
 
-    def transcribe(self, recognizer: sr.Recognizer, audio: sr.AudioData):
+    def transcribe(self, recognizer: sr.Recognizer, segments: Iterable[AudioSegment], offset: float = 0,
+                   checkpoint: JobCheckpoint = None):
         """
-        Fetches the API result and logs the outcome.
+        Fetches the API result for each audio segment and logs the outcome.
+        Every transcribed segment is sent as a progress message and streamed to the output files.
+        The whole transcript is sent as the result, or just its preview if it was written to the output files.
+        Output files appear (atomically) only if the transcription succeeds.
+        Unintelligible segments are left empty; if all of them are, or any request fails, an error is sent instead.
+        Segments transcribed by an interrupted run of the job are taken from its checkpoint.
+        Asynchronous backends get up to their pipeline depth of requests at once, the results are taken in order.
+        If re-recognition is set, low-confidence segments are recognized again before they are sent.
+        If the job is cancelled, no more requests are made; the transcribed part is written and sent as the result,
+        and the checkpoint is kept so the job can be resumed.
         :param recognizer: Recognizer instance used to make a transcription
-        :param audio: Audio data to transcribe
+        :param segments: Audio segments to transcribe, i.e. a lazy iterator over the audio file
+        :param offset: Start of the transcribed window in secs
+        :param checkpoint: Opened checkpoint of the job, or None
         :return:
         """
 
-        env = None
+        backend = self.openBackend()
+        rerunBackend = None
+
+        if backend is not None and self.commonOptions.rerun is not None:
+            rerunBackend = self.openRerunBackend()
+            if rerunBackend is None:
+                backend.close()
+                backend = None
+
+        if backend is None:
+            if checkpoint is not None:
+                checkpoint.close()
+            return
+
+        transcript = Transcript(offset)
+        preview = TranscriptPreview(self.outputOptions.previewLimit)
+
+        # when the transcript is streamed to files, only its bounded preview is kept in memory
+        writers = [createWriter(path) for path in self.outputOptions.outputs]
+        completed = finished = cancelled = False
+
+        # resumed segments and started requests, taken in order
+        pending = collections.deque()
+
         try:
-            env = open(ROOT_DIRECTORY.parent.__str__() + "/env.json", 'r')
-        except OSError as e:
-            sys.stderr.write("OSError - env file: " + e.__str__())
+            for writer in writers:
+                writer.open()
+
+            # None marks the end of the segments, when the remaining requests are taken
+            for audioSegment in itertools.chain(segments, [None]):
+                if self.cancelToken.isCancelled():
+                    cancelled = True
+                    break
+
+                try:
+                    if audioSegment is not None:
+                        resumed = checkpoint.getResumed(audioSegment.index, audioSegment.start) if checkpoint else None
+                        pending.append(resumed if resumed is not None else
+                                       self.startSegment(recognizer, audioSegment, backend))
+
+                    while pending and (audioSegment is None or len(pending) >= backend.PIPELINE_DEPTH):
+                        segment = self.finishSegment(pending[0], checkpoint, recognizer, rerunBackend)
+                        if segment is None:
+                            cancelled = True
+                            break
+                        pending.popleft()
+
+                        preview.add(segment.text)
+                        if not writers:
+                            transcript.addSegment(segment)
+
+                        self.sendProgress("segment", segment=segment.toDict())
+
+                        for writer in writers:
+                            writer.writeSegment(segment)
+
+                except AssertionError as e:
+                    self.sendError(ErrorCode.UNKNOWN, "AssertionError - Transcription: " + e.__str__())
+                    return
+
+                except sr.RequestError as e:
+                    self.sendError(ErrorCode.FAILED_REQUEST, "RequestError - Transcription: " + e.__str__())
+                    return
+
+                except socket.timeout as e:
+                    self.sendError(ErrorCode.TIMED_OUT, "SocketTimeoutError - Transcription: " + e.__str__())
+                    return
+
+                if cancelled:
+                    break
+
+            completed = not preview.isEmpty()
+            finished = not cancelled
+
+        except DecodingError as e:
+            # the segments are decoded lazily, while they are transcribed
+            self.sendError(ErrorCode.INVALID_FORMAT, "DecodingError - Audio as Source: " + e.__str__())
+            return
+
+        finally:
+            # requests of a failed or cancelled job are abandoned
+            for request in pending:
+                # segment cache hits have no request
+                if isinstance(request, Recognizer.PendingRequest) and request.future is not None:
+                    request.future.cancel()
+
+            backend.close()
+            if rerunBackend is not None:
+                rerunBackend.close()
+
+            # interrupted jobs keep their checkpoint
+            if checkpoint is not None:
+                if finished:
+                    checkpoint.remove()
+                else:
+                    checkpoint.close()
+
+            for writer in writers:
+                if completed:
+                    writer.close()
+                else:
+                    writer.abort()
+
+        if not completed and not cancelled:
+            self.sendError(ErrorCode.DAMAGED_FILE, "UnknownValueError - Transcription: no intelligible speech")
+            return
+
+        if writers:
+            self.sendResult(preview.getText(), truncated=preview.truncated,
+                            outputs=self.outputOptions.outputs if completed else [], cancelled=cancelled)
+        else:
+            self.sendResult(transcript.getText(), transcript=transcript.toDict(), cancelled=cancelled)
+
+    def startSegment(self, recognizer: sr.Recognizer, audioSegment: AudioSegment, backend: RecognitionBackend):
+        """
+        Starts the transcription of a single audio segment.
+        If the segment cache is used, the segment is sent to the API only if its speech was not recognized before.
+        :param recognizer: Recognizer instance used to make a transcription
+        :param audioSegment: Audio segment to transcribe
+        :param backend: Opened backend of the selected API
+        :return: PendingRequest instance, taken by finishSegment.
+        @:raises:
+            RequestError, AssertionError, socket.timeout: if the request cannot be started
+        """
+
+        request = Recognizer.PendingRequest(audioSegment)
+
+        if self.segmentCache is not None:
+            request.fingerprint, request.speechOffset = audioSegment.getFingerprint()
+
+            request.cached = self.segmentCache.get(self.getRecognitionSettings(), request.fingerprint)
+            if request.cached is not None:
+                return request
+
+        request.future = backend.submit(recognizer, audioSegment.toAudioData())
+
+        return request
+
+    def finishSegment(self, request: Union[Segment, 'Recognizer.PendingRequest'], checkpoint: JobCheckpoint = None,
+                      recognizer: sr.Recognizer = None, rerunBackend: RecognitionBackend = None):
+        """
+        Waits for the request's result, re-recognizes the segment if its confidence is low,
+        and updates the segment cache and the checkpoint.
+        :param request: PendingRequest instance, or a segment resumed from the checkpoint
+        :param checkpoint: Opened checkpoint of the job, or None
+        :param recognizer: Recognizer instance used for the re-recognition
+        :param rerunBackend: Opened backend re-recognizing low-confidence segments, or None
+        :return: The transcribed Segment instance (with empty text if the speech was unintelligible),
+                 or None if the job was cancelled while waiting.
+        @:raises:
+            RequestError, AssertionError, socket.timeout: see RecognitionBackend.recognize
+        """
+
+        if isinstance(request, Segment):
+            return request
+
+        audioSegment = request.audioSegment
+        segment = Segment(audioSegment.index, audioSegment.start, audioSegment.end)
+
+        if request.cached is not None:
+            segment.text, segment.confidence, words = request.cached
+            segment.words = self.shiftWords(words, audioSegment.start + request.speechOffset)
+
+        else:
+            if not self.waitFor(request.future):
+                return None
+
+            try:
+                text, confidence, words = request.future.result()
+
+            except sr.UnknownValueError:
+                if request.fingerprint is not None:
+                    self.segmentCache.put(self.getRecognitionSettings(), request.fingerprint, '', None, [])
+                words = None
+
+            if words is not None:
+                # cached word timings are relative to the speech, so they fit the same speech cut a bit differently
+                if request.fingerprint is not None:
+                    self.segmentCache.put(self.getRecognitionSettings(), request.fingerprint, text, confidence,
+                                          self.shiftWords(words, -request.speechOffset))
+
+                # word timings are relative to the segment
+                segment.text = text
+                segment.confidence = confidence
+                segment.words = self.shiftWords(words, audioSegment.start)
+
+        if rerunBackend is not None and self.isUncertain(segment):
+            self.rerunSegment(recognizer, request, segment, rerunBackend)
+
+        if checkpoint is not None:
+            checkpoint.add(segment)
+
+        return segment
+
+    def waitFor(self, future: concurrent.futures.Future):
+        """
+        Waits for the request's future, checking the cancel token.
+        :param future: Future of a request
+        :return: True if the future is done, False if the job was cancelled while waiting.
+        """
+
+        while not future.done():
+            concurrent.futures.wait([future], timeout=self.CANCEL_CHECK_INTERVAL)
+            if self.cancelToken.isCancelled():
+                return False
+
+        return True
+
+    def isUncertain(self, segment: Segment):
+        """
+        :param segment: Transcribed segment
+        :return: True if the segment's confidence is below the re-recognition threshold, False otherwise
+                 or if neither the segment nor its words have a confidence.
+        """
+
+        confidence = self.getConfidence(segment)
+
+        return confidence is not None and confidence < self.commonOptions.rerun.threshold
+
+    @staticmethod
+    def getConfidence(segment: Segment):
+        """
+        :param segment: Transcribed segment
+        :return: Confidence of the segment, or the average of its words' confidences if the API gives no overall one,
+                 None if the segment is empty or has no confidences.
+        """
+
+        if not segment.text:
+            return None
+
+        if segment.confidence is not None:
+            return segment.confidence
+
+        confidences = [word.confidence for word in segment.words if word.confidence is not None]
+
+        return sum(confidences) / len(confidences) if confidences else None
+
+    def rerunSegment(self, recognizer: sr.Recognizer, request: 'Recognizer.PendingRequest', segment: Segment,
+                     backend: RecognitionBackend):
+        """
+        Recognizes the low-confidence segment again, and takes the new result if it is more confident.
+        A failed, unintelligible or cancelled re-recognition keeps the segment as it is.
+        The results are cached like the first recognition, so they are not paid for twice.
+        :param recognizer: Recognizer instance used to make a transcription
+        :param request: Finished request of the segment
+        :param segment: The transcribed segment, updated in place
+        :param backend: Opened backend re-recognizing low-confidence segments
+        :return:
+        """
+
+        audioSegment = request.audioSegment
+        api = backend.API.__str__()
+
+        result = None
+
+        if request.fingerprint is not None:
+            result = self.segmentCache.get(self.getRerunSettings(), request.fingerprint)
+            if result is not None:
+                text, confidence, words = result
+                result = (text, confidence, self.shiftWords(words, request.speechOffset))
+
+        if result is None:
+            try:
+                result = self.recognizeParts(recognizer, audioSegment, backend)
+            except (sr.RequestError, AssertionError, socket.timeout):
+                Metrics.reruns.inc(api=api, outcome='failed')
+                return
+
+            if result is None:
+                return
+
+            if request.fingerprint is not None:
+                text, confidence, words = result
+                self.segmentCache.put(self.getRerunSettings(), request.fingerprint, text, confidence,
+                                      self.shiftWords(words, -request.speechOffset))
+
+        text, confidence, words = result
+
+        if text and confidence is not None and confidence > self.getConfidence(segment):
+            segment.text = text
+            segment.confidence = confidence
+            segment.words = self.shiftWords(words, audioSegment.start)
+            Metrics.reruns.inc(api=api, outcome='improved')
+        else:
+            Metrics.reruns.inc(api=api, outcome='kept')
+
+    def recognizeParts(self, recognizer: sr.Recognizer, audioSegment: AudioSegment, backend: RecognitionBackend):
+        """
+        Recognizes the segment in parts fitting the backend's plan and the re-recognition's maximal segment duration.
+        :param recognizer: Recognizer instance used to make a transcription
+        :param audioSegment: Audio segment to transcribe
+        :param backend: Opened backend re-recognizing low-confidence segments
+        :return: Tuple (text, confidence, words) with word timings relative to the segment,
+                 confidence is the average of the parts' confidences weighted by their duration,
+                 or None if the job was cancelled while waiting.
+        @:raises:
+            RequestError, AssertionError, socket.timeout: see RecognitionBackend.recognize
+        """
+
+        planner = ChunkPlanner.forBackend(type(backend))
+        duration = min(planner.getDuration(), self.commonOptions.rerun.maxSegment or math.inf)
+
+        requests = []
+        texts = []
+        words = []
+        confidences = []
 
         try:
-            resultData = self.getAPIResult(recognizer, audio, env)
-            sys.stdout.write(resultData)
+            for part in planner.split([audioSegment], duration):
+                requests.append((part, backend.submit(recognizer, part.toAudioData())))
+
+            for part, future in requests:
+                if not self.waitFor(future):
+                    return None
+
+                try:
+                    text, confidence, partWords = future.result()
+                except sr.UnknownValueError:
+                    continue
+
+                texts.append(text)
+                words.extend(self.shiftWords(partWords, part.start - audioSegment.start))
+                if confidence is not None:
+                    confidences.append((confidence, part.duration))
 
-        except AssertionError as e:
-            sys.stderr.write("AssertionError - Transcription: " + e.__str__())
+        finally:
+            for part, future in requests:
+                future.cancel()
 
-        except sr.RequestError as e:
-            sys.stderr.write("RequestError - Transcription: " + e.__str__())
+        weight = sum(partDuration for _, partDuration in confidences)
+        confidence = sum(value * partDuration for value, partDuration in confidences) / weight if weight > 0 else None
 
-        except sr.UnknownValueError as e:
-            sys.stderr.write("UnknownValueError - Transcription: " + e.__str__())
+        return (' '.join(texts), confidence, words)
 
-        except socket.timeout as e:
-            sys.stderr.write("SocketTimeoutError - Transcription: " + e.__str__())
+    def getRecognitionSettings(self):
+        """
+        :return: The options affecting the recognized text, as a part of the segment cache key.
+        """
+
+        apis = self.commonOptions.getAPIs()
+        backend = apis[0].__str__()
+        if len(apis) > 1:
+            backend = self.commonOptions.policy.__str__() + ':' + ','.join(api.__str__() for api in apis)
+
+        return (backend, self.commonOptions.language, self.commonOptions.phrases, self.commonOptions.grammar)
+
+    def getRerunSettings(self):
+        """
+        :return: The options affecting the re-recognized text, as a part of the segment cache key.
+        """
+
+        rerun = self.commonOptions.rerun
+        phrases = rerun.phrases if rerun.phrases is not None else self.commonOptions.phrases
+
+        return ((rerun.api or self.commonOptions.api).__str__(), self.commonOptions.language, phrases,
+                self.commonOptions.grammar, rerun.maxSegment)
+
+    def getPlanner(self):
+        """
+        :return: ChunkPlanner of the selected API, or of the API taking the shortest chunks if alternates are given,
+                 so every segment fits all of them.
+        """
+
+        planners = [ChunkPlanner.forBackend(getBackendClass(api)) for api in self.commonOptions.getAPIs()]
+
+        return min(planners, key=lambda planner: planner.getDuration())
+
+    @staticmethod
+    def shiftWords(words: Iterable[Word], shift: float):
+        """
+        :param words: Recognized words
+        :param shift: Time shift in secs
+        :return: New list of the words, with timings shifted by the given time.
+        """
+
+        return [Word(word.text, word.start + shift if word.start is not None else None,
+                     word.end + shift if word.end is not None else None, word.confidence) for word in words]
+
+    def recordRequest(self, api: API, duration: float, latency: float, error: Exception = None,
+                      abandoned: bool = False):
+        """
+        Updates request metrics and timings for a finished API request, listener of the backend.
+        :param api: The API
+        :param duration: Duration of the request's audio in secs
+        :param latency: Latency of the request in secs
+        :param error: Raised exception, None if the request succeeded
+        :param abandoned: The request lost a race or was still running when the segment was decided,
+                          it is neither a success nor an error of the job
+        :return:
+        """
+
+        name = api.__str__()
+
+        if abandoned:
+            Metrics.requests.inc(api=name, outcome='abandoned')
+            return
+
+        if error is not None:
+            Metrics.requests.inc(api=name, outcome='failure')
+            Metrics.errors.inc(type=type(error).__name__)
+            return
+
+        Metrics.requests.inc(api=name, outcome='success')
+        Metrics.requestLatency.observe(latency, api=name)
+        Metrics.audioSeconds.inc(duration, api=name)
+        self.requestTimings.setdefault(name, []).append((duration, latency))
+        if duration > 0:
+            Metrics.realTimeFactor.observe(latency / duration, api=name)
+
+    def readBlocks(self, source: DecodedAudioSource):
+        """
+        Reads the audio file's window defined by the file options' offset and duration.
+        :param source: Opened audio file, positioned at the offset
+        :return: Iterator over mono PCM blocks.
+        """
+
+        toRead = int(self.fileOptions.duration * source.SAMPLE_RATE) if self.fileOptions.duration else None
+
+        while toRead is None or toRead > 0:
+            block = source.stream.read(source.CHUNK if toRead is None else min(toRead, source.CHUNK))
+            if not block:
+                return
+
+            if toRead is not None:
+                toRead -= len(block) // source.SAMPLE_WIDTH
+            yield block
 
     def handleFileInput(self):
         """
         Handles file input recognition process.
+        The file is decoded and normalized as a stream, its window is split into speech segments
+        which are transcribed as soon as they are read.
         :return:
         """
 
-        # audio and recognizer setup
-        audioFile = sr.AudioFile(self.fileOptions.file)
+        offset = self.fileOptions.offset or 0
 
-        try:
-            with audioFile as source:
+        with contextlib.ExitStack() as stack:
+            # audio and recognizer setup, errors of the transcription itself are reported by transcribe
+            try:
+                source = stack.enter_context(DecodedAudioSource(self.fileOptions.file))
                 recognizer = self.initRecognizer(source)
-                audio = recognizer.record(source, self.fileOptions.duration, self.fileOptions.offset)
 
-        except ValueError as e:
-            sys.stderr.write("ValueError - Audio as Source: " + e.__str__())
-            return
+                # ambient noise adjustment reads the beginning of the file, offset counts from the very start
+                source.seek(offset)
 
-        except FileNotFoundError as e:
-            sys.stderr.write("FileNotFoundError - Audio as Source: " + e.__str__())
-            return
+            except ValueError as e:
+                self.sendError(ErrorCode.INVALID_FORMAT, type(e).__name__ + " - Audio as Source: " + e.__str__())
+                return
 
-        # transcription
-        self.transcribe(recognizer, audio)
+            except FileNotFoundError as e:
+                self.sendError(ErrorCode.FILE_NOT_FOUND, "FileNotFoundError - Audio as Source: " + e.__str__())
+                return
+
+            # segments fit the backend's limits, and are as long as its measured latency makes worthwhile
+            maxSegment = self.getPlanner().getDuration()
+
+            checkpoint = self.openCheckpoint(recognizer, maxSegment) if self.resumable else None
+            if checkpoint is not None:
+                maxSegment = checkpoint.maxSegment
+
+            segmenter = EnergySegmenter(source.SAMPLE_RATE, source.SAMPLE_WIDTH, self.getSegmentThreshold(recognizer),
+                                        maxSegment=maxSegment)
+
+            # transcription
+            self.transcribe(recognizer, segmenter.split(self.readBlocks(source), offset), offset, checkpoint)
+
+    def getSegmentThreshold(self, recognizer: sr.Recognizer):
+        """
+        A measured (dynamic) threshold is rounded to a coarse grid, so the noise measured from a slightly different
+        start, i.e. of a trimmed file, splits the audio at the same pauses and the segment cache can reuse the segments.
+        :param recognizer: Recognizer instance, already adjusted to the audio
+        :return: Energy threshold of the file's segmenter.
+        """
+
+        threshold = recognizer.energy_threshold
+        if self.commonOptions.energyOption != EnergyThresholdOption.DYNAMIC or threshold <= 0:
+            return threshold
+
+        return 2 ** (round(math.log2(threshold) * self.THRESHOLD_STEPS) / self.THRESHOLD_STEPS)
+
+    def openCheckpoint(self, recognizer: sr.Recognizer, maxSegment: float):
+        """
+        Opens the checkpoint of the file transcription job.
+        When resuming, the energy threshold and the maximal segment duration of the interrupted run are restored,
+        so the audio is split the same way.
+        :param recognizer: Recognizer instance, already adjusted to the audio
+        :param maxSegment: Planned maximal segment duration in secs
+        :return: JobCheckpoint instance, or None if the checkpoint cannot be written.
+        """
+
+        # re-recognition changes the text of the checkpointed segments
+        settings = [self.getRecognitionSettings()]
+        if self.commonOptions.rerun is not None:
+            settings.append(self.getRerunSettings())
+
+        status = os.stat(self.fileOptions.file)
+        jobId = JobCheckpoint.getJobId(os.path.abspath(self.fileOptions.file), status.st_size, status.st_mtime_ns,
+                                       self.fileOptions.offset, self.fileOptions.duration,
+                                       self.commonOptions.energyOption.__str__(), self.commonOptions.energyValue,
+                                       *settings)
+
+        checkpoint = JobCheckpoint(jobId)
+        if checkpoint.energyThreshold is not None:
+            recognizer.energy_threshold = checkpoint.energyThreshold
+
+        try:
+            checkpoint.start(recognizer.energy_threshold, checkpoint.maxSegment or maxSegment)
+        except OSError as e:
+            self.sink(MessageType.LOG, message='OSError - Checkpoint: ' + e.__str__())
+            return None
+
+        if checkpoint.segments:
+            self.sendProgress("resumed", segments=len(checkpoint.segments))
+
+        return checkpoint
 
     def handleMicInput(self):
         """
@@ -230,26 +895,29 @@ class Recognizer:
                 # trigger timeout error if no speech is detected for 5 mins
                 audio = recognizer.listen(source, timeout=300, phrase_time_limit=self.micOptions.speechTimeout, snowboy_configuration=hotwordsConf)
 
-                sys.stdout.write("Done listening")
+                self.sendProgress("listened")
 
                 # saving audio to file
                 # with open('/home/margarita/Music/Novi_govor.wav', 'wb') as file:
                 #     file.write(audio.get_wav_data())
 
         except sr.WaitTimeoutError as e:
-            sys.stderr.write("WaitTimeoutError - listen: " + e.__str__())
+            self.sendError(ErrorCode.LISTENING_TIMED_OUT, "WaitTimeoutError - listen: " + e.__str__())
             return
 
         except ValueError as e:
-            sys.stderr.write("ValueError - Mic as Source: " + e.__str__())
+            self.sendError(ErrorCode.MIC_NOT_FOUND, "ValueError - Mic as Source: " + e.__str__())
             return
 
         except FileNotFoundError as e:
-            sys.stderr.write("FileNotFoundError - Audio as Source: " + e.__str__())
+            self.sendError(ErrorCode.FILE_NOT_FOUND, "FileNotFoundError - Audio as Source: " + e.__str__())
             return
 
         # transcription
-        self.transcribe(recognizer, audio)
+        normalizer = Normalizer(audio.sample_rate, audio.sample_width, 1)
+        audioSegment = AudioSegment(0, 0, normalizer.normalize(audio.frame_data), Normalizer.SAMPLE_RATE,
+                                    Normalizer.SAMPLE_WIDTH)
+        self.transcribe(recognizer, self.getPlanner().split([audioSegment]))
 
     def run(self):
         """
@@ -257,8 +925,7 @@ class Recognizer:
         If input is set to mic, the listening process is started, resulting in an audio source file.
         If input is set to file, the file is read, also resulting in an audio source file.
         The source file is then submitted for API transcription.
-        Outputs the result data to standard output channel if successful.
-        Outputs the error message to standard error channel otherwise.
+        Sends a result message to the sink if successful, an error message otherwise.
         :return:
         """
 
@@ -269,3 +936,8 @@ class Recognizer:
         # recognize file input
         elif self.fileOptions is not None:
             self.handleFileInput()
+
+        for api, timings in self.requestTimings.items():
+            RealTimeFactors.record(api, timings)
+
+        self.sink(MessageType.METRICS, metrics=REGISTRY.snapshot())
@@ -0,0 +1,80 @@
+import sqlite3
+
+from typing import Iterable
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from src.Model.Export.Writers import exportTranscript
+from src.Model.Pipeline.Transcript import Segment
+from src.Model.Utils.TranscriptIndex import TranscriptIndex
+
+
+class TranscriptExport(QObject):
+    """
+    A worker class for writing a transcript into a document, off the GUI thread.
+    """
+
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, segments: Iterable[Segment], path: str, indexSegments: Iterable[Segment] = None):
+        """
+        Constructor method.
+        :param segments: Transcript's segments, may be lazily read from a spool file
+        :param path: Destination file path, its extension chooses the format
+        :param indexSegments: Segments added to the transcript index for the document, with their timings if known,
+                              or None if the document is not indexed
+        """
+
+        super().__init__()
+
+        self.segments = segments
+        self.path = path
+        self.indexSegments = indexSegments
+
+    def run(self):
+        """
+        Writes the document and adds it to the transcript index.
+        When done, emits the destination path, or the error message if writing fails.
+        :return:
+        """
+
+        try:
+            exportTranscript(self.segments, self.path)
+
+        except (OSError, ValueError) as e:
+            print('Exception - export transcript: ', e.__str__())
+            self.failed.emit(e.__str__())
+            return
+
+        except Exception as e:
+            # the result dialog waits for one of the signals, so an unexpected failure must be reported too
+            print('Exception - export transcript: ', type(e).__name__, e.__str__())
+            self.failed.emit(type(e).__name__ + ': ' + e.__str__())
+            return
+
+        self.indexTranscript()
+
+        self.finished.emit(self.path)
+        return
+
+    def indexTranscript(self):
+        """
+        Adds the written document to the transcript index. The document is saved even if this fails,
+        a later update of the index picks it up.
+        :return:
+        """
+
+        if self.indexSegments is None:
+            return
+
+        try:
+            with TranscriptIndex() as index:
+                index.addFile(self.path, self.indexSegments)
+                index.markIndexed(self.path)
+
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print('Exception - index transcript: ', e.__str__())
+
+        except Exception as e:
+            print('Exception - index transcript: ', type(e).__name__, e.__str__())
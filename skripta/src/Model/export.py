@@ -0,0 +1,86 @@
+import argparse
+import os
+import sqlite3
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+
+from src.Model.Export.Writers import WRITERS, exportTranscript, readSegments
+from src.Model.Utils.TranscriptIndex import TranscriptIndex
+
+
+def convert(source: str, destination: str):
+    """
+    Converts a stored transcript (JSON lines spool or plain text) into a document.
+    :param source: Source file path
+    :param destination: Destination file path, its extension chooses the format
+    :return: The destination path.
+    """
+
+    return exportTranscript(readSegments(source), destination)
+
+
+def exportMany(sources: list, directory: str, extension: str, workers: int = None):
+    """
+    Converts many transcripts in parallel processes, and adds the documents to the transcript index.
+    :param sources: Source file paths
+    :param directory: Destination directory, the sources' directories if None
+    :param extension: Extension of the destination format, e.g. '.docx'
+    :param workers: Number of processes, all CPUs if None
+    :return: List of tuples (source, error message) of failed conversions.
+    """
+
+    failures = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor, TranscriptIndex() as index:
+        futures = {}
+        for source in sources:
+            name = os.path.splitext(os.path.basename(source))[0] + extension
+            destination = os.path.join(directory or os.path.dirname(source), name)
+            futures[executor.submit(convert, source, destination)] = source
+
+        for future, source in futures.items():
+            try:
+                destination = future.result()
+                # indexed here, the index is written by one process only
+                index.addFile(destination, readSegments(source))
+                index.markIndexed(destination)
+            except (OSError, ValueError, sqlite3.Error) as e:
+                failures.append((source, e.__str__()))
+
+    return failures
+
+
+def setupParser():
+    """
+    Setups parser for command line arguments.
+    :return: Parser instance with defined arguments.
+    """
+
+    newParser = argparse.ArgumentParser(description='Bulk export of stored transcripts into documents.')
+
+    newParser.add_argument("sources", type=str, nargs='+', help="transcript files (.jsonl spool or .txt)")
+    newParser.add_argument("-t", "--format", type=str, choices=[extension[1:] for extension in WRITERS],
+                           help="destination format", default='docx')
+    newParser.add_argument("-d", "--directory", type=str, help="destination directory (defaults to the sources')")
+    newParser.add_argument("-j", "--jobs", type=int, help="number of parallel processes")
+
+    return newParser
+
+
+if __name__ == '__main__':
+    """
+    Converts the given transcripts, reports the failed ones to standard error output.
+    """
+
+    args = setupParser().parse_args()
+
+    if args.directory is not None:
+        os.makedirs(args.directory, exist_ok=True)
+
+    failed = exportMany(args.sources, args.directory, '.' + args.format, args.jobs)
+
+    for path, message in failed:
+        print(path + ': ' + message, file=sys.stderr)
+
+    sys.exit(1 if failed else 0)
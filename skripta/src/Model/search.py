@@ -0,0 +1,64 @@
+import argparse
+import sys
+
+from src.Model.Utils.Paths import RESULT_DIRECTORY
+from src.Model.Utils.TranscriptIndex import TranscriptIndex
+
+
+def formatOffset(milliseconds: int):
+    """
+    :param milliseconds: Time offset in milliseconds, or None
+    :return: Time in format HH:MM:SS.mmm, or '-' for untimed transcripts.
+    """
+
+    if milliseconds is None:
+        return '-'
+
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+
+    return '{:02d}:{:02d}:{:02d}.{:03d}'.format(hours, minutes, seconds, milliseconds)
+
+
+def setupParser():
+    """
+    Setups parser for command line arguments.
+    :return: Parser instance with defined arguments.
+    """
+
+    newParser = argparse.ArgumentParser(description='Full-text search of saved transcripts.')
+
+    newParser.add_argument("query", type=str, nargs='?', help="words or \"a phrase\" to search for")
+    newParser.add_argument("-d", "--directory", type=str, help="transcripts directory",
+                           default=RESULT_DIRECTORY.__str__())
+    newParser.add_argument("-n", "--no_update", action='store_true',
+                           help="search without indexing new and changed transcripts first")
+    newParser.add_argument("-l", "--limit", type=int, help="maximal number of matches", default=50)
+
+    return newParser
+
+
+if __name__ == '__main__':
+    """
+    Updates the index and prints the matches, one per line: path, start and end offset, text.
+    """
+
+    args = setupParser().parse_args()
+
+    with TranscriptIndex() as index:
+        if not args.no_update:
+            index.update(args.directory)
+
+        if args.query is None:
+            sys.exit(0)
+
+        try:
+            matches = index.search(args.query, args.limit)
+        except ValueError as e:
+            print(e.__str__(), file=sys.stderr)
+            sys.exit(2)
+
+    for match in matches:
+        print('{}\t{}\t{}\t{}'.format(match['path'], formatOffset(match['start']), formatOffset(match['end']),
+                                      match['text']))
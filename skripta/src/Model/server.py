@@ -0,0 +1,384 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Queue
+from urllib.parse import urlparse, parse_qs
+
+from src.Model.Backends.Registry import BACKENDS
+from src.Model.Enums.ErrorCode import ErrorCode
+from src.Model.Enums.MessageType import MessageType
+from src.Model.Pipeline.SegmentCache import SegmentCache
+from src.Model.Utils.CancelToken import CancelToken
+from src.Model.Utils.Metrics import Metrics, REGISTRY
+from src.Model.Workers.Recognizer import Recognizer
+from src.Model.worker import setupParser as setupWorkerParser, getTranscriptionOptions
+
+
+class TranscriptionPool:
+    """
+    A fixed size pool of recognition threads with a bounded number of waiting jobs.
+    """
+
+    def __init__(self, workers: int, queueSize: int, segmentCache: SegmentCache = None):
+        """
+        Constructor method.
+        :param workers: Number of jobs processed at once
+        :param queueSize: Number of jobs that may wait for a free worker, further jobs are rejected
+        :param segmentCache: Cache of recognized segments shared by the jobs, not used if None
+        """
+
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='recognizer')
+        self.slots = threading.BoundedSemaphore(workers + queueSize)
+        self.workers = workers
+        self.segmentCache = segmentCache
+
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    def trySubmit(self, options: tuple, sink, cancelToken: CancelToken = None):
+        """
+        Submits a transcription job if there is room for it.
+        :param options: Tuple (mic_options, file_options, common_options, output_options)
+        :param sink: Callable receiving the job's messages
+        :param cancelToken: Token cancelling the job, i.e. when the client disconnects
+        :return: A future of the job, or None if the pool is saturated.
+        """
+
+        if not self.slots.acquire(blocking=False):
+            Metrics.errors.inc(type='QueueFull')
+            return None
+
+        self.updatePending(1)
+
+        return self.executor.submit(self.runJob, options, sink, cancelToken)
+
+    def runJob(self, options: tuple, sink, cancelToken: CancelToken = None):
+        """
+        Runs a single transcription job and releases its slot.
+        :param options: Tuple (mic_options, file_options, common_options, output_options)
+        :param sink: Callable receiving the job's messages
+        :param cancelToken: Token cancelling the job
+        :return:
+        """
+
+        try:
+            Recognizer(*options, sink=sink, segmentCache=self.segmentCache, cancelToken=cancelToken).run()
+        except Exception as e:
+            # the client always gets an answer, even if the job crashed
+            Metrics.errors.inc(type=type(e).__name__)
+            sink(MessageType.ERROR, code=ErrorCode.UNKNOWN.__str__(),
+                 message=type(e).__name__ + " - Job: " + e.__str__())
+        finally:
+            self.updatePending(-1)
+            self.slots.release()
+
+    def updatePending(self, change: int):
+        """
+        Updates the number of accepted jobs and the queue depth metric.
+        :param change: +1 for an accepted job, -1 for a finished one
+        :return:
+        """
+
+        with self.lock:
+            self.pending += change
+            Metrics.queueDepth.set(max(self.pending - self.workers, 0), queue='server')
+
+
+class TranscriptionRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP interface of the transcription server.
+
+    POST /transcribe with a JSON body containing worker options ({"file": "/path.wav", "api": "sphinx", ...}),
+    or with raw audio body (Content-Type: audio/*) and worker options in the query string.
+    Add "stream=1" to the query string to receive every message as a line of JSON while the job runs.
+    A failed job is answered with a 4xx (bad input) or 5xx (backend failure) status by its error code;
+    streamed responses start before the outcome is known, so their error is only the last line.
+    GET /metrics returns metrics in text exposition format, GET /health returns 200 while the server runs,
+    GET /backends describes the capabilities of each API's backend.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    pool: TranscriptionPool = None
+    maxUploadSize = 0
+
+    # HTTP status of a failed job by its error code, the input's faults are 4xx, the backend's 5xx
+    ERROR_STATUSES = {
+        ErrorCode.FILE_NOT_FOUND.__str__(): 400,
+        ErrorCode.INVALID_FORMAT.__str__(): 422,
+        ErrorCode.DAMAGED_FILE.__str__(): 422,
+        ErrorCode.FAILED_REQUEST.__str__(): 502,
+        ErrorCode.TIMED_OUT.__str__(): 504,
+        ErrorCode.UNAUTHORISED.__str__(): 500,
+        ErrorCode.UNKNOWN.__str__(): 500,
+    }
+
+    def do_GET(self):
+        """
+        Handles metrics, health and backends requests.
+        :return:
+        """
+
+        path = urlparse(self.path).path
+
+        if path == '/metrics':
+            self.sendBody(200, REGISTRY.render().encode('utf8'), 'text/plain; version=0.0.4; charset=utf-8')
+        elif path == '/health':
+            self.sendJSON(200, {'status': 'ok'})
+        elif path == '/backends':
+            self.sendJSON(200, {api.__str__(): backend.getCapabilities() for api, backend in BACKENDS.items()})
+        else:
+            self.sendJSON(404, {'error': 'not found'})
+
+    def do_POST(self):
+        """
+        Handles transcription requests.
+        :return:
+        """
+
+        url = urlparse(self.path)
+        if url.path != '/transcribe':
+            self.sendJSON(404, {'error': 'not found'})
+            return
+
+        query = {key: values if len(values) > 1 else values[0] for key, values in parse_qs(url.query).items()}
+        stream = query.pop('stream', '0') in ('1', 'true')
+
+        upload = None
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if length > self.maxUploadSize:
+                self.close_connection = True
+                self.sendJSON(413, {'error': 'request body too large'}, {'Connection': 'close'})
+                return
+
+            if self.headers.get('Content-Type', '').startswith('audio/'):
+                upload = self.saveUpload(length)
+                query['file'] = upload
+                requestOptions = query
+            else:
+                requestOptions = json.loads(self.rfile.read(length) or b'{}')
+
+            options = self.getOptions(requestOptions)
+
+        except (ValueError, TypeError) as e:
+            self.removeUpload(upload)
+            self.sendJSON(400, {'error': e.__str__()})
+            return
+
+        messages = Queue()
+        cancelToken = CancelToken()
+        future = self.pool.trySubmit(options, lambda messageType, **payload: messages.put((messageType, payload)),
+                                     cancelToken)
+
+        if future is None:
+            self.removeUpload(upload)
+            self.sendJSON(503, {'error': 'server is busy'}, {'Retry-After': '1'})
+            return
+
+        future.add_done_callback(lambda done: messages.put(None))
+
+        try:
+            if stream:
+                self.streamMessages(messages)
+            else:
+                response = self.collectMessages(messages)
+                self.sendJSON(self.getStatus(response), response)
+        except (BrokenPipeError, ConnectionResetError):
+            # the client is gone, no more requests are made for it
+            cancelToken.cancel()
+            self.close_connection = True
+        finally:
+            future.add_done_callback(lambda done: self.removeUpload(upload))
+
+    def getOptions(self, requestOptions: dict):
+        """
+        Builds transcription options from request options, using the same parser as the worker process.
+        :param requestOptions: Worker's long option names (without dashes) mapped to values or lists of values
+        :return: Tuple (mic_options, file_options, common_options, output_options)
+        @:raises:
+            ValueError: if the options are invalid
+        """
+
+        if not isinstance(requestOptions, dict) or 'file' not in requestOptions:
+            raise ValueError('"file" option is required')
+
+        arguments = ['file']
+        for name, value in requestOptions.items():
+            if name in ('input', 'mic', 'speech_timeout', 'hotwords', 'output', 'preview_limit', 'no_cache',
+                        'no_resume', 'cancel_input'):
+                raise ValueError('option "' + name + '" is not supported by the server')
+
+            values = value if isinstance(value, list) else [value]
+            arguments.extend(['--' + name, *[str(item) for item in values]])
+
+        # enum options raise KeyError on unknown names, other invalid options end in parser's exit
+        try:
+            args = setupWorkerParser().parse_args(arguments)
+        except (SystemExit, KeyError):
+            raise ValueError('invalid options: ' + ' '.join(arguments[1:]))
+
+        return getTranscriptionOptions(args)
+
+    def saveUpload(self, length: int):
+        """
+        Streams the request body to a temporary file.
+        :param length: Number of bytes in the body
+        :return: Path to the created file.
+        """
+
+        extension = '.' + self.headers.get('Content-Type').split('/')[1].split(';')[0].replace('x-', '')
+        descriptor, path = tempfile.mkstemp(prefix='skripta-', suffix=extension)
+
+        with os.fdopen(descriptor, 'wb') as file:
+            while length > 0:
+                chunk = self.rfile.read(min(length, 64 * 1024))
+                if not chunk:
+                    break
+                file.write(chunk)
+                length -= len(chunk)
+
+        return path
+
+    @staticmethod
+    def removeUpload(path: str):
+        """
+        Removes an uploaded temporary file.
+        :param path: Path to the file, or None
+        :return:
+        """
+
+        if path is not None and os.path.isfile(path):
+            os.remove(path)
+
+    @staticmethod
+    def collectMessages(messages: Queue):
+        """
+        Waits for the job to finish.
+        :param messages: Queue of the job's messages, terminated by None
+        :return: JSON serializable response containing the result or the error.
+        """
+
+        response = {}
+
+        for messageType, payload in iter(messages.get, None):
+            if messageType in (MessageType.RESULT, MessageType.ERROR):
+                response.update(payload, type=messageType.__str__())
+
+        if not response:
+            response = {'code': ErrorCode.UNKNOWN.__str__(), 'message': 'the job ended without a result',
+                        'type': MessageType.ERROR.__str__()}
+
+        return response
+
+    @classmethod
+    def getStatus(cls, response: dict):
+        """
+        :param response: Response collected from the job's messages
+        :return: HTTP status of the response, 200 if the job sent a result.
+        """
+
+        if response.get('type') == MessageType.RESULT.__str__():
+            return 200
+
+        return cls.ERROR_STATUSES.get(response.get('code'), 500)
+
+    def streamMessages(self, messages: Queue):
+        """
+        Writes each of the job's messages as a line of JSON, using chunked transfer encoding.
+        :param messages: Queue of the job's messages, terminated by None
+        :return:
+        """
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        for messageType, payload in iter(messages.get, None):
+            if messageType == MessageType.METRICS:
+                continue
+
+            line = json.dumps(dict(payload, type=messageType.__str__())).encode('utf8') + b'\n'
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(line), line))
+            self.wfile.flush()
+
+        self.wfile.write(b'0\r\n\r\n')
+
+    def sendJSON(self, status: int, content: dict, headers: dict = None):
+        """
+        Sends a JSON response.
+        :param status: HTTP status code
+        :param content: JSON serializable response content
+        :param headers: Additional headers
+        :return:
+        """
+
+        self.sendBody(status, json.dumps(content).encode('utf8'), 'application/json', headers)
+
+    def sendBody(self, status: int, body: bytes, contentType: str, headers: dict = None):
+        """
+        Sends a complete response.
+        :param status: HTTP status code
+        :param body: Response body
+        :param contentType: Value of the Content-Type header
+        :param headers: Additional headers
+        :return:
+        """
+
+        self.send_response(status)
+        self.send_header('Content-Type', contentType)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def setupParser():
+    """
+    Setups parser for command line arguments.
+    :return: Parser instance with defined arguments.
+    """
+
+    newParser = argparse.ArgumentParser(description='Headless HTTP transcription server.')
+
+    newParser.add_argument("-H", "--host", type=str, help="interface to listen on", default="127.0.0.1")
+    newParser.add_argument("-P", "--port", type=int, help="port to listen on", default=8000)
+    newParser.add_argument("-w", "--workers", type=int, help="number of concurrent transcriptions",
+                           default=os.cpu_count() or 1)
+    newParser.add_argument("-q", "--queue_size", type=int, help="number of requests that may wait for a worker",
+                           default=16)
+    newParser.add_argument("-u", "--max_upload", type=int, help="maximal upload size in MB", default=512)
+    newParser.add_argument("-nc", "--no_cache", action='store_true', help="do not reuse recognized segments")
+
+    return newParser
+
+
+if __name__ == '__main__':
+    """
+    Runs the transcription server until interrupted.
+    """
+
+    args = setupParser().parse_args()
+
+    segmentCache = None if args.no_cache else SegmentCache()
+
+    TranscriptionRequestHandler.pool = TranscriptionPool(args.workers, args.queue_size, segmentCache)
+    TranscriptionRequestHandler.maxUploadSize = args.max_upload * 1024 * 1024
+
+    server = ThreadingHTTPServer((args.host, args.port), TranscriptionRequestHandler)
+    server.daemon_threads = True
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+    if segmentCache is not None:
+        segmentCache.close()
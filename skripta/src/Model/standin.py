@@ -0,0 +1,407 @@
+import argparse
+import base64
+import io
+import json
+import random
+import threading
+import time
+import uuid
+import wave
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+from src.Model.Backends.MockBackend import MockBackend
+from src.Model.Pipeline.Decoders import FlacDecoder
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in for the recognition services, for benchmarking the network path without the real service.
+    Speaks the request and response formats of the Google Speech API v2 (POST /speech-api/v2/recognize, FLAC body)
+    and of the Houndify audio endpoint (POST /v1/audio, WAV body). Transcripts are generated by the mock backend,
+    so they are deterministic for the same audio.
+
+    The Google Cloud long-running recognition is served too: an in-memory Cloud Storage bucket
+    (POST /upload/storage/v1/b/{bucket}/o, DELETE /storage/v1/b/{bucket}/o/{name}),
+    POST /v1/speech:longrunningrecognize, and GET /v1/operations/{name}, done after the sampled latency.
+
+    Point the worker to it in env.json, e.g. "GOOGLE_ENDPOINT": "http://127.0.0.1:8010/speech-api/v2/recognize".
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    GOOGLE_PATH = '/speech-api/v2/recognize'
+    HOUNDIFY_PATH = '/v1/audio'
+    UPLOAD_PATH = '/upload/storage/v1/b/'
+    STORAGE_PATH = '/storage/v1/b/'
+    LONG_RUNNING_PATH = '/v1/speech:longrunningrecognize'
+    OPERATIONS_PATH = '/v1/operations/'
+
+    backend: MockBackend = None
+
+    objects = {}  # uploaded audio by its gs:// URI
+    operations = {}  # long-running operations by name, (done time, transcript)
+
+    # fault injection, as shares of all requests
+    throttleRate = 0.0
+    dropRate = 0.0
+    errorRate = 0.0
+
+    maxConcurrent = 0  # requests above the limit are throttled, 0 for no limit
+    active = 0
+    lock = threading.Lock()
+    random = random.Random()
+
+    def do_POST(self):
+        """
+        Handles recognition requests.
+        :return:
+        """
+
+        url = urlparse(self.path)
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        if url.path.startswith(self.UPLOAD_PATH):
+            self.uploadObject(url, body)
+            return
+
+        if url.path not in (self.GOOGLE_PATH, self.HOUNDIFY_PATH, self.LONG_RUNNING_PATH):
+            self.sendJSON(404, {'error': 'not found'})
+            return
+
+        if url.path == self.GOOGLE_PATH and not parse_qs(url.query).get('key'):
+            self.sendJSON(403, {'error': 'missing API key'})
+            return
+
+        if url.path == self.HOUNDIFY_PATH and not self.headers.get('Hound-Client-Authentication'):
+            self.sendJSON(401, {'Status': 'Error', 'ErrorMessage': 'missing client authentication'})
+            return
+
+        fault = self.getFault()
+
+        if fault == 'drop':
+            # the connection is closed without a response
+            self.close_connection = True
+            return
+
+        if fault == 'error':
+            self.sendJSON(500, {'error': 'simulated server error'})
+            return
+
+        if fault == 'throttle' or not self.acquire():
+            self.sendJSON(429, {'error': 'too many requests'}, {'Retry-After': '1'})
+            return
+
+        if url.path == self.LONG_RUNNING_PATH:
+            self.release()
+            self.startOperation(body)
+            return
+
+        try:
+            duration = self.getDuration(body)
+            time.sleep(self.backend.sampleLatency(duration))
+
+            transcript = None
+            if body and self.backend.sampleOutcome() != 'unintelligible':
+                transcript = self.backend.getTranscript(body, duration)
+
+        finally:
+            self.release()
+
+        if url.path == self.GOOGLE_PATH:
+            self.sendGoogleResponse(transcript)
+        else:
+            self.sendHoundifyResponse(transcript)
+
+    def do_GET(self):
+        """
+        Handles polls of long-running operations.
+        :return:
+        """
+
+        path = urlparse(self.path).path
+        if not path.startswith(self.OPERATIONS_PATH):
+            self.sendJSON(404, {'error': 'not found'})
+            return
+
+        name = unquote(path[len(self.OPERATIONS_PATH):])
+        with self.lock:
+            operation = self.operations.get(name)
+
+        if operation is None:
+            self.sendJSON(404, {'error': {'code': 404, 'message': 'operation not found: ' + name}})
+            return
+
+        doneTime, transcript = operation
+        if time.monotonic() < doneTime:
+            self.sendJSON(200, {'name': name, 'done': False})
+            return
+
+        with self.lock:
+            self.operations.pop(name, None)
+
+        results = []
+        if transcript is not None:
+            text, confidence, words = transcript
+            results.append({'alternatives': [{
+                'transcript': text, 'confidence': confidence,
+                'words': [{'word': word.text, 'startTime': '%.3fs' % word.start, 'endTime': '%.3fs' % word.end,
+                           'confidence': word.confidence} for word in words],
+            }]})
+
+        self.sendJSON(200, {'name': name, 'done': True, 'response': {'results': results}})
+
+    def do_DELETE(self):
+        """
+        Handles deletions of uploaded objects.
+        :return:
+        """
+
+        path = urlparse(self.path).path
+        bucket, separator, name = path[len(self.STORAGE_PATH):].partition('/o/')
+        if not path.startswith(self.STORAGE_PATH) or not separator:
+            self.sendJSON(404, {'error': 'not found'})
+            return
+
+        with self.lock:
+            found = self.objects.pop('gs://' + bucket + '/' + unquote(name), None) is not None
+
+        if found:
+            self.sendBody(204, b'', 'application/json')
+        else:
+            self.sendJSON(404, {'error': {'code': 404, 'message': 'no such object'}})
+
+    def uploadObject(self, url, body: bytes):
+        """
+        Stores an uploaded object (simple media upload) in memory.
+        :param url: Parsed request URL
+        :param body: Content of the object
+        :return:
+        """
+
+        bucket, separator, _ = url.path[len(self.UPLOAD_PATH):].partition('/o')
+        name = parse_qs(url.query).get('name', [''])[0]
+        if not separator or not name:
+            self.sendJSON(400, {'error': {'code': 400, 'message': 'bucket and object name required'}})
+            return
+
+        with self.lock:
+            self.objects['gs://' + bucket + '/' + name] = body
+
+        self.sendJSON(200, {'bucket': bucket, 'name': name, 'size': str(len(body))})
+
+    def startOperation(self, body: bytes):
+        """
+        Starts a long-running recognition of audio in the request or in the bucket.
+        The transcript is prepared at once, the operation is reported done after the sampled latency.
+        :param body: JSON request with config and audio (uri or base64 content)
+        :return:
+        """
+
+        try:
+            request = json.loads(body.decode('utf8'))
+            audio = request['audio']
+            if 'uri' in audio:
+                with self.lock:
+                    data = self.objects[audio['uri']]
+            else:
+                data = base64.b64decode(audio['content'])
+
+        except (ValueError, KeyError, TypeError) as e:
+            self.sendJSON(400, {'error': {'code': 400, 'message': 'invalid request: ' + e.__str__()}})
+            return
+
+        duration = self.getDuration(data)
+
+        transcript = None
+        if data and self.backend.sampleOutcome() != 'unintelligible':
+            transcript = self.backend.getTranscript(data, duration)
+
+        name = uuid.uuid4().hex
+        with self.lock:
+            self.operations[name] = (time.monotonic() + self.backend.sampleLatency(duration), transcript)
+
+        self.sendJSON(200, {'name': name})
+
+    def getFault(self):
+        """
+        :return: 'drop', 'error', 'throttle' or None, by the configured rates.
+        """
+
+        with self.lock:
+            draw = self.random.random()
+
+        for fault, rate in (('drop', self.dropRate), ('error', self.errorRate), ('throttle', self.throttleRate)):
+            if draw < rate:
+                return fault
+            draw -= rate
+
+        return None
+
+    def acquire(self):
+        """
+        Counts the request as active, if the concurrency limit allows it.
+        :return: True if the request may proceed, False if it should be throttled.
+        """
+
+        with self.lock:
+            if 0 < self.maxConcurrent <= StandInRequestHandler.active:
+                return False
+            StandInRequestHandler.active += 1
+            return True
+
+    def release(self):
+        """
+        Counts the request as finished.
+        :return:
+        """
+
+        with self.lock:
+            StandInRequestHandler.active -= 1
+
+    def getDuration(self, body: bytes):
+        """
+        :param body: FLAC or WAV audio
+        :return: Duration of the audio in secs, estimated from the size if the header does not tell.
+        """
+
+        try:
+            if body[:4] == b'fLaC':
+                sampleRate, channels, bitsPerSample, frameCount = FlacDecoder.parseStreamInfo(body[:42])
+                if frameCount is not None:
+                    return frameCount / sampleRate
+
+            elif body[:4] == b'RIFF':
+                with wave.open(io.BytesIO(body), 'rb') as reader:
+                    return reader.getnframes() / reader.getframerate()
+
+        except (ValueError, EOFError, wave.Error, ZeroDivisionError):
+            pass
+
+        # rate from the Content-Type ("audio/x-flac; rate=16000"), FLAC compresses speech to about a half
+        contentType = self.headers.get('Content-Type', '')
+        rate = contentType.partition('rate=')[2]
+        rate = int(rate) if rate.isdigit() else 16000
+
+        return len(body) / (rate * 2) * 2
+
+    def sendGoogleResponse(self, transcript: tuple):
+        """
+        Sends a response in the Google Speech API v2 format, a JSON object per line.
+        :param transcript: Tuple (text, confidence, words), or None if nothing was recognized
+        :return:
+        """
+
+        lines = [{'result': []}]
+
+        if transcript is not None:
+            text, confidence, words = transcript
+            alternatives = [{'transcript': text, 'confidence': confidence}]
+            if len(words) > 1:
+                alternatives.append({'transcript': ' '.join(word.text for word in words[:-1])})
+            lines.append({'result': [{'alternative': alternatives, 'final': True}], 'result_index': 0})
+
+        body = ''.join(json.dumps(line) + '\n' for line in lines).encode('utf8')
+        self.sendBody(200, body, 'application/json; charset=utf-8')
+
+    def sendHoundifyResponse(self, transcript: tuple):
+        """
+        Sends a response in the Houndify format.
+        :param transcript: Tuple (text, confidence, words), or None if nothing was recognized
+        :return:
+        """
+
+        choices = []
+        if transcript is not None:
+            text, confidence, words = transcript
+            choices.append({'Transcription': text, 'FixedTranscription': text, 'ConfidenceScore': confidence})
+
+        self.sendJSON(200, {'Status': 'OK', 'NumToReturn': len(choices),
+                            'Disambiguation': {'NumToShow': len(choices), 'ChoiceData': choices}})
+
+    def sendJSON(self, status: int, content: dict, headers: dict = None):
+        """
+        Sends a JSON response.
+        :param status: HTTP status code
+        :param content: JSON serializable response content
+        :param headers: Additional headers
+        :return:
+        """
+
+        self.sendBody(status, json.dumps(content).encode('utf8'), 'application/json', headers)
+
+    def sendBody(self, status: int, body: bytes, contentType: str, headers: dict = None):
+        """
+        Sends a complete response.
+        :param status: HTTP status code
+        :param body: Response body
+        :param contentType: Value of the Content-Type header
+        :param headers: Additional headers
+        :return:
+        """
+
+        self.send_response(status)
+        self.send_header('Content-Type', contentType)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def setupParser():
+    """
+    Setups parser for command line arguments.
+    :return: Parser instance with defined arguments.
+    """
+
+    newParser = argparse.ArgumentParser(description='Local stand-in for the Google, Google Cloud and Houndify recognition APIs.')
+
+    newParser.add_argument("-H", "--host", type=str, help="interface to listen on", default="127.0.0.1")
+    newParser.add_argument("-P", "--port", type=int, help="port to listen on", default=8010)
+    newParser.add_argument("-lt", "--latency", type=float, help="median latency of a request in secs", default=0.3)
+    newParser.add_argument("-j", "--jitter", type=float, help="sigma of the lognormal latency distribution",
+                           default=0.5)
+    newParser.add_argument("-rtf", "--real_time_factor", type=float,
+                           help="latency added per second of audio", default=0.05)
+    newParser.add_argument("-tr", "--throttle_rate", type=float, help="share of requests rejected with 429",
+                           default=0.0)
+    newParser.add_argument("-dr", "--drop_rate", type=float, help="share of connections dropped without response",
+                           default=0.0)
+    newParser.add_argument("-er", "--error_rate", type=float, help="share of requests failing with 500", default=0.0)
+    newParser.add_argument("-ur", "--unintelligible_rate", type=float,
+                           help="share of requests with no transcript", default=0.0)
+    newParser.add_argument("-c", "--max_concurrent", type=int,
+                           help="number of requests processed at once, further ones are throttled", default=0)
+    newParser.add_argument("-s", "--seed", type=int, help="seed of the random faults and latencies", default=0)
+
+    return newParser
+
+
+if __name__ == '__main__':
+    """
+    Runs the stand-in server until interrupted.
+    """
+
+    args = setupParser().parse_args()
+
+    StandInRequestHandler.backend = MockBackend(environment={"MOCK": {
+        'latency': {'distribution': 'lognormal', 'median': args.latency, 'sigma': args.jitter},
+        'realTimeFactor': args.real_time_factor,
+        'unintelligibleRate': args.unintelligible_rate,
+        'seed': args.seed,
+    }})
+    StandInRequestHandler.throttleRate = args.throttle_rate
+    StandInRequestHandler.dropRate = args.drop_rate
+    StandInRequestHandler.errorRate = args.error_rate
+    StandInRequestHandler.maxConcurrent = args.max_concurrent
+    StandInRequestHandler.random = random.Random(args.seed)
+
+    server = ThreadingHTTPServer((args.host, args.port), StandInRequestHandler)
+    server.daemon_threads = True
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
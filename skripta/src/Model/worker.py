@@ -1,8 +1,10 @@
 import argparse
+import signal
+import sys
 
 from src.Model.Enums.EnergyThresholdOption import EnergyThresholdOption
 from src.Model.Enums.API import API
-from src.Model.Workers.Recognizer import Recognizer
+from src.Model.Enums.BackendPolicy import BackendPolicy
 
 
 def setupParser():
@@ -14,7 +16,8 @@ def setupParser():
     newParser = argparse.ArgumentParser()
 
     # input type
-    newParser.add_argument("input", type=str, help="the input type, should be 'file' or 'mic")
+    newParser.add_argument("input", type=str, help="the input type, should be 'file' or 'mic', "
+                                                   "or 'estimate' to predict the file's (or directory's) requests")
 
     # file options
     newParser.add_argument("-f", "--file", type=str, help="the audio file path")
@@ -34,27 +37,64 @@ def setupParser():
     newParser.add_argument("-sv", "--start_value", type=int, help="starter value for non-dynamic threshold options")
 
     # api-specific options
-    newParser.add_argument("-a", "--api", type=lambda api: API[api.upper()], help="one of the 4 supported APIs",
+    newParser.add_argument("-a", "--api", type=lambda api: API[api.upper()], help="one of the supported APIs",
                            choices=list(API), default=API.GOOGLE)
 
+    newParser.add_argument("-alt", "--alternates", nargs="*", type=lambda api: API[api.upper()], choices=list(API),
+                           help="APIs combined with the selected one on every segment, in the order of preference")
+    newParser.add_argument("-po", "--policy", type=lambda policy: BackendPolicy[policy.upper()],
+                           help="fall back to the alternates in order, or race them and take the first result",
+                           choices=list(BackendPolicy), default=BackendPolicy.FALLBACK)
+    newParser.add_argument("-hd", "--hedge_delay", type=float,
+                           help="secs before a racing request is sent to the next API, 0 for all at once", default=0)
+
     newParser.add_argument("-l", "--language", type=str, help="language in the audio file", default="en-US")
     newParser.add_argument("-p", "--phrases", nargs="*", type=str, help="preferred phrases")
     newParser.add_argument("-pv", "--phrases_values", nargs="*", type=float, help="sensitivity values of preferred phrases")
     newParser.add_argument("-g", "--grammar", type=str, help=".gram file path")
 
+    # re-recognition of low-confidence segments
+    newParser.add_argument("-rt", "--rerun_threshold", type=float,
+                           help="recognize again the segments with a lower confidence (between 0 and 1)")
+    newParser.add_argument("-ra", "--rerun_api", type=lambda api: API[api.upper()], choices=list(API),
+                           help="API recognizing the low-confidence segments again, the selected API by default")
+    newParser.add_argument("-rp", "--rerun_phrases", nargs="*", type=str,
+                           help="preferred phrases of the re-recognition, the preferred phrases by default")
+    newParser.add_argument("-rs", "--rerun_segment", type=float,
+                           help="maximal length in secs of the parts a low-confidence segment is recognized in")
+
+    # output options
+    newParser.add_argument("-out", "--output", nargs="*", type=str,
+                           help="output files written while transcribing, format by extension (txt, srt, vtt, jsonl)")
+    newParser.add_argument("-pl", "--preview_limit", type=int,
+                           help="maximal length of the result text when output files are given")
+
+    newParser.add_argument("-nc", "--no_cache", action='store_true',
+                           help="send every segment to the API, instead of reusing the recognized ones")
+
+    newParser.add_argument("-nr", "--no_resume", action='store_true',
+                           help="start over, instead of resuming an interrupted transcription of the same file")
+
+    newParser.add_argument("-ci", "--cancel_input", action='store_true',
+                           help="stop cleanly when a cancel message arrives on standard input")
+
     return newParser
 
 
-def getTranscriptionOptions():
+def getTranscriptionOptions(args: argparse.Namespace):
     """
     Creates the instance of MicOptions, FileOptions and CommonOptions based on the command line inputs.
-    :return: Tuple (mic_options, file_options, common_options)
+    :param args: Parsed command line arguments
+    :return: Tuple (mic_options, file_options, common_options, output_options)
     """
 
+    # speech recognition is loaded only after the arguments are parsed (i.e. not for --help)
+    from src.Model.Workers.Recognizer import Recognizer
+
     micOptions = fileOptions = None
 
     # file options
-    if args.input == 'file':
+    if args.input in ('file', 'estimate'):
         fileOptions = Recognizer.FileOptions(args.file, args.offset, args.duration)
 
     # mic options
@@ -68,9 +108,17 @@ def getTranscriptionOptions():
             # values are 'inverted' because of the sphinx package implementation
             phrases[index] = (phrase, 1 - args.phrases_values[index])
 
-    commonOptions = Recognizer.CommonOptions(args.energy, args.start_value, args.api, args.language, phrases, args.grammar)
+    rerunOptions = None
+    if args.rerun_threshold is not None:
+        rerunOptions = Recognizer.RerunOptions(args.rerun_threshold, args.rerun_api, args.rerun_phrases,
+                                               args.rerun_segment)
 
-    return (micOptions, fileOptions, commonOptions)
+    commonOptions = Recognizer.CommonOptions(args.energy, args.start_value, args.api, args.language, phrases, args.grammar,
+                                             args.alternates, args.policy, args.hedge_delay, rerunOptions)
+
+    outputOptions = Recognizer.OutputOptions(args.output, args.preview_limit)
+
+    return (micOptions, fileOptions, commonOptions, outputOptions)
 
 
 if __name__ == '__main__':
@@ -82,7 +130,31 @@ if __name__ == '__main__':
     parser = setupParser()
     args = parser.parse_args()
 
-    options = getTranscriptionOptions()
+    options = getTranscriptionOptions(args)
+
+    # dry run: the audio is only decoded and segmented, no API is called
+    if args.input == 'estimate':
+        from src.Model.Workers.Estimator import Estimator
+        Estimator(options[1], options[2]).run()
+        sys.exit(0)
+
+    from src.Model.Workers.Recognizer import Recognizer
 
-    worker = Recognizer(*options)
+    # recognized segments are reused only for files, i.e. when the same recording is transcribed again
+    segmentCache = None
+    if args.input == 'file' and not args.no_cache:
+        from src.Model.Pipeline.SegmentCache import SegmentCache
+        segmentCache = SegmentCache()
+
+    # cancellation (cancel message or SIGTERM) keeps the transcribed part of the job
+    from src.Model.Utils.CancelToken import CancelToken
+    cancelToken = CancelToken()
+    signal.signal(signal.SIGTERM, lambda signalNumber, frame: cancelToken.cancel())
+    if args.cancel_input:
+        cancelToken.watch()
+
+    worker = Recognizer(*options, segmentCache=segmentCache, resumable=not args.no_resume, cancelToken=cancelToken)
     worker.run()
+
+    if segmentCache is not None:
+        segmentCache.close()
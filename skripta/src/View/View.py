@@ -55,7 +55,8 @@ class View(QObject):
             """
             if self == self.INVALID_FORMAT:
                 return "Provjerite je li datoteka u nekom od podržanih formata: " \
-                       "WAV (PCM/LPCM), FLAC (nativni), AIFF i AIFF-C."
+                       "WAV (PCM/LPCM), FLAC (nativni), AIFF i AIFF-C, " \
+                       "a uz instaliran ffmpeg i MP3, OGG, Opus, M4A i drugi."
 
             if self == self.DAMAGED_FILE:
                 return "Greška pri obradi govora: nerazumljiv govor."
@@ -269,11 +270,11 @@ class View(QObject):
     def initSelectFileDialog(self):
         """
         Setups select file dialog options.
-        The dialog is set to open the home directory, and show only audio files.
+        The dialog is set to open the home directory, and show only audio files that can be decoded.
         :return: New QFileDialog instance.
         """
 
-        audioExtensions = tuple(FileTypeUtil.getExtensionsForType('audio'))
+        audioExtensions = FileTypeUtil.getSupportedExtensions()
 
         fileDialog = QFileDialog(self.mainWindow)
 
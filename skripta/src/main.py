@@ -1,16 +1,10 @@
 import os
 import sys
-from pathlib import Path
 
 from PyQt6 import QtCore
 from PyQt6.QtWidgets import QApplication
 
-from src.View.View import View
-from src.Model.Model import Model
-from src.Controller.Controller import Controller
-
-# Absolute path to app root dir
-ROOT_DIRECTORY = Path(__file__).resolve().parent.parent
+from src.Model.Utils.Paths import ROOT_DIRECTORY
 
 
 def setupResources():
@@ -32,6 +26,11 @@ if __name__ == '__main__':
 
     setupResources()
 
+    # MVC parts are imported here, so importing this module (i.e. for ROOT_DIRECTORY) stays cheap
+    from src.View.View import View
+    from src.Model.Model import Model
+    from src.Controller.Controller import Controller
+
     view = View()
     model = Model()
     controller = Controller(model, view)
@@ -0,0 +1,126 @@
+import os
+import random
+import struct
+import tempfile
+import unittest
+
+from concurrent.futures import Future
+from unittest import mock
+
+import speech_recognition as sr
+
+from src.Model.Backends.RecognitionBackend import RecognitionBackend
+from src.Model.Enums.API import API
+from src.Model.Enums.EnergyThresholdOption import EnergyThresholdOption
+from src.Model.Enums.MessageType import MessageType
+from src.Model.Pipeline.SegmentCache import SegmentCache
+from src.Model.Pipeline.Segmenter import AudioSegment
+from src.Model.Workers.Recognizer import Recognizer
+
+
+class PipelinedBackend(RecognitionBackend):
+    """
+    Asynchronous backend whose requests never finish, except the first one if it fails.
+    """
+
+    API = API.MOCK
+    PIPELINE_DEPTH = 3
+
+    def __init__(self, firstFails: bool, cancelToken=None):
+        """
+        Constructor method.
+        :param firstFails: The first request fails at once
+        :param cancelToken: Token cancelled when the second request is made, or None
+        """
+
+        super().__init__(None, {})
+
+        self.firstFails = firstFails
+        self.cancelToken = cancelToken
+        self.futures = []
+
+    def submit(self, recognizer: sr.Recognizer, audio: sr.AudioData):
+        future = Future()
+        if self.firstFails and not self.futures:
+            future.set_exception(sr.RequestError('request failed'))
+
+        self.futures.append(future)
+        if self.cancelToken is not None and len(self.futures) == 2:
+            self.cancelToken.cancel()
+
+        return future
+
+
+def createSegment(index: int):
+    """
+    :param index: Ordinal number of the segment
+    :return: AudioSegment of a second of noise, louder for every index.
+    """
+
+    generator = random.Random(index)
+    samples = [int(generator.gauss(0, 1000 * 2 ** index)) for _ in range(16000)]
+
+    return AudioSegment(index, index * 2.0, struct.pack('<%dh' % len(samples), *samples), 16000, 2)
+
+
+class TranscribeInterruptedTest(unittest.TestCase):
+    """
+    A failed or cancelled job with a segment cache hit among its pending requests.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = SegmentCache(os.path.join(self.directory.name, 'segments.sqlite'))
+        self.output = os.path.join(self.directory.name, 'out.txt')
+        self.messages = []
+
+        self.recognizer = Recognizer(None, Recognizer.FileOptions(None, None, None),
+                                     Recognizer.CommonOptions(EnergyThresholdOption.FIXED, 300, API.MOCK, 'en-US',
+                                                              None, None),
+                                     Recognizer.OutputOptions([self.output]),
+                                     sink=lambda messageType, **payload: self.messages.append((messageType, payload)),
+                                     segmentCache=self.cache)
+
+        # the second segment is cached
+        self.segments = [createSegment(index) for index in range(4)]
+        fingerprint, _ = self.segments[1].getFingerprint()
+        self.cache.put(self.recognizer.getRecognitionSettings(), fingerprint, 'cached', 0.9, [])
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def getOutputs(self):
+        """
+        :return: Names of the output file and its temporary files left in the directory.
+        """
+
+        return [name for name in os.listdir(self.directory.name) if name.startswith('out.txt')]
+
+    def transcribe(self, backend: PipelinedBackend):
+        with mock.patch.object(Recognizer, 'openBackend', return_value=backend):
+            self.recognizer.transcribe(sr.Recognizer(), iter(self.segments))
+
+    def testFailedRequest(self):
+        backend = PipelinedBackend(firstFails=True)
+        self.transcribe(backend)
+
+        self.assertEqual([MessageType.ERROR], [messageType for messageType, _ in self.messages])
+        self.assertTrue(all(future.cancelled() for future in backend.futures[1:]))
+        self.assertEqual([], self.getOutputs())
+
+    def testCancelled(self):
+        backend = PipelinedBackend(firstFails=False, cancelToken=self.recognizer.cancelToken)
+        self.recognizer.CANCEL_CHECK_INTERVAL = 0.01
+
+        self.transcribe(backend)
+
+        messageType, payload = self.messages[-1]
+        self.assertEqual(MessageType.RESULT, messageType)
+        self.assertTrue(payload['cancelled'])
+        self.assertTrue(all(future.cancelled() for future in backend.futures))
+        self.assertEqual([], self.getOutputs())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.Model.Pipeline.Normalizer import Normalizer
+from src.Model.Pipeline.SegmentCache import SegmentCache
+from src.Model.Pipeline.Segmenter import EnergySegmenter
+
+
+SETTINGS = ('sphinx', 'en-US', None, None)
+
+
+def createRecording(sampleRate: int, utterances: int, seed: int = 0):
+    """
+    :param sampleRate: Sample rate in Hz
+    :param utterances: Number of utterances
+    :param seed: Seed of the utterances' pitch, syllables and noise, their durations are the same for all seeds
+    :return: Mono 16-bit samples of voiced, amplitude modulated utterances separated by faint noise.
+    """
+
+    generator = np.random.default_rng(seed)
+    parts = []
+
+    for index in range(utterances):
+        parts.append(generator.normal(0, 30, int(sampleRate * 0.8)))
+
+        times = np.arange(int(sampleRate * (0.6 + 0.15 * index))) / sampleRate
+        pitch = generator.uniform(100, 220)
+        voiced = sum(np.sin(2 * np.pi * pitch * harmonic * times) / harmonic for harmonic in range(1, 12))
+
+        # syllables of random loudness and length
+        bounds = np.sort(generator.uniform(0, times[-1], generator.integers(2, 6)))
+        loudness = generator.uniform(0.2, 1, len(bounds) + 1)
+        syllables = loudness[np.searchsorted(bounds, times)] * np.abs(np.sin(np.pi * times / 0.15)) ** 0.5
+
+        parts.append(3000 * voiced * syllables + generator.normal(0, 300, len(times)))
+
+    parts.append(generator.normal(0, 30, sampleRate))
+
+    return np.clip(np.concatenate(parts), -32768, 32767).astype('<i2')
+
+
+def getSegments(samples: np.ndarray, sampleRate: int):
+    """
+    :param samples: Mono 16-bit samples
+    :param sampleRate: Sample rate in Hz
+    :return: Speech segments of the normalized recording.
+    """
+
+    normalizer = Normalizer(sampleRate, 2, 1)
+    data = normalizer.normalize(samples.tobytes())
+
+    segmenter = EnergySegmenter(Normalizer.SAMPLE_RATE, Normalizer.SAMPLE_WIDTH, 300)
+    return list(segmenter.split([data]))
+
+
+def getFingerprints(samples: np.ndarray, sampleRate: int):
+    """
+    :param samples: Mono 16-bit samples
+    :param sampleRate: Sample rate in Hz
+    :return: Fingerprints of the speech segments of the normalized recording.
+    """
+
+    return [segment.getFingerprint()[0] for segment in getSegments(samples, sampleRate)]
+
+
+class SegmentCacheTest(unittest.TestCase):
+    """
+    Reuse of cached segments after a resampled recording is trimmed.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = SegmentCache(os.path.join(self.directory.name, 'segments.sqlite'))
+
+        self.recording = createRecording(48000, 6)
+        self.fingerprints = getFingerprints(self.recording, 48000)
+
+        for index, fingerprint in enumerate(self.fingerprints):
+            self.cache.put(SETTINGS, fingerprint, 'segment {}'.format(index), 0.9, [])
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def testExactMatch(self):
+        for index, fingerprint in enumerate(self.fingerprints):
+            self.assertEqual('segment {}'.format(index), self.cache.get(SETTINGS, fingerprint)[0])
+
+    def testTrimmedBySamples(self):
+        # trims that are not a multiple of the resampling step shift the resampler's phase
+        segments = getSegments(self.recording, 48000)
+
+        for trim in (1, 2, 7):
+            trimmedSegments = getSegments(self.recording[trim:], 48000)
+
+            self.assertEqual(len(segments), len(trimmedSegments))
+            for index, segment in enumerate(trimmedSegments):
+                self.assertNotIn(segment.data, segments[index].data)
+                self.assertEqual('segment {}'.format(index), self.cache.get(SETTINGS, segment.getFingerprint()[0])[0])
+
+    def testTrimmedSection(self):
+        # the first utterance and a few samples of the following pause are cut away
+        trim = int(48000 * (0.8 + 0.6)) + 101
+        fingerprints = getFingerprints(self.recording[trim:], 48000)
+
+        self.assertEqual(len(self.fingerprints) - 1, len(fingerprints))
+        for index, fingerprint in enumerate(fingerprints, 1):
+            self.assertEqual('segment {}'.format(index), self.cache.get(SETTINGS, fingerprint)[0])
+
+    def testDifferentSpeech(self):
+        for fingerprint in getFingerprints(createRecording(48000, 6, seed=1), 48000):
+            self.assertIsNone(self.cache.get(SETTINGS, fingerprint))
+
+    def testDifferentSettings(self):
+        self.assertIsNone(self.cache.get(('google',) + SETTINGS[1:], self.fingerprints[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()